@@ -0,0 +1,271 @@
+"""
+Concurrent scraping engine for the RapidAPI post fetch.
+
+The synchronous ``scrape_batch`` spends roughly N x (latency + delay) per
+run. ``scrape_concurrently`` keeps up to ``concurrency`` requests in flight
+on one ``httpx.AsyncClient`` and paces them with a token bucket set in
+requests per second, so throughput tracks the API plan limit instead of a
+fixed post-request sleep. A 429 pauses the whole bucket for the
+``Retry-After`` interval and the request is retried.
+
+Posts are saved by a single writer task: fetch workers only hand
+``(profile, posts)`` to a queue, and the writer calls the scraper's
+synchronous ``persist`` function. The producer (keyset page reads and lease
+claims of the profile iterator) and the fetchers (response cache lookups and
+stores) also use the shared connection, but every database call runs on the
+event-loop thread and none awaits, so statements and transactions of
+different coroutines never interleave.
+
+asyncio and httpx are imported when a scrape starts, so the scrapers can
+read the tuning defaults below without paying for them on ``--help`` or
+``--stats-only``.
+"""
+
+import logging
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import httpx
+
+    from backend.http_client import EndpointStats
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REQUESTS_PER_SECOND = 2.0
+DEFAULT_CONCURRENCY = 4
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_TIMEOUT_SECONDS = 30.0
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens per second, up to ``capacity`` saved.
+
+    ``acquire`` waits for a token; ``pause`` blocks every caller until the
+    given delay has passed (used for rate-limit responses).
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        import asyncio
+
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float) -> None:
+        """Hold every acquire until ``seconds`` from now and drop saved tokens."""
+        now = time.monotonic()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._refill(now)
+        self._tokens = 0.0
+
+    async def acquire(self) -> None:
+        import asyncio
+
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def fetch_with_retries(client: "httpx.AsyncClient", bucket: TokenBucket, url: str,
+                             params: Dict, max_retries: int = DEFAULT_MAX_RETRIES,
+                             stats: Optional["EndpointStats"] = None) -> "httpx.Response":
+    """
+    GET ``url`` under the bucket, retrying 429s after their Retry-After delay.
+
+    Each attempt's latency and status (None for a transport error) and each
+    retry are recorded in ``stats`` when given.
+    """
+    import httpx
+
+    from backend.http_client import retry_after_seconds
+
+    for attempt in range(max_retries + 1):
+        await bucket.acquire()
+        started = time.monotonic()
+        try:
+            response = await client.get(url, params=params)
+        except httpx.TransportError:
+            if stats is not None:
+                stats.record(time.monotonic() - started, None)
+            raise
+        if stats is not None:
+            stats.record(time.monotonic() - started, response.status_code)
+        if response.status_code != 429 or attempt == max_retries:
+            return response
+        delay = retry_after_seconds(response)
+        logger.warning(f"Rate limited (429), pausing {delay:.1f}s before retry {attempt + 1}/{max_retries}")
+        if stats is not None:
+            stats.retries += 1
+        bucket.pause(delay)
+    return response
+
+
+async def _scrape(profiles: Iterable[Dict], *,
+                  build_request: Callable[[Dict, int], Optional[Tuple[str, Dict]]],
+                  next_start: Optional[Callable[[Dict, List[Dict], int, int], Optional[int]]],
+                  parse_response: Callable[[object, Dict], List[Dict]],
+                  persist: Callable[[Dict, List[Dict]], Dict],
+                  headers: Dict[str, str], requests_per_second: float, concurrency: int,
+                  max_retries: int, timeout: float,
+                  sink: Optional[Callable[[Dict], None]],
+                  stats: Optional["EndpointStats"],
+                  read_cache: Optional[Callable[[Dict], Optional["httpx.Response"]]],
+                  write_cache: Optional[Callable[[Dict, "httpx.Response"], None]]) -> Dict:
+    import asyncio
+
+    import httpx
+
+    from backend.http_client import http2_available
+
+    bucket = TokenBucket(requests_per_second)
+    todo: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    done: asyncio.Queue = asyncio.Queue()
+    totals = {
+        'profiles_processed': 0,
+        'profiles_scraped': 0,
+        'total_posts_saved': 0,
+        'profiles_to_week1': 0,
+        'profiles_to_week3': 0,
+        'requests_failed': 0,
+    }
+
+    async def produce() -> None:
+        for profile in profiles:
+            await todo.put(profile)
+        for _ in range(concurrency):
+            await todo.put(None)
+
+    async def fetch(client: "httpx.AsyncClient") -> None:
+        while (profile := await todo.get()) is not None:
+            posts: List[Dict] = []
+            start: Optional[int] = 0
+            page_number = 1
+            try:
+                while start is not None and (request := build_request(profile, start)) is not None:
+                    url, params = request
+                    cached = read_cache(params) if read_cache is not None else None
+                    if cached is not None:
+                        page = parse_response(cached, profile)
+                    else:
+                        response = await fetch_with_retries(client, bucket, url, params, max_retries, stats)
+                        if response.status_code == 429 or response.status_code >= 500:
+                            response.raise_for_status()
+                        page = parse_response(response, profile)
+                        if write_cache is not None:
+                            write_cache(params, response)
+                    if not page:
+                        break
+                    posts.extend(page)
+                    start = next_start(profile, page, start, page_number) if next_start is not None else None
+                    page_number += 1
+            except Exception as e:
+                # Transport errors, exhausted retries and bodies that do not parse
+                # fail this profile only (pages fetched before are dropped); the
+                # other fetchers carry on
+                logger.error(f"Request failed for profile {profile['profile_id']}: {e}")
+                await done.put((profile, e))
+                continue
+            await done.put((profile, posts))
+        await done.put(None)
+
+    async def write() -> None:
+        # The only coroutine that saves posts or changes profile status
+        finished_fetchers = 0
+        while finished_fetchers < concurrency:
+            item = await done.get()
+            if item is None:
+                finished_fetchers += 1
+                continue
+            profile, posts = item
+            totals['profiles_processed'] += 1
+            if isinstance(posts, Exception):
+                # Leave the profile queued for the next run
+                totals['requests_failed'] += 1
+                result = {
+                    'profile_id': profile['profile_id'],
+                    'name': f"{profile['first_name']} {profile['last_name']}",
+                    'posts_fetched': 0, 'posts_saved': 0, 'has_recent_posts': False,
+                    'new_status': None, 'success': False, 'error': str(posts),
+                }
+            else:
+                result = persist(profile, posts)
+            if sink is not None:
+                sink(result)
+            if result['success']:
+                totals['profiles_scraped'] += 1
+                totals['total_posts_saved'] += result['posts_saved']
+                if result['new_status'] == 'week1_liking':
+                    totals['profiles_to_week1'] += 1
+                elif result['new_status'] == 'week3_invitation':
+                    totals['profiles_to_week3'] += 1
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(headers=headers, timeout=timeout, limits=limits,
+                                 http2=http2_available()) as client:
+        await asyncio.gather(produce(), write(), *(fetch(client) for _ in range(concurrency)))
+    return totals
+
+
+def scrape_concurrently(profiles: Iterable[Dict], *,
+                        build_request: Callable[[Dict, int], Optional[Tuple[str, Dict]]],
+                        parse_response: Callable[[object, Dict], List[Dict]],
+                        persist: Callable[[Dict, List[Dict]], Dict],
+                        headers: Dict[str, str],
+                        requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                        concurrency: int = DEFAULT_CONCURRENCY,
+                        max_retries: int = DEFAULT_MAX_RETRIES,
+                        timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                        sink: Optional[Callable[[Dict], None]] = None,
+                        stats: Optional["EndpointStats"] = None,
+                        next_start: Optional[Callable[[Dict, List[Dict], int, int], Optional[int]]] = None,
+                        read_cache: Optional[Callable[[Dict], Optional["httpx.Response"]]] = None,
+                        write_cache: Optional[Callable[[Dict, "httpx.Response"], None]] = None) -> Dict:
+    """
+    Fetch and persist ``profiles`` concurrently; return scrape_batch-style totals.
+
+    ``build_request(profile, start)`` returns the ``(url, params)`` of the
+    page of posts at offset ``start``, or None to skip the fetch (the
+    profile is persisted with no posts). ``parse_response`` turns a
+    response into a list of posts. ``next_start(profile, page, start,
+    page_number)`` returns the offset of the next page, or None once paging
+    should stop; without it only the first page is fetched. The pages of a
+    profile are fetched in order, and ``persist(profile, posts)`` saves all
+    of them and returns the per-profile result dict, which is passed to
+    ``sink``. Transport errors, server errors, 429s that outlast the
+    retries and responses ``parse_response`` fails on (a 200 with an HTML
+    or non-object body) are counted in ``requests_failed`` and the profile
+    is left untouched for the next run. Every request, retry and response
+    status is recorded in ``stats`` (an ``EndpointStats``) when given, as
+    ``HttpClient`` does for the synchronous path. ``read_cache(params)``
+    returns a stored response to use instead of a request, or None on a
+    miss; fetched responses that parse are offered to
+    ``write_cache(params, response)``.
+    """
+    import asyncio
+
+    return asyncio.run(_scrape(
+        profiles,
+        build_request=build_request, next_start=next_start, parse_response=parse_response, persist=persist,
+        headers=headers, requests_per_second=requests_per_second, concurrency=concurrency,
+        max_retries=max_retries, timeout=timeout, sink=sink, stats=stats,
+        read_cache=read_cache, write_cache=write_cache,
+    ))
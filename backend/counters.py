@@ -0,0 +1,334 @@
+"""
+Trigger-maintained pipeline counters.
+
+The stats methods of every script used to run several ``COUNT(*)`` and
+``GROUP BY status`` scans over profiles, posts and comments, at startup and
+(in the commenter) after every post. ``pipeline_counters`` holds those
+numbers instead, one row per ``(scope, key)``, and triggers on the source
+tables apply +1/-1 deltas as rows are inserted, updated and deleted, so
+reading a statistic is a primary-key lookup.
+
+Each CounterGroup lists the columns it reads. Like ensure_indexes, groups
+whose columns do not exist yet are skipped and installed by the first
+script whose setup completes them; a group is filled with a full scan when
+its triggers are first created. verify_counters recomputes every installed
+group with full scans to detect (and repair) drift.
+
+Statistics that depend on the clock (posts in the recency window) cannot be
+maintained by triggers and stay as indexed queries in the scripts.
+"""
+
+import logging
+import sqlite3
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from backend.schema import _table_columns
+
+logger = logging.getLogger(__name__)
+
+
+class Counter(NamedTuple):
+    """
+    One counted key expression within a group.
+
+    ``key``, ``when`` and ``last_at`` are SQL expressions over the source row,
+    written with a ``{r}`` placeholder for the row (``NEW``/``OLD`` in
+    triggers). ``join`` optionally names a table and join condition the
+    expressions may also read from.
+    """
+    key: str
+    when: str = "1"
+    last_at: Optional[str] = None
+    join: Optional[Tuple[str, str]] = None
+
+
+class CounterGroup(NamedTuple):
+    scope: str
+    table: str
+    columns: Tuple[str, ...]
+    counters: Tuple[Counter, ...]
+    # Extra triggers on other tables: name -> (event, body)
+    extra_triggers: Dict[str, Tuple[str, str]] = {}
+    # Columns the extra triggers need, by table
+    extra_columns: Dict[str, Tuple[str, ...]] = {}
+
+
+_UPSERT = (
+    "INSERT INTO pipeline_counters (scope, key, value, last_at) {select} "
+    "ON CONFLICT (scope, key) DO UPDATE SET value = value + excluded.value, "
+    "last_at = CASE WHEN excluded.last_at > COALESCE(last_at, '') THEN excluded.last_at ELSE last_at END;"
+)
+
+# Posts per profile status move with the profile when its status changes
+_POSTS_OF = "(SELECT COUNT(*) FROM posts WHERE posts.profile_id = {row}.profile_id)"
+
+_POSTS_BY_PROFILE_STATUS_TRIGGERS = {
+    "trg_counters_posts_by_status_profile_insert": (
+        "AFTER INSERT ON profiles",
+        _UPSERT.format(select=(
+            f"SELECT 'posts_by_profile_status', COALESCE(NEW.status, ''), {_POSTS_OF.format(row='NEW')}, NULL "
+            "WHERE 1"
+        )),
+    ),
+    "trg_counters_posts_by_status_profile_update": (
+        "AFTER UPDATE OF status ON profiles WHEN OLD.status IS NOT NEW.status",
+        _UPSERT.format(select=(
+            f"SELECT 'posts_by_profile_status', COALESCE(OLD.status, ''), -{_POSTS_OF.format(row='OLD')}, NULL "
+            "WHERE 1"
+        )) + "\n" + _UPSERT.format(select=(
+            f"SELECT 'posts_by_profile_status', COALESCE(NEW.status, ''), {_POSTS_OF.format(row='NEW')}, NULL "
+            "WHERE 1"
+        )),
+    ),
+    "trg_counters_posts_by_status_profile_delete": (
+        "AFTER DELETE ON profiles",
+        _UPSERT.format(select=(
+            f"SELECT 'posts_by_profile_status', COALESCE(OLD.status, ''), -{_POSTS_OF.format(row='OLD')}, NULL "
+            "WHERE 1"
+        )),
+    ),
+}
+
+COUNTER_GROUPS: List[CounterGroup] = [
+    CounterGroup("profile_status", "profiles", ("status",), (
+        Counter("COALESCE({r}.status, '')"),
+    )),
+    CounterGroup("profile_connection_status", "profiles", ("connection_status",), (
+        Counter("COALESCE({r}.connection_status, '')"),
+    )),
+    # Profiles by the date of their last pipeline action ("scraped today")
+    CounterGroup("profile_last_action_date", "profiles", ("last_action_date",), (
+        Counter("{r}.last_action_date", "{r}.last_action_date IS NOT NULL"),
+    )),
+    CounterGroup("posts", "posts", ("urn",), (
+        Counter("'total'"),
+        Counter("'with_urn'", "{r}.urn IS NOT NULL AND {r}.urn != ''"),
+    )),
+    CounterGroup(
+        "posts_by_profile_status", "posts", ("profile_id",), (
+            Counter(
+                "COALESCE(profiles.status, '')",
+                join=("profiles", "profiles.profile_id = {r}.profile_id"),
+            ),
+        ),
+        extra_triggers=_POSTS_BY_PROFILE_STATUS_TRIGGERS,
+        extra_columns={"profiles": ("profile_id", "status")},
+    ),
+    CounterGroup("likes", "posts", ("is_post_liked", "like_failed", "liked_to_linkedin_at"), (
+        Counter("'liked'", "{r}.is_post_liked = TRUE", "{r}.liked_to_linkedin_at"),
+        Counter("'failed'", "{r}.like_failed = TRUE"),
+    )),
+    CounterGroup("comments", "comments", ("status", "is_comment_posted", "posted_to_linkedin_at"), (
+        Counter("'generated'", "{r}.status = 'GENERATED'"),
+        Counter("'failed'", "{r}.status = 'FAILED'"),
+        Counter("'posted'", "{r}.is_comment_posted = TRUE", "{r}.posted_to_linkedin_at"),
+    )),
+    # Posts table of the LangGraph commenter (backend.linkedin.graph.DatabaseService)
+    CounterGroup("graph_posts", "posts", ("processed",), (
+        Counter("'total'"),
+        Counter("'processed'", "{r}.processed = 1"),
+    )),
+]
+
+
+def _delta_statement(group: CounterGroup, counter: Counter, row: str, sign: int) -> str:
+    """Upsert adding ``sign`` to the counter for one NEW/OLD row."""
+    key = counter.key.format(r=row)
+    when = counter.when.format(r=row)
+    last_at = counter.last_at.format(r=row) if counter.last_at and sign > 0 else "NULL"
+    source = ""
+    if counter.join:
+        table, condition = counter.join
+        source = f"FROM {table} "
+        when = f"{condition.format(r=row)} AND ({when})"
+    return _UPSERT.format(select=f"SELECT '{group.scope}', {key}, {sign}, {last_at} {source}WHERE {when}")
+
+
+def _group_triggers(group: CounterGroup) -> Dict[str, Tuple[str, str]]:
+    """Insert/update/delete triggers on the group's table, plus its extra triggers."""
+    def body(*deltas: Tuple[str, int]) -> str:
+        return "\n".join(
+            _delta_statement(group, counter, row, sign)
+            for row, sign in deltas
+            for counter in group.counters
+        )
+
+    prefix = f"trg_counters_{group.scope}"
+    triggers = {
+        f"{prefix}_insert": (f"AFTER INSERT ON {group.table}", body(("NEW", 1))),
+        f"{prefix}_update": (
+            f"AFTER UPDATE OF {', '.join(group.columns)} ON {group.table}",
+            body(("OLD", -1), ("NEW", 1)),
+        ),
+        f"{prefix}_delete": (f"AFTER DELETE ON {group.table}", body(("OLD", -1))),
+    }
+    triggers.update(group.extra_triggers)
+    return triggers
+
+
+def _recompute_sql(group: CounterGroup) -> str:
+    """Full-scan SELECT of (key, value, last_at) for every key of the group."""
+    selects = []
+    for counter in group.counters:
+        join = ""
+        if counter.join:
+            table, condition = counter.join
+            join = f"JOIN {table} ON {condition.format(r='src')} "
+        last_at = f"MAX({counter.last_at.format(r='src')})" if counter.last_at else "NULL"
+        key = counter.key.format(r="src")
+        selects.append(
+            f"SELECT {key} AS key, COUNT(*) AS value, {last_at} AS last_at "
+            f"FROM {group.table} AS src {join}WHERE {counter.when.format(r='src')} GROUP BY {key}"
+        )
+    return " UNION ALL ".join(selects)
+
+
+def _missing_columns(conn: sqlite3.Connection, group: CounterGroup) -> List[str]:
+    """The ``table.column`` names (or tables) the group's triggers read that do not exist."""
+    needed = {group.table: set(group.columns)}
+    for counter in group.counters:
+        if counter.join:
+            needed.setdefault(counter.join[0], set())
+    for table, columns in group.extra_columns.items():
+        needed.setdefault(table, set()).update(columns)
+
+    missing = []
+    for table, columns in needed.items():
+        existing = _table_columns(conn, table)
+        if not existing:
+            missing.append(table)
+        else:
+            missing.extend(f"{table}.{column}" for column in sorted(columns - existing))
+    return missing
+
+
+def _trigger_names(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def _rebuild_group(conn: sqlite3.Connection, group: CounterGroup) -> None:
+    conn.execute("DELETE FROM pipeline_counters WHERE scope = ?", (group.scope,))
+    conn.execute(
+        f"INSERT INTO pipeline_counters (scope, key, value, last_at) "
+        f"SELECT ?, key, value, last_at FROM ({_recompute_sql(group)})",
+        (group.scope,),
+    )
+
+
+def ensure_counters(conn: sqlite3.Connection) -> List[str]:
+    """
+    Create ``pipeline_counters`` and the triggers of every ready group.
+
+    Groups installed by this call are filled from their source table in the
+    same transaction as their triggers; groups whose columns are missing are
+    logged and skipped. Returns the scopes that are installed.
+    """
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS pipeline_counters (
+                scope TEXT NOT NULL,
+                key TEXT NOT NULL,
+                value INTEGER NOT NULL DEFAULT 0,
+                last_at TEXT,
+                PRIMARY KEY (scope, key)
+            ) WITHOUT ROWID
+        """)
+
+    existing = _trigger_names(conn)
+    installed = []
+    for group in COUNTER_GROUPS:
+        triggers = _group_triggers(group)
+        if set(triggers) <= existing:
+            installed.append(group.scope)
+            continue
+        missing = _missing_columns(conn, group)
+        if missing:
+            logger.info(f"Skipping counters for {group.scope}: missing {', '.join(missing)}")
+            continue
+
+        # CREATE TRIGGER does not open a transaction in the sqlite3 module's
+        # default mode, so begin explicitly to keep triggers and rebuild atomic
+        with conn:
+            if not conn.in_transaction:
+                conn.execute("BEGIN")
+            for name, (event, body) in triggers.items():
+                conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN\n{body}\nEND")
+            _rebuild_group(conn, group)
+        logger.info(f"Installed pipeline counters for {group.scope}")
+        installed.append(group.scope)
+
+    return installed
+
+
+def _installed_groups(conn: sqlite3.Connection) -> List[CounterGroup]:
+    existing = _trigger_names(conn)
+    return [group for group in COUNTER_GROUPS if set(_group_triggers(group)) <= existing]
+
+
+def read_counters(conn: sqlite3.Connection, scope: str) -> Dict[str, int]:
+    """Return the non-zero counters of one scope as ``{key: value}``."""
+    return {
+        row[0]: row[1]
+        for row in conn.execute(
+            "SELECT key, value FROM pipeline_counters WHERE scope = ? AND value != 0 ORDER BY key", (scope,)
+        )
+    }
+
+
+def read_counter(conn: sqlite3.Connection, scope: str, key: str) -> Tuple[int, Optional[str]]:
+    """Return ``(value, last_at)`` of one counter, ``(0, None)`` if it has none."""
+    row = conn.execute(
+        "SELECT value, last_at FROM pipeline_counters WHERE scope = ? AND key = ?", (scope, key)
+    ).fetchone()
+    return (row[0], row[1]) if row else (0, None)
+
+
+def verify_counters(conn: sqlite3.Connection, repair: bool = True) -> List[Dict]:
+    """
+    Recompute every installed group with full scans and compare.
+
+    Returns one dict per drifted counter (scope, key, stored and actual
+    value and last_at). With ``repair``, drifted groups are rebuilt.
+    """
+    drift = []
+    for group in _installed_groups(conn):
+        stored = {
+            row[0]: (row[1], row[2])
+            for row in conn.execute(
+                "SELECT key, value, last_at FROM pipeline_counters WHERE scope = ?", (group.scope,)
+            )
+        }
+        actual = {row[0]: (row[1], row[2]) for row in conn.execute(_recompute_sql(group))}
+
+        group_drift = []
+        for key in sorted(set(stored) | set(actual)):
+            stored_value, stored_last = stored.get(key, (0, None))
+            actual_value, actual_last = actual.get(key, (0, None))
+            if stored_value != actual_value or (actual_value and stored_last != actual_last):
+                group_drift.append({
+                    'scope': group.scope, 'key': key,
+                    'stored': stored_value, 'actual': actual_value,
+                    'stored_last_at': stored_last, 'actual_last_at': actual_last,
+                })
+
+        if group_drift and repair:
+            with conn:
+                _rebuild_group(conn, group)
+        drift.extend(group_drift)
+
+    if drift:
+        logger.warning(f"Pipeline counters drifted on {len(drift)} keys{' (repaired)' if repair else ''}")
+    return drift
+
+
+def report_counter_drift(conn: sqlite3.Connection) -> bool:
+    """``--verify-counters`` entry point: log drift, repair it, return True if clean."""
+    drift = verify_counters(conn, repair=True)
+    for item in drift:
+        logger.warning(
+            f"  {item['scope']}/{item['key']}: stored {item['stored']} "
+            f"(last {item['stored_last_at']}), actual {item['actual']} (last {item['actual_last_at']})"
+        )
+    if not drift:
+        logger.info("Pipeline counters match a full recount")
+    return not drift
@@ -0,0 +1,140 @@
+"""
+Shared SQLite connection layer for the pipeline scripts.
+
+Every script used to open a fresh ``sqlite3.connect`` per query. This module
+keeps one long-lived connection per database file (per thread, per process),
+configured for WAL journaling and a busy timeout so the cron stages can read
+and write the same database concurrently. Reusing the connection also keeps
+SQLite's prepared-statement cache warm across calls.
+
+Usage:
+    conn = get_connection(db_path)
+    with conn:  # commits on success, rolls back on error
+        conn.execute("UPDATE ...")
+"""
+
+import atexit
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = "linkedin_project_db.sqlite3"
+
+# How long a writer waits for a competing lock before "database is locked"
+BUSY_TIMEOUT_SECONDS = 30.0
+
+# Prepared statements kept per connection (sqlite3 default is 128)
+STATEMENT_CACHE_SIZE = 256
+
+_local = threading.local()
+_registry_lock = threading.Lock()
+_open_connections: List[sqlite3.Connection] = []
+# Bumped by close_all_connections; threads drop connections of older generations
+_generation = 0
+
+
+def _connection_key(db_path: str) -> Tuple[int, str]:
+    """Key connections by process and resolved path so forks never share one."""
+    if db_path == ":memory:" or db_path.startswith("file:"):
+        return os.getpid(), db_path
+    return os.getpid(), os.path.abspath(db_path)
+
+
+def open_connection(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """Open a new, fully configured connection that is not shared."""
+    try:
+        conn = sqlite3.connect(
+            db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            cached_statements=STATEMENT_CACHE_SIZE,
+            uri=db_path.startswith("file:"),
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"PRAGMA busy_timeout = {int(BUSY_TIMEOUT_SECONDS * 1000)}")
+
+        journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        if journal_mode.lower() != "wal" and db_path != ":memory:":
+            logger.warning(f"Could not enable WAL journaling for {db_path} (mode: {journal_mode})")
+
+        # WAL makes NORMAL durable across application crashes and much cheaper than FULL
+        conn.execute("PRAGMA synchronous = NORMAL")
+        return conn
+    except sqlite3.Error as e:
+        logger.error(f"Database connection error: {e}")
+        raise
+
+
+def _thread_connections() -> Dict[Tuple[int, str], sqlite3.Connection]:
+    """
+    This thread's shared connections by key.
+
+    If close_all_connections ran since they were opened they are closed
+    here, in their own thread, and forgotten.
+    """
+    if getattr(_local, "generation", None) != _generation:
+        for conn in getattr(_local, "connections", {}).values():
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        _local.connections = {}
+        _local.generation = _generation
+    return _local.connections
+
+
+def get_connection(db_path: str = DEFAULT_DB_PATH) -> sqlite3.Connection:
+    """
+    Return the shared connection for ``db_path``, opening it on first use.
+
+    Callers must not close the returned connection; use it as a context
+    manager to scope a transaction instead.
+    """
+    connections = _thread_connections()
+    key = _connection_key(db_path)
+    conn = connections.get(key)
+    if conn is None:
+        conn = open_connection(db_path)
+        connections[key] = conn
+        with _registry_lock:
+            _open_connections.append(conn)
+        logger.debug(f"Opened shared database connection to {db_path}")
+    return conn
+
+
+def close_connection(db_path: str = DEFAULT_DB_PATH) -> None:
+    """Close this thread's shared connection for ``db_path`` if one is open."""
+    conn = _thread_connections().pop(_connection_key(db_path), None)
+    if conn is not None:
+        with _registry_lock:
+            if conn in _open_connections:
+                _open_connections.remove(conn)
+        conn.close()
+
+
+def close_all_connections() -> None:
+    """
+    Close every shared connection opened by this process.
+
+    sqlite3 only lets a connection be closed by the thread that opened it:
+    this thread's connections are closed now, and every other thread closes
+    its own on its next get_connection or close_connection, which then
+    opens a fresh one.
+    """
+    global _generation
+    with _registry_lock:
+        _generation += 1
+        connections = list(_open_connections)
+        _open_connections.clear()
+    for conn in connections:
+        try:
+            conn.close()
+        except sqlite3.Error:  # ProgrammingError: owned by another thread
+            pass
+    _thread_connections()
+
+
+atexit.register(close_all_connections)
@@ -0,0 +1,240 @@
+"""
+Shared HTTP client for every external call in the pipeline.
+
+The scrapers used to call the module-level ``requests.get`` (a new TCP and
+TLS handshake per profile), and the liker and poster had no retry policy,
+so one transient 429 or 5xx permanently failed a like or comment.
+``HttpClient`` wraps one pooled, keep-alive ``httpx.Client`` (HTTP/2 when
+the optional ``h2`` package is installed) and applies a single policy:
+
+* retries with exponential backoff and full jitter, honouring
+  ``Retry-After`` given either in seconds or as an HTTP-date;
+* a timeout per host, so a slow third-party API cannot stall calls to
+  LinkedIn;
+* per-endpoint metrics: request count, retries, transport errors,
+  response statuses and latency.
+
+Requests that are not idempotent (comment POSTs) are retried conservatively:
+only after a 429 or a connection failure, where the server cannot have
+acted on them. Server errors and read timeouts are retried only for
+idempotent requests, because a duplicate comment is worse than a failed one.
+"""
+
+import importlib.util
+import logging
+import random
+import time
+from collections import Counter as StatusCounter
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, List, Mapping, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 30.0
+CONNECT_TIMEOUT_SECONDS = 10.0
+DEFAULT_MAX_RETRIES = 3
+DEFAULT_BACKOFF_BASE_SECONDS = 0.5
+DEFAULT_BACKOFF_CAP_SECONDS = 30.0
+# Wait after a 429 that carries no usable Retry-After header
+DEFAULT_RETRY_AFTER_SECONDS = 1.0
+# Longest Retry-After honoured; beyond it the response is returned as is
+MAX_RETRY_AFTER_SECONDS = 120.0
+POOL_SIZE = 10
+
+# Per-host timeouts in seconds; a client's own ``timeouts`` override these
+HOST_TIMEOUTS = {
+    "api.linkedin.com": 20.0,
+    "real-time-data-enrichment.p.rapidapi.com": 30.0,
+}
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+
+def http2_available() -> bool:
+    """True when the optional ``h2`` package needed for HTTP/2 is installed."""
+    return importlib.util.find_spec("h2") is not None
+
+
+def retry_after_seconds(response: httpx.Response, default: float = DEFAULT_RETRY_AFTER_SECONDS) -> float:
+    """Seconds to wait from a ``Retry-After`` header given in seconds or as an HTTP-date."""
+    value = response.headers.get("Retry-After", "").strip()
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def backoff_seconds(attempt: int, base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+                    cap: float = DEFAULT_BACKOFF_CAP_SECONDS) -> float:
+    """Full-jitter exponential backoff before retry number ``attempt`` (0-based)."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class EndpointStats:
+    """Counters and latency for one named endpoint."""
+
+    def __init__(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.statuses: StatusCounter = StatusCounter()
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def record(self, seconds: float, status: Optional[int]) -> None:
+        self.requests += 1
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        if status is None:
+            self.errors += 1
+        else:
+            self.statuses[status] += 1
+
+    def as_dict(self) -> Dict:
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'statuses': dict(sorted(self.statuses.items())),
+            'avg_ms': round(self.total_seconds / self.requests * 1000, 1) if self.requests else 0.0,
+            'max_ms': round(self.max_seconds * 1000, 1),
+        }
+
+
+class HttpClient:
+    """
+    Pooled HTTP client with the pipeline's retry policy and metrics.
+
+    ``timeouts`` maps host names to a timeout in seconds, on top of
+    ``HOST_TIMEOUTS``; other hosts get ``default_timeout``. ``endpoint``
+    names passed to ``request`` group the metrics (URLs that embed post
+    URNs would otherwise never repeat); the default is
+    ``"METHOD host/path"``.
+    """
+
+    def __init__(self, headers: Optional[Mapping[str, str]] = None,
+                 timeouts: Optional[Mapping[str, float]] = None,
+                 default_timeout: float = DEFAULT_TIMEOUT_SECONDS,
+                 max_retries: int = DEFAULT_MAX_RETRIES,
+                 backoff_base: float = DEFAULT_BACKOFF_BASE_SECONDS,
+                 backoff_cap: float = DEFAULT_BACKOFF_CAP_SECONDS,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.timeouts = {**HOST_TIMEOUTS, **(timeouts or {})}
+        self.default_timeout = default_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._sleep = sleep
+        self._stats: Dict[str, EndpointStats] = {}
+        self._client = httpx.Client(
+            headers=dict(headers or {}),
+            http2=http2_available(),
+            limits=httpx.Limits(max_connections=POOL_SIZE, max_keepalive_connections=POOL_SIZE),
+        )
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self) -> "HttpClient":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def timeout_for(self, url: str) -> httpx.Timeout:
+        seconds = self.timeouts.get(urlsplit(url).hostname or "", self.default_timeout)
+        return httpx.Timeout(seconds, connect=min(seconds, CONNECT_TIMEOUT_SECONDS))
+
+    def _retry_delay(self, response: Optional[httpx.Response], error: Optional[httpx.TransportError],
+                     attempt: int, idempotent: bool) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the outcome is final."""
+        if response is not None:
+            if response.status_code == 429:
+                delay = retry_after_seconds(response, default=backoff_seconds(
+                    attempt, max(self.backoff_base, DEFAULT_RETRY_AFTER_SECONDS), self.backoff_cap))
+                return delay if delay <= MAX_RETRY_AFTER_SECONDS else None
+            if idempotent and response.status_code in RETRY_STATUSES:
+                return backoff_seconds(attempt, self.backoff_base, self.backoff_cap)
+            return None
+        # Connection failures never reached the server, so any request may be resent
+        if idempotent or isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout)):
+            return backoff_seconds(attempt, self.backoff_base, self.backoff_cap)
+        return None
+
+    def request(self, method: str, url: str, *, endpoint: Optional[str] = None,
+                idempotent: Optional[bool] = None, **kwargs) -> httpx.Response:
+        """
+        Send a request under the retry policy and return the final response.
+
+        Status codes are not raised; a transport error is re-raised once the
+        retries are spent (or immediately when resending is unsafe).
+        ``idempotent`` defaults from the method. Other keyword arguments go
+        to ``httpx.Client.request``.
+        """
+        method = method.upper()
+        if idempotent is None:
+            idempotent = method in IDEMPOTENT_METHODS
+        if endpoint is None:
+            parts = urlsplit(url)
+            endpoint = f"{method} {parts.hostname}{parts.path}"
+        stats = self._stats.setdefault(endpoint, EndpointStats())
+        kwargs.setdefault("timeout", self.timeout_for(url))
+
+        attempt = 0
+        while True:
+            response, error = None, None
+            start = time.monotonic()
+            try:
+                response = self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                error = e
+            stats.record(time.monotonic() - start, response.status_code if response is not None else None)
+
+            delay = self._retry_delay(response, error, attempt, idempotent) if attempt < self.max_retries else None
+            if delay is None:
+                if error is not None:
+                    raise error
+                return response
+
+            outcome = response.status_code if response is not None else type(error).__name__
+            logger.warning(f"{endpoint}: {outcome}, retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+            stats.retries += 1
+            attempt += 1
+            self._sleep(delay)
+
+    def get(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> httpx.Response:
+        return self.request("POST", url, **kwargs)
+
+    def metrics(self) -> Dict[str, Dict]:
+        """Per-endpoint metrics: requests, retries, errors, statuses, avg/max latency."""
+        return {endpoint: stats.as_dict() for endpoint, stats in sorted(self._stats.items())}
+
+    def log_metrics(self) -> None:
+        for line in format_metrics(self.metrics()):
+            logger.info(line)
+
+
+def format_metrics(metrics: Dict[str, Dict]) -> List[str]:
+    """One summary line per endpoint."""
+    return [
+        f"{endpoint}: {m['requests']} requests, {m['retries']} retries, {m['errors']} errors, "
+        f"statuses {m['statuses']}, avg {m['avg_ms']}ms, max {m['max_ms']}ms"
+        for endpoint, m in metrics.items()
+    ]
@@ -0,0 +1,114 @@
+"""
+On-disk cache of the LinkedIn identity behind an access token.
+
+The liker and comment poster start every batch with a ``/v2/userinfo`` call
+just to learn the member ``sub``, and the cron sequence runs both against
+the same token. ``IdentityCache`` stores the userinfo answer in a small
+JSON file keyed by the SHA-256 of the token (the token itself is never
+written), so a warm start skips the round trip. An entry expires after
+``ttl_seconds`` or at the token's own expiry, whichever comes first, and
+callers invalidate it when LinkedIn answers 401.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+CACHE_FILE_NAME = ".linkedin_identity_cache.json"
+
+
+def token_key(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def parse_token_expiry(value: Optional[str]) -> Optional[float]:
+    """Parse a token expiry given as epoch seconds or an ISO 8601 timestamp (None if unset or invalid)."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        logger.warning(f"Ignoring unparseable token expiry: {value!r}")
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class IdentityCache:
+    """Token-hash -> userinfo entries in a JSON file, each with an expiry time."""
+
+    def __init__(self, path: Union[str, Path], ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 token_expires_at: Optional[float] = None, clock: Callable[[], float] = time.time):
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.token_expires_at = token_expires_at
+        self._clock = clock
+
+    def _load(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable identity cache {self.path}: {e}")
+            return {}
+
+    def _save(self, entries: Dict[str, Dict]) -> None:
+        # Write-then-rename so a concurrent reader never sees a partial file
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(entries, f)
+        os.replace(tmp_path, self.path)
+
+    def get(self, token: str) -> Optional[Dict]:
+        """Return the cached userinfo for ``token``, or None when missing or expired."""
+        if self.ttl_seconds <= 0:
+            return None
+        entry = self._load().get(token_key(token))
+        if not entry or entry.get("expires_at", 0) <= self._clock():
+            return None
+        return entry.get("user_data")
+
+    def put(self, token: str, user_data: Dict) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        now = self._clock()
+        expires_at = now + self.ttl_seconds
+        if self.token_expires_at is not None:
+            expires_at = min(expires_at, self.token_expires_at)
+        if expires_at <= now:
+            return
+        # Drop expired entries of rotated tokens while rewriting the file
+        entries = {key: entry for key, entry in self._load().items() if entry.get("expires_at", 0) > now}
+        entries[token_key(token)] = {"user_data": user_data, "expires_at": expires_at}
+        try:
+            self._save(entries)
+        except OSError as e:
+            logger.warning(f"Could not write identity cache {self.path}: {e}")
+
+    def invalidate(self, token: str) -> None:
+        """Forget ``token``'s identity (after a 401)."""
+        entries = self._load()
+        if entries.pop(token_key(token), None) is None:
+            return
+        logger.info("Invalidated cached LinkedIn identity after an authentication failure")
+        try:
+            self._save(entries)
+        except OSError as e:
+            logger.warning(f"Could not write identity cache {self.path}: {e}")
@@ -0,0 +1,307 @@
+"""
+Job title scoring and role classification shared by the profile importer
+and the rescore command.
+
+The tiered keyword rules are compiled into one regular expression. Every
+keyword is wrapped in a lookahead so a single ``finditer`` pass reports each
+keyword that occurs anywhere in the title (including overlapping ones, and
+plain substrings such as ``pm`` inside ``apm``), which keeps the semantics of
+the original ``any(word in title ...)`` chain. Alternatives are ordered by
+score, so the best-scoring keyword starting at a position is the one
+reported there, and the title's score is the best of all reported keywords.
+
+Role categories use the same scheme: the category of the earliest rule in
+ROLE_CATEGORY_RULES that matches wins. Keywords in WHOLE_WORD_ROLE_KEYWORDS
+only match as a word (``product`` but not ``production``). Categories are
+stored in the indexed
+``profiles.role_category`` column so cohort and invitation queries are
+equality lookups instead of ``LOWER(job_title) LIKE`` scans.
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Job title keywords by score; a title gets the score of its best tier
+JOB_TITLE_TIERS: List[Tuple[int, List[str]]] = [
+    # Tier 1: Product Leadership & Recruiters (Highest Priority)
+    (10, ['chief product officer', 'cpo', 'vp of product', 'head of product', 'director of product', 'product recruiter']),
+    # Tier 2: Senior Product Managers
+    (8, ['senior product manager', 'principal product manager', 'lead product manager']),
+    # Tier 3: Product Managers
+    (6, ['product manager', 'pm']),
+    # Tier 4: Adjacent & Junior Product Roles
+    (4, ['associate product manager', 'apm', 'product owner', 'product marketing']),
+    # Tier 5: General Tech Leadership
+    (2, ['cto', 'vp of engineering', 'director of engineering', 'recruiter', 'talent acquisition']),
+    # Tier 6: Non-Relevant Roles (Explicitly de-prioritized)
+    (1, ['sales', 'account executive', 'marketing', 'finance', 'accountant',
+         'human resources', 'customer success', 'operations', 'legal', 'counsel']),
+]
+
+# Score for empty titles and titles matching no tier
+DEFAULT_JOB_TITLE_SCORE = 1
+
+# Role categories in priority order; the first rule with a matching keyword wins.
+# The rules up to 'recruiting' are the exclusion list of the Week3_to_invite
+# playbook, so they rank above 'product' (the 1st-connection cohort's other
+# product roles) and 'technical': a title matching any exclusion is excluded.
+ROLE_CATEGORY_RULES: List[Tuple[str, List[str]]] = [
+    ('product_management', ['product manag', 'product officer', 'product owner', 'head of product']),
+    ('founder', ['founder', 'entrepreneur']),
+    ('exec', ['ceo', 'chief executive officer', 'chief operating officer', 'chief financial officer',
+              'chief marketing officer', 'chief revenue officer', 'managing director',
+              'general manager', 'general partner', 'managing partner']),
+    ('sales', ['business develop', 'vp of sales', 'director of sales', 'head of sales',
+               'sales director', 'sales manager', 'account executive', 'client partner',
+               'strategic account']),
+    ('marketing', ['vp of marketing', 'director of marketing', 'head of marketing',
+                   'marketing director', 'marketing manager']),
+    ('recruiting', ['recruit', 'talent acquisition', 'headhunter', 'sourcer']),
+    ('product', ['product']),
+    ('technical', ['engineer', 'developer', 'architect', 'software', 'data scien',
+                   'machine learning', 'devops', 'programmer', 'chief technology officer',
+                   'technical', 'technology']),
+]
+
+# Role keywords matched as whole words (an optional plural 's' allowed)
+WHOLE_WORD_ROLE_KEYWORDS = frozenset({'product'})
+
+# Category for titles that match no rule; profiles without a title get NULL
+DEFAULT_ROLE_CATEGORY = 'other'
+
+# Categories of the 1st-connection product cohort and of Week3_to_invite invitees
+PRODUCT_ROLE_CATEGORIES = ('product_management', 'product')
+INVITABLE_ROLE_CATEGORIES = ('product', 'technical', 'other')
+
+# Profiles read and compared per chunk by rescore_profiles
+RESCORE_CHUNK_SIZE = 10_000
+
+
+def _keyword_scores(tiers: List[Tuple[int, List[str]]]) -> Dict[str, int]:
+    """Map each keyword to the value of the first tier that lists it."""
+    scores: Dict[str, int] = {}
+    for score, keywords in tiers:
+        for keyword in keywords:
+            scores.setdefault(keyword, score)
+    return scores
+
+
+def _lookahead_pattern(keywords: List[str], whole_words: frozenset = frozenset()) -> "re.Pattern":
+    """
+    Compile keywords, in priority order, into one overlapping-match pattern.
+
+    Group 1 of every match is the keyword itself; keywords in ``whole_words``
+    only match between word boundaries.
+    """
+    def alternative(keyword: str) -> str:
+        if keyword in whole_words:
+            return r"\b{}(?=s?\b)".format(re.escape(keyword))
+        return re.escape(keyword)
+
+    return re.compile("(?=({}))".format("|".join(alternative(keyword) for keyword in keywords)))
+
+
+KEYWORD_SCORES = _keyword_scores(JOB_TITLE_TIERS)
+
+JOB_TITLE_PATTERN = _lookahead_pattern(
+    sorted(KEYWORD_SCORES, key=lambda keyword: -KEYWORD_SCORES[keyword])
+)
+
+# Lower rank wins; ranks index into ROLE_CATEGORY_RULES
+ROLE_KEYWORD_RANKS = _keyword_scores(
+    [(rank, keywords) for rank, (_, keywords) in enumerate(ROLE_CATEGORY_RULES)]
+)
+
+ROLE_PATTERN = _lookahead_pattern(sorted(ROLE_KEYWORD_RANKS, key=ROLE_KEYWORD_RANKS.get), WHOLE_WORD_ROLE_KEYWORDS)
+
+
+def score_job_title(title: Optional[str]) -> int:
+    """Score one job title (case-insensitive substring match against the tiers)."""
+    if not isinstance(title, str) or not title:
+        return DEFAULT_JOB_TITLE_SCORE
+    return max(
+        (KEYWORD_SCORES[match.group(1)] for match in JOB_TITLE_PATTERN.finditer(title.lower())),
+        default=DEFAULT_JOB_TITLE_SCORE,
+    )
+
+
+def classify_role(title: Optional[str]) -> Optional[str]:
+    """Return the role category for one job title, or None without a title."""
+    if not isinstance(title, str):
+        return None
+    ranks = [ROLE_KEYWORD_RANKS[match.group(1)] for match in ROLE_PATTERN.finditer(title.lower())]
+    return ROLE_CATEGORY_RULES[min(ranks)][0] if ranks else DEFAULT_ROLE_CATEGORY
+
+
+def _best_match_per_title(titles, pattern: "re.Pattern", values: Dict[str, int], best: str):
+    """
+    Match each distinct lowercased title once and reduce its keyword values.
+
+    Returns ``(codes, reduced)``: factorize codes per row (-1 for missing
+    titles) and a float array, indexed by code, holding the ``best``
+    (``'max'`` or ``'min'``) value of the keywords found, NaN if none.
+    """
+    import pandas as pd
+
+    codes, uniques = pd.factorize(titles.astype('string').str.lower())
+    if not len(uniques):
+        return codes, pd.Series([], dtype='float64').to_numpy()
+
+    matches = pd.Series(uniques, dtype='string').str.extractall(pattern)[0].map(values)
+    reduced = getattr(matches.groupby(level=0), best)().reindex(range(len(uniques)))
+    return codes, reduced.to_numpy(dtype='float64')
+
+
+def score_job_titles(titles):
+    """
+    Score a pandas Series of job titles, returning an int64 Series.
+
+    Each distinct title is matched once with the compiled pattern, so
+    exports where many profiles share a title cost far less than one match
+    per row.
+    """
+    import pandas as pd
+
+    codes, best_scores = _best_match_per_title(titles, JOB_TITLE_PATTERN, KEYWORD_SCORES, 'max')
+    scores = pd.Series(DEFAULT_JOB_TITLE_SCORE, index=titles.index, dtype='int64')
+    known = codes >= 0
+    matched = best_scores[codes[known]]
+    scores[known] = pd.Series(matched).fillna(DEFAULT_JOB_TITLE_SCORE).astype('int64').to_numpy()
+    return scores
+
+
+def classify_roles(titles):
+    """Classify a pandas Series of job titles into role categories (None without a title)."""
+    import pandas as pd
+
+    codes, best_ranks = _best_match_per_title(titles, ROLE_PATTERN, ROLE_KEYWORD_RANKS, 'min')
+    unique_categories = [
+        DEFAULT_ROLE_CATEGORY if rank != rank else ROLE_CATEGORY_RULES[int(rank)][0]  # NaN: no rule matched
+        for rank in best_ranks
+    ]
+    return pd.Series(
+        [unique_categories[code] if code >= 0 else None for code in codes],
+        index=titles.index, dtype=object,
+    )
+
+
+def ensure_role_categories(conn: sqlite3.Connection, chunk_size: int = RESCORE_CHUNK_SIZE) -> int:
+    """
+    Add ``profiles.role_category`` if missing and classify unclassified rows.
+
+    Only profiles with a job title but no category are touched, so this is
+    a cheap no-op once every profile has been classified at import time.
+    Returns the number of profiles classified.
+    """
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(profiles)")}
+    if not columns:
+        return 0
+    if 'role_category' not in columns:
+        with conn:
+            conn.execute("ALTER TABLE profiles ADD COLUMN role_category TEXT")
+
+    last_profile_id = 0
+    classified = 0
+    while True:
+        rows = conn.execute("""
+            SELECT profile_id, job_title FROM profiles
+            WHERE role_category IS NULL AND job_title IS NOT NULL AND profile_id > ?
+            ORDER BY profile_id
+            LIMIT ?
+        """, (last_profile_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_profile_id = rows[-1][0]
+
+        import pandas as pd
+
+        chunk = pd.DataFrame([tuple(row) for row in rows], columns=['profile_id', 'job_title'])
+        with conn:
+            conn.executemany(
+                "UPDATE profiles SET role_category = ? WHERE profile_id = ?",
+                zip(classify_roles(chunk['job_title']).tolist(), chunk['profile_id'].tolist()),
+            )
+        classified += len(chunk)
+
+    if classified:
+        logger.info(f"Classified role_category for {classified} profiles")
+    return classified
+
+
+def reclassify_roles(conn: sqlite3.Connection) -> int:
+    """
+    Recompute role_category for every profile with a job title; return the rows changed.
+
+    Classifies each distinct title once with classify_role, so it needs no
+    pandas and can run as a schema migration when the rules change.
+    """
+    titles = [row[0] for row in conn.execute("SELECT DISTINCT job_title FROM profiles WHERE job_title IS NOT NULL")]
+    changed = 0
+    for title in titles:
+        category = classify_role(title)
+        changed += conn.execute(
+            "UPDATE profiles SET role_category = ? WHERE job_title = ? AND role_category IS NOT ?",
+            (category, title, category),
+        ).rowcount
+    if changed:
+        logger.info(f"Reclassified role_category for {changed} profiles")
+    return changed
+
+
+def rescore_profiles(conn: sqlite3.Connection, chunk_size: int = RESCORE_CHUNK_SIZE) -> Dict[str, int]:
+    """
+    Recompute job_title_score, priority_score and role_category for every profile.
+
+    Profiles are read in keyset-paginated chunks and scored with
+    score_job_titles and classify_roles; only rows whose stored values
+    differ are updated, one transaction per chunk. Returns counts of
+    profiles scanned and updated.
+    """
+    import pandas as pd
+
+    last_profile_id = 0
+    results = {'profiles_scanned': 0, 'profiles_updated': 0}
+
+    while True:
+        rows = conn.execute("""
+            SELECT profile_id, job_title, job_title_score, priority_score, role_category FROM profiles
+            WHERE profile_id > ?
+            ORDER BY profile_id
+            LIMIT ?
+        """, (last_profile_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_profile_id = rows[-1][0]
+
+        chunk = pd.DataFrame(
+            [tuple(row) for row in rows],
+            columns=['profile_id', 'job_title', 'job_title_score', 'priority_score', 'role_category'],
+        )
+        chunk['new_score'] = score_job_titles(chunk['job_title'])
+        chunk['new_category'] = classify_roles(chunk['job_title'])
+        changed = chunk[
+            chunk['job_title_score'].ne(chunk['new_score'])
+            | chunk['priority_score'].ne(chunk['new_score'])
+            | chunk['role_category'].fillna('').ne(chunk['new_category'].fillna(''))
+        ]
+
+        if len(changed):
+            with conn:
+                conn.executemany(
+                    "UPDATE profiles SET job_title_score = ?, priority_score = ?, role_category = ? "
+                    "WHERE profile_id = ?",
+                    zip(
+                        changed['new_score'].tolist(), changed['new_score'].tolist(),
+                        changed['new_category'].tolist(), changed['profile_id'].tolist(),
+                    ),
+                )
+
+        results['profiles_scanned'] += len(chunk)
+        results['profiles_updated'] += len(changed)
+
+    logger.info(f"Rescored {results['profiles_scanned']} profiles, {results['profiles_updated']} changed")
+    return results
@@ -0,0 +1,120 @@
+"""
+Leased work-queue claims on profiles, posts and comments.
+
+Selecting work (``status = 'not_started'``, ``week1_liking`` posts, queued
+comments) and marking it done used to be separate, unguarded steps, so two
+scrapers or two likers would pick the same rows and double-hit the API.
+Every queue query now skips rows leased by another worker, and the rows it
+returns are claimed with one guarded ``UPDATE ... RETURNING`` that only
+succeeds for rows that are free, expired or already held by the caller, so
+of two workers racing for a row exactly one gets it. Workers renew their
+leases (``heartbeat``) while a batch runs and release them when it ends; a
+worker that dies leaves leases that simply expire after ``lease_seconds``.
+"""
+
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE_SECONDS = 15 * 60
+
+# Leased table -> primary key
+LEASED_TABLES = {
+    "profiles": "profile_id",
+    "posts": "post_id",
+    "comments": "comment_id",
+}
+
+# Bound parameters per claim, below SQLite's historical 999 limit
+CLAIM_CHUNK_SIZE = 500
+
+
+def default_owner() -> str:
+    """Lease owner naming this process: ``host:pid:random``."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+class WorkLease:
+    """One worker's leases on the rows of a work-queue table."""
+
+    def __init__(self, conn: sqlite3.Connection, table: str, owner: Optional[str] = None,
+                 lease_seconds: float = DEFAULT_LEASE_SECONDS, clock: Callable[[], float] = time.time):
+        if table not in LEASED_TABLES:
+            raise ValueError(f"{table} has no lease columns")
+        self.conn = conn
+        self.table = table
+        self.key = LEASED_TABLES[table]
+        self.owner = owner or default_owner()
+        self.lease_seconds = lease_seconds
+        self._clock = clock
+        self._renewed_at: Optional[float] = None
+
+    def params(self) -> Tuple[str, float]:
+        """
+        ``(owner, now)`` for the lease test of a queue query, written as
+        ``(lease_owner IS NULL OR lease_owner = ? OR lease_expires_at <= ?)``.
+        """
+        return self.owner, self._clock()
+
+    def claim(self, keys: Iterable[int]) -> Set[int]:
+        """Lease the rows with these primary keys to this worker; return the keys it got."""
+        keys = list(dict.fromkeys(keys))
+        claimed: Set[int] = set()
+        if not keys:
+            return claimed
+        now = self._clock()
+        with self.conn:
+            for start in range(0, len(keys), CLAIM_CHUNK_SIZE):
+                chunk = keys[start:start + CLAIM_CHUNK_SIZE]
+                placeholders = ', '.join('?' * len(chunk))
+                rows = self.conn.execute(f"""
+                    UPDATE {self.table} SET lease_owner = ?, lease_expires_at = ?
+                    WHERE {self.key} IN ({placeholders})
+                      AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires_at <= ?)
+                    RETURNING {self.key}
+                """, (self.owner, now + self.lease_seconds, *chunk, self.owner, now)).fetchall()
+                claimed.update(row[0] for row in rows)
+        self._renewed_at = now
+        if len(claimed) < len(keys):
+            logger.info(f"Skipped {len(keys) - len(claimed)} {self.table} rows leased by other workers")
+        return claimed
+
+    def claim_rows(self, rows: List[Dict]) -> List[Dict]:
+        """Claim ``rows`` by their primary key and return, in order, the ones this worker got."""
+        claimed = self.claim(row[self.key] for row in rows)
+        return [row for row in rows if row[self.key] in claimed]
+
+    def heartbeat(self, force: bool = False) -> int:
+        """
+        Push back the expiry of every lease this worker holds; return the rows renewed.
+
+        Calls within a third of the lease period of the last claim or
+        renewal are skipped unless ``force`` is set, so callers can beat
+        once per item.
+        """
+        now = self._clock()
+        if not force and self._renewed_at is not None and now - self._renewed_at < self.lease_seconds / 3:
+            return 0
+        with self.conn:
+            renewed = self.conn.execute(
+                f"UPDATE {self.table} SET lease_expires_at = ? WHERE lease_owner = ?",
+                (now + self.lease_seconds, self.owner),
+            ).rowcount
+        self._renewed_at = now
+        return renewed
+
+    def release(self) -> int:
+        """Drop every lease this worker holds; return the rows released."""
+        with self.conn:
+            released = self.conn.execute(
+                f"UPDATE {self.table} SET lease_owner = NULL, lease_expires_at = NULL WHERE lease_owner = ?",
+                (self.owner,),
+            ).rowcount
+        self._renewed_at = None
+        return released
@@ -4,11 +4,13 @@ This is a placeholder implementation to make the project structure complete.
 """
 
 import logging
-import sqlite3
 from pathlib import Path
 from typing import Dict, Any, Optional
 import os
 
+from backend.counters import ensure_counters, read_counter
+from backend.database import get_connection
+
 logger = logging.getLogger(__name__)
 
 
@@ -22,7 +24,7 @@ class DatabaseService:
     def ensure_database_exists(self):
         """Ensure the database and required tables exist."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # Create posts table if it doesn't exist
@@ -52,28 +54,25 @@ class DatabaseService:
                 """)
                 
                 conn.commit()
-                logger.info(f"Database initialized at {self.db_path}")
+
+            # Trigger-maintained counters read by get_stats
+            if "graph_posts" not in ensure_counters(get_connection(self.db_path)):
+                logger.warning("Post counters are not installed (no posts.processed column); "
+                               "get_stats will report 0 posts")
+            logger.info(f"Database initialized at {self.db_path}")
                 
         except Exception as e:
             logger.error(f"Error initializing database: {e}")
             raise
     
     def get_stats(self) -> Dict[str, int]:
-        """Get database statistics."""
+        """Get database statistics from the pipeline counters."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("SELECT COUNT(*) FROM posts")
-                total_posts = cursor.fetchone()[0]
-                
-                cursor.execute("SELECT COUNT(*) FROM posts WHERE processed = 1")
-                processed_posts = cursor.fetchone()[0]
-                
-                return {
-                    "total_posts": total_posts,
-                    "processed_posts": processed_posts
-                }
+            conn = get_connection(self.db_path)
+            return {
+                "total_posts": read_counter(conn, "graph_posts", "total")[0],
+                "processed_posts": read_counter(conn, "graph_posts", "processed")[0],
+            }
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {"total_posts": 0, "processed_posts": 0}
@@ -81,7 +80,7 @@ class DatabaseService:
     def cleanup_profiles_without_comments(self) -> int:
         """Cleanup profiles that don't have generated comments."""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with get_connection(self.db_path) as conn:
                 cursor = conn.cursor()
                 
                 # This is a placeholder implementation
@@ -109,9 +108,9 @@ class LinkedInGraph:
     This is a placeholder implementation to make the project structure complete.
     """
     
-    def __init__(self):
+    def __init__(self, db_path: str = "linkedin_project_db.sqlite3"):
         """Initialize the LinkedIn graph."""
-        self.db_service = DatabaseService()
+        self.db_service = DatabaseService(db_path)
         logger.info("LinkedInGraph initialized")
     
     def get_stats(self) -> Dict[str, int]:
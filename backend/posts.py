@@ -0,0 +1,343 @@
+"""
+Helpers for post rows shared by the scrapers, liker and comment poster.
+
+``posts.posted_date_timestamp`` (epoch milliseconds, as returned by the
+RapidAPI ``postedDateTimestamp`` field) is the single source of truth for
+post recency. Every recency filter compares that integer column against a
+cutoff computed here, so the predicates stay sargable and can use the
+``posts`` indexes.
+"""
+
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+MS_PER_DAY = 86_400_000
+
+# Rows per chunk when backfilling timestamps for legacy rows
+BACKFILL_CHUNK_SIZE = 5000
+
+# posted_date_timestamp of legacy rows whose posted_date could not be parsed:
+# below every recency cutoff, and no longer NULL, so the backfill skips them
+UNPARSEABLE_POSTED_TIMESTAMP = -1
+
+# Bound parameters per IN (...) lookup, below SQLite's historical 999 limit
+URN_LOOKUP_CHUNK_SIZE = 500
+
+# Column order of the rows built by post_row
+POST_COLUMNS = (
+    'urn', 'profile_id', 'text', 'cleaned_text', 'category', 'media_type',
+    'media_url', 'post_url', 'processed_post_text', 'total_reaction_count',
+    'like_count', 'appreciation_count', 'empathy_count', 'interest_count',
+    'praise_count', 'comments_count', 'reposts_count', 'entertainments_count',
+    'posted_at', 'posted_date', 'scraped_date', 'ocr_text',
+    'poster_first_name', 'poster_last_name', 'poster_headline', 'poster_image_url',
+    'poster_linkedin_url', 'poster_public_id', 'article_title', 'article_subtitle',
+    'article_target_url', 'article_description', 'reshared', 'resharer_comment',
+    'share_url', 'content_type', 'posted_date_timestamp', 'reposted',
+)
+
+# Refreshed when a re-scrape sees a post that is already stored
+COUNTER_COLUMNS = (
+    'total_reaction_count', 'like_count', 'appreciation_count', 'empathy_count',
+    'interest_count', 'praise_count', 'entertainments_count', 'comments_count',
+)
+
+UPSERT_POST_SQL = (
+    f"INSERT INTO posts ({', '.join(POST_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(POST_COLUMNS))}) "
+    f"ON CONFLICT(urn) DO UPDATE SET "
+    + ", ".join(f"{column} = excluded.{column}" for column in COUNTER_COLUMNS)
+)
+
+UPSERT_MEDIA_SQL = """
+    INSERT INTO media (post_id, media_url, media_type) VALUES (?, ?, ?)
+    ON CONFLICT(post_id, media_url) DO UPDATE SET media_type = excluded.media_type
+"""
+
+
+def recency_cutoff_ms(days: int, now_ms: Optional[int] = None) -> int:
+    """Return the epoch-millisecond cutoff for posts newer than ``days`` days."""
+    if now_ms is None:
+        now_ms = int(time.time() * 1000)
+    return now_ms - int(days) * MS_PER_DAY
+
+
+def parse_posted_date_ms(posted_date: Optional[str]) -> Optional[int]:
+    """
+    Parse an API ``postedDate`` string to epoch milliseconds (UTC).
+
+    Handles the API's ``"2025-07-24 13:45:12.000 +0000 UTC"`` form as well as
+    plain ISO dates; returns None when the value cannot be parsed.
+    """
+    if not posted_date:
+        return None
+
+    text = str(posted_date).strip()
+    for length, fmt in ((19, "%Y-%m-%d %H:%M:%S"), (19, "%Y-%m-%dT%H:%M:%S"), (10, "%Y-%m-%d")):
+        try:
+            parsed = datetime.strptime(text[:length], fmt).replace(tzinfo=timezone.utc)
+            return int(parsed.timestamp() * 1000)
+        except ValueError:
+            continue
+    return None
+
+
+def posted_timestamp_ms(post: Dict) -> Optional[int]:
+    """Return a post's publication time in epoch ms from an API payload."""
+    timestamp = post.get('postedDateTimestamp')
+    if isinstance(timestamp, (int, float)) and timestamp > 0:
+        return int(timestamp)
+    if isinstance(timestamp, str) and timestamp.isdigit() and int(timestamp) > 0:
+        return int(timestamp)
+    return parse_posted_date_ms(post.get('postedDate'))
+
+
+def backfill_posted_timestamps(conn: sqlite3.Connection, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Fill ``posted_date_timestamp`` for rows stored before it was populated.
+
+    Rows are read in keyset-paginated chunks and their ``posted_date`` strings
+    parsed in one vectorized pandas call per chunk. Rows whose date cannot be
+    parsed get UNPARSEABLE_POSTED_TIMESTAMP, so later starts find nothing to
+    scan and do not import pandas. Returns the number of rows whose date was
+    filled.
+    """
+    candidates = conn.execute("""
+        SELECT COUNT(*) FROM posts
+        WHERE posted_date_timestamp IS NULL OR posted_date_timestamp = 0
+    """).fetchone()[0]
+    if not candidates:
+        return 0
+
+    import pandas as pd
+
+    epoch = pd.Timestamp("1970-01-01", tz="UTC")
+    last_post_id = 0
+    updated = 0
+    marked = 0
+
+    while True:
+        rows = conn.execute("""
+            SELECT post_id, posted_date FROM posts
+            WHERE (posted_date_timestamp IS NULL OR posted_date_timestamp = 0)
+              AND post_id > ?
+            ORDER BY post_id
+            LIMIT ?
+        """, (last_post_id, chunk_size)).fetchall()
+        if not rows:
+            break
+        last_post_id = rows[-1][0]
+
+        chunk = pd.DataFrame([tuple(row) for row in rows], columns=['post_id', 'posted_date'])
+        parsed = pd.to_datetime(
+            chunk['posted_date'].astype('string').str.slice(0, 19),
+            format='ISO8601', errors='coerce', utc=True,
+        )
+        chunk['posted_date_timestamp'] = (parsed - epoch) // pd.Timedelta(milliseconds=1)
+        unparseable = chunk['posted_date_timestamp'].isna()
+
+        with conn:
+            conn.executemany(
+                "UPDATE posts SET posted_date_timestamp = ? WHERE post_id = ?",
+                zip(chunk['posted_date_timestamp'].fillna(UNPARSEABLE_POSTED_TIMESTAMP).astype('int64').tolist(),
+                    chunk['post_id'].tolist()),
+            )
+        updated += int((~unparseable).sum())
+        marked += int(unparseable.sum())
+
+    if updated:
+        logger.info(f"Backfilled posted_date_timestamp for {updated} posts")
+    if marked:
+        logger.info(f"Marked {marked} posts with an unparseable posted_date")
+    return updated
+
+
+def _primary_media(post: Dict) -> Tuple[Optional[str], Optional[str]]:
+    """Return the (media_type, media_url) kept on the post row itself."""
+    if post.get('images'):
+        first = post['images'][0]
+        if isinstance(first, list):
+            return 'image', first[0].get('url') if first else None
+        return 'image', first.get('url')
+    if post.get('image'):
+        return 'image', post['image'][0].get('url')
+    if post.get('video'):
+        return 'video', post['video'][0].get('url')
+    if post.get('document'):
+        return 'document', post['document'].get('TranscribedDocumentUrl')
+    return None, None
+
+
+def post_row(post: Dict, profile_id: int, scraped_date: str) -> Tuple:
+    """Map one API post to a row in POST_COLUMNS order."""
+    author = post.get('author') or {}
+    article = post.get('article') or {}
+    profile_pictures = author.get('profilePictures') or []
+    media_type, media_url = _primary_media(post)
+    reshared = bool(post.get('resharedPost'))
+
+    return (
+        post.get('urn') or None,
+        profile_id,
+        post.get('text', ''),
+        None,                                   # cleaned_text
+        None,                                   # category
+        media_type,
+        media_url,
+        post.get('postUrl', ''),
+        None,                                   # processed_post_text
+        post.get('totalReactionCount', 0),
+        post.get('likeCount', 0),
+        post.get('appreciationCount', 0),
+        post.get('empathyCount', 0),
+        post.get('InterestCount', 0),
+        post.get('praiseCount', 0),
+        post.get('commentsCount', 0),
+        post.get('repostsCount', 0),
+        post.get('funnyCount', 0),              # entertainments_count
+        post.get('postedAt', ''),
+        post.get('postedDate', ''),
+        scraped_date,
+        None,                                   # ocr_text
+        author.get('firstName', ''),
+        author.get('lastName', ''),
+        author.get('headline', ''),
+        profile_pictures[0].get('url') if profile_pictures else '',
+        author.get('url', ''),
+        author.get('username', ''),
+        article.get('title', ''),
+        article.get('subtitle', ''),
+        article.get('link', ''),
+        '',                                     # article_description
+        reshared,
+        post.get('text', '') if reshared else '',  # resharer_comment
+        post.get('shareUrl', ''),
+        post.get('contentType', ''),
+        posted_timestamp_ms(post),
+        post.get('reposted', False),
+    )
+
+
+def media_items(post: Dict) -> List[Tuple[str, str]]:
+    """
+    Return every (media_url, media_type) attached to an API post.
+
+    Entries without a URL are dropped: the unique (post_id, media_url)
+    index treats NULLs as distinct, so each re-scrape would add them again.
+    """
+    items = []
+    for image_group in post.get('images') or []:
+        if isinstance(image_group, list):
+            items.extend((image.get('url'), 'image') for image in image_group)
+    items.extend((image.get('url'), 'image') for image in post.get('image') or [])
+    items.extend((video.get('url'), 'video') for video in post.get('video') or [])
+    document = post.get('document') or {}
+    items.append((document.get('TranscribedDocumentUrl'), 'document'))
+    return [(url, media_type) for url, media_type in items if url]
+
+
+def _post_ids_by_urn(conn: sqlite3.Connection, urns: Iterable[str]) -> Dict[str, int]:
+    """Look up post_id for each stored URN, chunked to bound the IN list."""
+    urns = list(urns)
+    found = {}
+    for start in range(0, len(urns), URN_LOOKUP_CHUNK_SIZE):
+        chunk = urns[start:start + URN_LOOKUP_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        found.update(
+            (row[0], row[1]) for row in conn.execute(
+                f"SELECT urn, post_id FROM posts WHERE urn IN ({placeholders})", chunk
+            )
+        )
+    return found
+
+
+def save_post_page(conn: sqlite3.Connection, posts: List[Dict], profile_id: int,
+                   known_urns: Optional[Set[str]] = None) -> int:
+    """
+    Upsert one API page of posts and their media in a single transaction.
+
+    The page is mapped to rows once and written with ``executemany``; post
+    IDs for the media rows are then resolved with one lookup by URN. Returns
+    the number of posts that were not already stored.
+
+    ``known_urns`` (from load_known_urns) spares the pre-write lookup for
+    URNs already in it: only the others are checked against the table. The
+    page's URNs are added to the set afterwards.
+    """
+    if not posts:
+        return 0
+
+    scraped_date = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    rows = [post_row(post, profile_id, scraped_date) for post in posts]
+    keyed_rows = {row[0]: (row, post) for row, post in zip(rows, posts) if row[0] is not None}
+    unkeyed = [(row, post) for row, post in zip(rows, posts) if row[0] is None]
+
+    with conn:
+        if known_urns is None:
+            existing = len(_post_ids_by_urn(conn, keyed_rows))
+        else:
+            unknown = [urn for urn in keyed_rows if urn not in known_urns]
+            existing = len(keyed_rows) - len(unknown) + len(_post_ids_by_urn(conn, unknown))
+        conn.executemany(UPSERT_POST_SQL, (row for row, _ in keyed_rows.values()))
+        # Only posts with media need their post_id back
+        media_by_urn = {urn: items for urn, (_, post) in keyed_rows.items() if (items := media_items(post))}
+        post_ids = _post_ids_by_urn(conn, media_by_urn)
+
+        media_rows = [
+            (post_ids[urn], url, media_type)
+            for urn, items in media_by_urn.items()
+            for url, media_type in items
+        ]
+        # Posts without a URN cannot be matched back, so take their rowid directly
+        for row, post in unkeyed:
+            post_id = conn.execute(UPSERT_POST_SQL, row).lastrowid
+            media_rows.extend((post_id, url, media_type) for url, media_type in media_items(post))
+
+        conn.executemany(UPSERT_MEDIA_SQL, media_rows)
+
+    if known_urns is not None:
+        known_urns.update(keyed_rows)
+    return len(keyed_rows) - existing + len(unkeyed)
+
+
+def load_known_urns(conn: sqlite3.Connection, profile_ids: Iterable[int]) -> Set[str]:
+    """Return the stored post URNs of ``profile_ids``, chunked to bound the IN list."""
+    profile_ids = list(profile_ids)
+    urns = set()
+    for start in range(0, len(profile_ids), URN_LOOKUP_CHUNK_SIZE):
+        chunk = profile_ids[start:start + URN_LOOKUP_CHUNK_SIZE]
+        placeholders = ', '.join('?' * len(chunk))
+        urns.update(
+            row[0] for row in conn.execute(
+                f"SELECT urn FROM posts WHERE profile_id IN ({placeholders}) AND urn IS NOT NULL", chunk
+            )
+        )
+    return urns
+
+
+def advance_post_watermark(conn: sqlite3.Connection, profile_id: int, posts: List[Dict]) -> Optional[int]:
+    """
+    Move the profile's watermark to the newest post in ``posts``.
+
+    ``profiles.posts_watermark_ts``/``posts_watermark_urn`` record the newest
+    post seen for the profile; a re-scrape stops paging once it reaches
+    them. The watermark only ever moves forward. Returns the newest
+    timestamp in ``posts`` (None when none has one).
+    """
+    dated = [(ts, post.get('urn')) for post in posts if (ts := posted_timestamp_ms(post)) is not None]
+    if not dated:
+        return None
+    newest_ts, newest_urn = max(dated, key=lambda item: item[0])
+    with conn:
+        conn.execute("""
+            UPDATE profiles
+            SET posts_watermark_ts = ?, posts_watermark_urn = ?
+            WHERE profile_id = ?
+              AND (posts_watermark_ts IS NULL OR posts_watermark_ts < ?)
+        """, (newest_ts, newest_urn, profile_id, newest_ts))
+    return newest_ts
@@ -0,0 +1,123 @@
+"""
+Persistent response cache for paid API calls.
+
+Re-running a scraper after a crash, or running both scrapers over
+overlapping profiles, used to call RapidAPI ``get-profile-posts`` again for
+usernames fetched minutes earlier. ``ResponseCache`` keeps successful
+response bodies in the ``api_response_cache`` table, zlib-compressed and
+keyed by ``(endpoint, *request parts)``. Entries older than the TTL are
+misses; once the stored bytes exceed ``max_bytes`` the least recently used
+entries are evicted.
+
+A cache built with ``enabled=False`` neither reads nor writes (``--no-cache``);
+``refresh=True`` skips reads but stores the fresh responses (``--refresh``).
+"""
+
+import json
+import logging
+import sqlite3
+import time
+import zlib
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 6 * 3600
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ResponseCache:
+    """TTL and size-bounded LRU cache of response bodies in SQLite."""
+
+    def __init__(self, conn: sqlite3.Connection, ttl_seconds: float = DEFAULT_TTL_SECONDS,
+                 max_bytes: int = DEFAULT_MAX_BYTES, enabled: bool = True, refresh: bool = False,
+                 clock: Callable[[], float] = time.time):
+        self.conn = conn
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.refresh = refresh
+        self._clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @staticmethod
+    def key(endpoint: str, *parts) -> str:
+        return json.dumps([endpoint, *[str(part) for part in parts]])
+
+    def get(self, endpoint: str, *parts) -> Optional[bytes]:
+        """Return the cached body for the request, or None on a miss."""
+        if not self.enabled:
+            return None
+        if self.refresh:
+            self.misses += 1
+            return None
+
+        key = self.key(endpoint, *parts)
+        now = self._clock()
+        row = self.conn.execute(
+            "SELECT body, fetched_at FROM api_response_cache WHERE cache_key = ?", (key,)
+        ).fetchone()
+        if row is None or now - row[1] > self.ttl_seconds:
+            self.misses += 1
+            return None
+
+        with self.conn:
+            self.conn.execute("UPDATE api_response_cache SET last_used_at = ? WHERE cache_key = ?", (now, key))
+        self.hits += 1
+        return zlib.decompress(row[0])
+
+    def put(self, endpoint: str, body: bytes, *parts) -> None:
+        """Store a response body, then evict LRU entries beyond ``max_bytes``."""
+        if not self.enabled:
+            return
+        compressed = zlib.compress(body)
+        now = self._clock()
+        with self.conn:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO api_response_cache
+                    (cache_key, endpoint, body, size, fetched_at, last_used_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (self.key(endpoint, *parts), endpoint, compressed, len(compressed), now, now))
+            # Keep the most recently used entries that fit in max_bytes
+            evicted = self.conn.execute("""
+                DELETE FROM api_response_cache
+                WHERE cache_key IN (
+                    SELECT cache_key FROM (
+                        SELECT cache_key,
+                               SUM(size) OVER (ORDER BY last_used_at DESC, cache_key) AS running_size
+                        FROM api_response_cache
+                    )
+                    WHERE running_size > ?
+                )
+            """, (self.max_bytes,)).rowcount
+        self.stores += 1
+        self.evictions += evicted
+        if evicted:
+            logger.debug(f"Evicted {evicted} cached responses over {self.max_bytes} bytes")
+
+    def purge_expired(self) -> int:
+        """Delete entries older than the TTL; return how many were removed."""
+        with self.conn:
+            return self.conn.execute(
+                "DELETE FROM api_response_cache WHERE fetched_at < ?", (self._clock() - self.ttl_seconds,)
+            ).rowcount
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stores': self.stores,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+
+    def summary(self) -> str:
+        if not self.enabled:
+            return "Response cache: disabled"
+        stats = self.stats()
+        return (f"Response cache: {stats['hits']} hits / {stats['hits'] + stats['misses']} lookups "
+                f"({stats['hit_rate']:.0%}), {stats['stores']} stored, {stats['evictions']} evicted")
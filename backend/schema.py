@@ -0,0 +1,657 @@
+"""
+Shared schema objects for the pipeline database.
+
+Every script brings the database up to date with ``migrate``: the table
+definitions live in TABLES and are applied through a versioned list of
+MIGRATIONS recorded in ``schema_version``, so a column added here is
+available to every script and hot-path SQL can be written statically
+instead of checking ``PRAGMA table_info`` per call. The module also owns
+the secondary indexes that back the work-queue queries and the
+trigger-maintained comment queue.
+"""
+
+import logging
+import sqlite3
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, NamedTuple, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Column and constraint definitions of the pipeline tables. New columns are
+# appended here, listed in ADDED_COLUMNS and added by their own migration.
+TABLES: Dict[str, List[str]] = {
+    "profiles": [
+        "profile_id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "first_name TEXT NOT NULL",
+        "last_name TEXT NOT NULL",
+        "username TEXT",
+        "profile_url TEXT NOT NULL",
+        "company_name TEXT",
+        "job_title TEXT",
+        "status TEXT DEFAULT 'not_started'",
+        "connection_status TEXT DEFAULT 'prospect'",
+        "job_title_score INTEGER DEFAULT 0",
+        "priority_score INTEGER DEFAULT 0",
+        "last_action_date DATE",
+        "weekly_batch INTEGER",
+        "daily_slot INTEGER",
+        "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "role_category TEXT",
+        "posts_watermark_ts INTEGER",
+        "posts_watermark_urn TEXT",
+        "lease_owner TEXT",
+        "lease_expires_at REAL",
+        "UNIQUE(profile_url, username)",
+    ],
+    "posts": [
+        "post_id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "urn TEXT",
+        "profile_id INTEGER NOT NULL",
+        "text TEXT",
+        "cleaned_text TEXT",
+        "category TEXT",
+        "media_type TEXT",
+        "media_url TEXT",
+        "post_url TEXT",
+        "processed_post_text TEXT",
+        "total_reaction_count INTEGER DEFAULT 0",
+        "like_count INTEGER DEFAULT 0",
+        "appreciation_count INTEGER DEFAULT 0",
+        "empathy_count INTEGER DEFAULT 0",
+        "interest_count INTEGER DEFAULT 0",
+        "praise_count INTEGER DEFAULT 0",
+        "comments_count INTEGER DEFAULT 0",
+        "reposts_count INTEGER DEFAULT 0",
+        "entertainments_count INTEGER DEFAULT 0",
+        "posted_at TEXT",
+        "posted_date TEXT",
+        "scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "ocr_text TEXT",
+        "poster_first_name TEXT",
+        "poster_last_name TEXT",
+        "poster_headline TEXT",
+        "poster_image_url TEXT",
+        "poster_linkedin_url TEXT",
+        "poster_public_id TEXT",
+        "article_title TEXT",
+        "article_subtitle TEXT",
+        "article_target_url TEXT",
+        "article_description TEXT",
+        "reshared BOOLEAN DEFAULT 0",
+        "resharer_comment TEXT",
+        "share_url TEXT",
+        "content_type TEXT",
+        "posted_date_timestamp INTEGER",
+        "reposted BOOLEAN DEFAULT 0",
+        "liked_to_linkedin_at TIMESTAMP",
+        "linkedin_like_id TEXT",
+        "linkedin_like_urn TEXT",
+        "is_post_liked BOOLEAN DEFAULT FALSE",
+        "like_failed BOOLEAN DEFAULT FALSE",
+        "lease_owner TEXT",
+        "lease_expires_at REAL",
+        "FOREIGN KEY (profile_id) REFERENCES profiles (profile_id)",
+    ],
+    "media": [
+        "media_id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "post_id INTEGER NOT NULL",
+        "media_url TEXT",
+        "media_type TEXT",
+        "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "FOREIGN KEY (post_id) REFERENCES posts (post_id)",
+    ],
+    "comments": [
+        "comment_id INTEGER PRIMARY KEY AUTOINCREMENT",
+        "post_id INTEGER NOT NULL",
+        "generated_comment TEXT NOT NULL",
+        "status TEXT DEFAULT 'GENERATED'",
+        "is_comment_posted BOOLEAN DEFAULT FALSE",
+        "posted_to_linkedin_at TIMESTAMP",
+        "linkedin_comment_id TEXT",
+        "linkedin_comment_urn TEXT",
+        "created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "lease_owner TEXT",
+        "lease_expires_at REAL",
+        "FOREIGN KEY (post_id) REFERENCES posts (post_id)",
+    ],
+    # How far each import file has been committed, for resuming (csv_profile_importer)
+    "import_progress": [
+        "import_key TEXT PRIMARY KEY",
+        "import_type TEXT NOT NULL",
+        "file_path TEXT NOT NULL",
+        "rows_read INTEGER DEFAULT 0",
+        "chunks_committed INTEGER DEFAULT 0",
+        "results TEXT",
+        "started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+        "updated_at TIMESTAMP",
+        "completed_at TIMESTAMP",
+    ],
+    # Thread URNs of posts whose activity URN LinkedIn rejects (backend.urns)
+    "urn_resolutions": [
+        "post_urn TEXT PRIMARY KEY",
+        "thread_urn TEXT NOT NULL",
+        "source TEXT NOT NULL",
+        "resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP",
+    ],
+    # Compressed API response bodies (backend.response_cache)
+    "api_response_cache": [
+        "cache_key TEXT PRIMARY KEY",
+        "endpoint TEXT NOT NULL",
+        "body BLOB NOT NULL",
+        "size INTEGER NOT NULL",
+        "fetched_at REAL NOT NULL",
+        "last_used_at REAL NOT NULL",
+    ],
+}
+
+_CONSTRAINT_PREFIXES = ("UNIQUE", "FOREIGN KEY", "PRIMARY KEY", "CHECK")
+
+# Columns added to existing tables, by the version of the migration that adds
+# them. Tables are created without these, so each step does what it records.
+ADDED_COLUMNS: Dict[int, Dict[str, Tuple[str, ...]]] = {
+    2: {
+        "posts": ("liked_to_linkedin_at", "linkedin_like_id", "linkedin_like_urn", "is_post_liked", "like_failed"),
+        "profiles": ("role_category",),
+    },
+    5: {"profiles": ("posts_watermark_ts", "posts_watermark_urn")},
+    7: {table: ("lease_owner", "lease_expires_at") for table in ("profiles", "posts", "comments")},
+}
+
+
+class IndexSpec(NamedTuple):
+    name: str
+    table: str
+    columns: Tuple[str, ...]
+    ddl: str
+
+
+INDEXES: List[IndexSpec] = [
+    # get_profiles_for_scraping and the 1st-connection cohort query, on the
+    # expression their keyset order uses (NULL scores sort last)
+    IndexSpec(
+        "idx_profiles_scrape_queue", "profiles",
+        ("status", "connection_status", "job_title_score"),
+        "CREATE INDEX IF NOT EXISTS idx_profiles_scrape_queue "
+        "ON profiles (status, connection_status, COALESCE(job_title_score, -1))",
+    ),
+    # Cohort and invitation lookups by precomputed role (backend.job_titles)
+    IndexSpec(
+        "idx_profiles_role_category", "profiles",
+        ("role_category", "status", "connection_status"),
+        "CREATE INDEX IF NOT EXISTS idx_profiles_role_category "
+        "ON profiles (role_category, status, connection_status)",
+    ),
+    # Maintenance re-scrape window and the scraped-today stat
+    IndexSpec(
+        "idx_profiles_last_action_date", "profiles",
+        ("last_action_date",),
+        "CREATE INDEX IF NOT EXISTS idx_profiles_last_action_date "
+        "ON profiles (last_action_date)",
+    ),
+    # profiles -> posts joins in the liker and poster, newest first
+    IndexSpec(
+        "idx_posts_profile_posted", "posts",
+        ("profile_id", "posted_date_timestamp"),
+        "CREATE INDEX IF NOT EXISTS idx_posts_profile_posted "
+        "ON posts (profile_id, posted_date_timestamp)",
+    ),
+    # Global recency counts and the posted_date_timestamp backfill
+    IndexSpec(
+        "idx_posts_posted_ts", "posts",
+        ("posted_date_timestamp",),
+        "CREATE INDEX IF NOT EXISTS idx_posts_posted_ts "
+        "ON posts (posted_date_timestamp)",
+    ),
+    # Only posts still waiting for a like; the WHERE must match get_posts_to_like
+    IndexSpec(
+        "idx_posts_unliked", "posts",
+        ("profile_id", "posted_date_timestamp", "is_post_liked"),
+        "CREATE INDEX IF NOT EXISTS idx_posts_unliked "
+        "ON posts (profile_id, posted_date_timestamp) "
+        "WHERE is_post_liked IS NULL OR is_post_liked = FALSE",
+    ),
+    # Only comments waiting to be posted
+    IndexSpec(
+        "idx_comments_generated", "comments",
+        ("post_id", "status"),
+        "CREATE INDEX IF NOT EXISTS idx_comments_generated "
+        "ON comments (post_id) WHERE status = 'GENERATED'",
+    ),
+    # Heartbeat and release of one worker's leases (backend.leases)
+    IndexSpec(
+        "idx_profiles_lease_owner", "profiles",
+        ("lease_owner",),
+        "CREATE INDEX IF NOT EXISTS idx_profiles_lease_owner "
+        "ON profiles (lease_owner) WHERE lease_owner IS NOT NULL",
+    ),
+    IndexSpec(
+        "idx_posts_lease_owner", "posts",
+        ("lease_owner",),
+        "CREATE INDEX IF NOT EXISTS idx_posts_lease_owner "
+        "ON posts (lease_owner) WHERE lease_owner IS NOT NULL",
+    ),
+    IndexSpec(
+        "idx_comments_lease_owner", "comments",
+        ("lease_owner",),
+        "CREATE INDEX IF NOT EXISTS idx_comments_lease_owner "
+        "ON comments (lease_owner) WHERE lease_owner IS NOT NULL",
+    ),
+    # LRU eviction order of the response cache
+    IndexSpec(
+        "idx_api_response_cache_lru", "api_response_cache",
+        ("last_used_at",),
+        "CREATE INDEX IF NOT EXISTS idx_api_response_cache_lru "
+        "ON api_response_cache (last_used_at)",
+    ),
+]
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> set:
+    """Return the column names of ``table`` (empty if it does not exist)."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> List[str]:
+    """
+    Create every index in INDEXES whose table and columns already exist.
+
+    ``migrate`` calls this once every table exists; indexes whose columns
+    are missing (a database that has not been migrated yet) are skipped.
+    Returns the names of the indexes in place.
+    """
+    columns_by_table = {}
+    ensured = []
+
+    for spec in INDEXES:
+        if spec.table not in columns_by_table:
+            columns_by_table[spec.table] = _table_columns(conn, spec.table)
+
+        missing = set(spec.columns) - columns_by_table[spec.table]
+        if missing:
+            logger.debug(f"Skipping index {spec.name}: {spec.table} lacks {sorted(missing)}")
+            continue
+
+        conn.execute(spec.ddl)
+        ensured.append(spec.name)
+
+    return ensured
+
+
+def _index_exists(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+    ).fetchone() is not None
+
+
+def migrate_unique_post_urns(conn: sqlite3.Connection) -> int:
+    """
+    Deduplicate ``posts`` by URN and add the unique indexes upserts rely on.
+
+    For every URN stored more than once the oldest row (lowest post_id) is
+    kept. Like state from any duplicate is carried over to it, comments and
+    media are repointed at it, duplicate media rows collapse to one per
+    ``(post_id, media_url)`` and the extra post rows are deleted. Empty-string
+    URNs become NULL so they never collide. Runs once; returns the number of
+    duplicate posts removed.
+    """
+    if _index_exists(conn, "ux_posts_urn"):
+        return 0
+
+    post_columns = _table_columns(conn, "posts")
+    has_media = bool(_table_columns(conn, "media"))
+    has_comments = bool(_table_columns(conn, "comments"))
+
+    with _transaction(conn):
+        conn.execute("UPDATE posts SET urn = NULL WHERE urn = ''")
+
+        conn.execute("DROP TABLE IF EXISTS temp.post_duplicates")
+        conn.execute("""
+            CREATE TEMP TABLE post_duplicates AS
+            SELECT post_id, keeper_id FROM (
+                SELECT post_id, MIN(post_id) OVER (PARTITION BY urn) AS keeper_id
+                FROM posts
+                WHERE urn IS NOT NULL
+            )
+            WHERE post_id != keeper_id
+        """)
+        removed = conn.execute("SELECT COUNT(*) FROM temp.post_duplicates").fetchone()[0]
+
+        if removed:
+            like_columns = ("is_post_liked", "liked_to_linkedin_at", "linkedin_like_id", "linkedin_like_urn")
+            if set(like_columns) <= post_columns:
+                conn.execute("""
+                    UPDATE posts
+                    SET (is_post_liked, liked_to_linkedin_at, linkedin_like_id, linkedin_like_urn) = (
+                        SELECT d.is_post_liked, d.liked_to_linkedin_at, d.linkedin_like_id, d.linkedin_like_urn
+                        FROM posts d
+                        JOIN temp.post_duplicates pd ON pd.post_id = d.post_id
+                        WHERE pd.keeper_id = posts.post_id AND d.is_post_liked
+                        ORDER BY d.liked_to_linkedin_at
+                        LIMIT 1
+                    )
+                    WHERE (is_post_liked IS NULL OR is_post_liked = FALSE)
+                      AND EXISTS (
+                        SELECT 1 FROM posts d
+                        JOIN temp.post_duplicates pd ON pd.post_id = d.post_id
+                        WHERE pd.keeper_id = posts.post_id AND d.is_post_liked
+                      )
+                """)
+
+            repoint = """
+                UPDATE {table}
+                SET post_id = (SELECT keeper_id FROM temp.post_duplicates WHERE post_id = {table}.post_id)
+                WHERE post_id IN (SELECT post_id FROM temp.post_duplicates)
+            """
+            if has_comments:
+                conn.execute(repoint.format(table="comments"))
+            if has_media:
+                conn.execute(repoint.format(table="media"))
+
+            conn.execute("DELETE FROM posts WHERE post_id IN (SELECT post_id FROM temp.post_duplicates)")
+
+        if has_media:
+            conn.execute("""
+                DELETE FROM media
+                WHERE media_id NOT IN (SELECT MIN(media_id) FROM media GROUP BY post_id, media_url)
+            """)
+            conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_media_post_url ON media (post_id, media_url)")
+
+        conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_posts_urn ON posts (urn)")
+        conn.execute("DROP TABLE temp.post_duplicates")
+
+    if removed:
+        logger.info(f"Removed {removed} duplicate posts and added unique URN index")
+    return removed
+
+
+@contextmanager
+def _transaction(conn: sqlite3.Connection) -> Iterator[None]:
+    """
+    Run a schema step in an explicit transaction, nested as a savepoint.
+
+    The sqlite3 module's default mode does not open a transaction for DDL,
+    so under a plain ``with conn:`` each CREATE/ALTER would commit on its own.
+    """
+    if conn.in_transaction:
+        conn.execute("SAVEPOINT schema_step")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK TO SAVEPOINT schema_step")
+            conn.execute("RELEASE SAVEPOINT schema_step")
+            raise
+        conn.execute("RELEASE SAVEPOINT schema_step")
+        return
+
+    conn.execute("BEGIN")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    conn.commit()
+
+
+def _column_name(definition: str) -> str:
+    return definition.split()[0]
+
+
+def _initial_definitions(table: str) -> List[str]:
+    """TABLES definitions of ``table`` without the columns ADDED_COLUMNS adds later."""
+    later = {column for columns in ADDED_COLUMNS.values() for column in columns.get(table, ())}
+    return [definition for definition in TABLES[table] if _column_name(definition) not in later]
+
+
+def _add_column(conn: sqlite3.Connection, table: str, definition: str) -> None:
+    column = _column_name(definition)
+    # ALTER TABLE cannot add keys, non-constant defaults or NOT NULL without a default
+    if "PRIMARY KEY" in definition:
+        raise sqlite3.OperationalError(f"{table} has no primary key column {column}")
+    addable = definition.replace(" DEFAULT CURRENT_TIMESTAMP", "").replace(" NOT NULL", "")
+    conn.execute(f"ALTER TABLE {table} ADD COLUMN {addable}")
+    logger.info(f"Added column {column} to {table} table")
+
+
+def _create_tables(*tables: str) -> Callable[[sqlite3.Connection], None]:
+    """
+    Migration creating ``tables`` with their initial columns.
+
+    Tables an older script version created already exist; they are given
+    the initial columns they lack (only the scrapers created some of them).
+    """
+    def apply(conn: sqlite3.Connection) -> None:
+        for table in tables:
+            definitions = _initial_definitions(table)
+            conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    " + ",\n    ".join(definitions) + "\n)")
+            existing = _table_columns(conn, table)
+            for definition in definitions:
+                if not definition.startswith(_CONSTRAINT_PREFIXES) and _column_name(definition) not in existing:
+                    _add_column(conn, table, definition)
+    return apply
+
+
+def _add_columns(version: int) -> Callable[[sqlite3.Connection], None]:
+    """
+    Migration adding the ADDED_COLUMNS of ``version``.
+
+    Columns that exist already (the liker used to add the like-tracking
+    columns itself, the importer created ``role_category``) are skipped.
+    """
+    def apply(conn: sqlite3.Connection) -> None:
+        for table, columns in ADDED_COLUMNS[version].items():
+            definitions = {_column_name(definition): definition for definition in TABLES[table]}
+            existing = _table_columns(conn, table)
+            for column in columns:
+                if column not in existing:
+                    _add_column(conn, table, definitions[column])
+    return apply
+
+
+def _reclassify_roles(conn: sqlite3.Connection) -> None:
+    """Migration recomputing role_category after the role rules changed."""
+    from backend.job_titles import reclassify_roles
+
+    reclassify_roles(conn)
+
+
+def _drop_indexes(*names: str) -> Callable[[sqlite3.Connection], None]:
+    """Migration dropping indexes that INDEXES replaced."""
+    def apply(conn: sqlite3.Connection) -> None:
+        for name in names:
+            conn.execute(f"DROP INDEX IF EXISTS {name}")
+    return apply
+
+
+class Migration(NamedTuple):
+    version: int
+    description: str
+    apply: Callable[[sqlite3.Connection], object]
+
+
+# Applied in order, once per database, each in its own transaction together
+# with its schema_version row. Migrations are also idempotent: a database
+# that predates schema_version runs all of them against tables the scripts
+# already created.
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create pipeline tables",
+              _create_tables("profiles", "posts", "media", "comments", "import_progress")),
+    Migration(2, "Add like-tracking and role_category columns", _add_columns(2)),
+    Migration(3, "Deduplicate posts by URN and add unique URN/media indexes", migrate_unique_post_urns),
+    Migration(4, "Create api_response_cache table", _create_tables("api_response_cache")),
+    Migration(5, "Add per-profile post watermark columns", _add_columns(5)),
+    Migration(6, "Create urn_resolutions table", _create_tables("urn_resolutions")),
+    Migration(7, "Add work-queue lease columns", _add_columns(7)),
+    Migration(8, "Replace idx_profiles_work_queue with the COALESCE scrape-queue index",
+              _drop_indexes("idx_profiles_work_queue")),
+    Migration(9, "Reclassify role_category with product_management and whole-word product roles",
+              _reclassify_roles),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1].version
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    """Return the highest migration version applied (0 for a new database)."""
+    if not _table_columns(conn, "schema_version"):
+        return 0
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Apply pending MIGRATIONS and the managed indexes; return the schema version.
+
+    Each migration runs in one transaction with its ``schema_version`` row,
+    so a failure leaves neither partial DDL nor a version behind, and
+    scripts starting against an up-to-date database only read one row.
+    """
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS schema_version (
+                version INTEGER PRIMARY KEY,
+                description TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    current = schema_version(conn)
+    for migration in MIGRATIONS:
+        if migration.version <= current:
+            continue
+        with _transaction(conn):
+            migration.apply(conn)
+            conn.execute(
+                "INSERT OR IGNORE INTO schema_version (version, description) VALUES (?, ?)",
+                (migration.version, migration.description),
+            )
+        logger.info(f"Applied schema migration {migration.version}: {migration.description}")
+        current = migration.version
+
+    with _transaction(conn):
+        ensure_indexes(conn)
+    return current
+
+
+# Rows of comment_queue: generated, unposted comments on posts (with a URN)
+# by profiles in week2_commenting. {key} narrows the refresh to one row set.
+_COMMENT_QUEUE_SELECT = """
+    SELECT c.comment_id, pr.profile_id, p.post_id,
+           COALESCE(pr.job_title_score, 0), p.posted_date_timestamp
+    FROM comments c
+    JOIN posts p ON p.post_id = c.post_id
+    JOIN profiles pr ON pr.profile_id = p.profile_id
+    WHERE {key}
+      AND pr.status = 'week2_commenting'
+      AND c.status = 'GENERATED'
+      AND c.is_comment_posted = FALSE
+      AND c.generated_comment IS NOT NULL
+      AND c.generated_comment != ''
+      AND p.urn IS NOT NULL
+      AND p.urn != ''
+      AND p.posted_date_timestamp IS NOT NULL
+"""
+
+_COMMENT_QUEUE_INSERT = (
+    "INSERT OR REPLACE INTO comment_queue "
+    "(comment_id, profile_id, post_id, job_title_score, posted_date_timestamp)"
+)
+
+
+def _refresh_queue(delete_where: str, key: str) -> str:
+    """Trigger body that drops and rebuilds the queue rows for one key."""
+    return (
+        f"DELETE FROM comment_queue WHERE {delete_where};\n"
+        f"{_COMMENT_QUEUE_INSERT} {_COMMENT_QUEUE_SELECT.format(key=key)};"
+    )
+
+
+COMMENT_QUEUE_TRIGGERS = {
+    "trg_comment_queue_comment_insert": (
+        "AFTER INSERT ON comments",
+        f"{_COMMENT_QUEUE_INSERT} {_COMMENT_QUEUE_SELECT.format(key='c.comment_id = NEW.comment_id')};",
+    ),
+    "trg_comment_queue_comment_update": (
+        "AFTER UPDATE OF status, is_comment_posted, generated_comment, post_id ON comments",
+        _refresh_queue("comment_id = OLD.comment_id", "c.comment_id = NEW.comment_id"),
+    ),
+    "trg_comment_queue_comment_delete": (
+        "AFTER DELETE ON comments",
+        "DELETE FROM comment_queue WHERE comment_id = OLD.comment_id;",
+    ),
+    # Entering or leaving week2_commenting, or a new score for ordering
+    "trg_comment_queue_profile_update": (
+        "AFTER UPDATE OF status, job_title_score ON profiles",
+        _refresh_queue("profile_id = OLD.profile_id", "pr.profile_id = NEW.profile_id"),
+    ),
+    "trg_comment_queue_profile_delete": (
+        "AFTER DELETE ON profiles",
+        "DELETE FROM comment_queue WHERE profile_id = OLD.profile_id;",
+    ),
+    "trg_comment_queue_post_update": (
+        "AFTER UPDATE OF urn, posted_date_timestamp, profile_id ON posts",
+        _refresh_queue("post_id = OLD.post_id", "p.post_id = NEW.post_id"),
+    ),
+    "trg_comment_queue_post_delete": (
+        "AFTER DELETE ON posts",
+        "DELETE FROM comment_queue WHERE post_id = OLD.post_id;",
+    ),
+}
+
+# Columns the queue reads from each source table
+_COMMENT_QUEUE_SOURCES = {
+    "profiles": {"profile_id", "status", "job_title_score"},
+    "posts": {"post_id", "profile_id", "urn", "posted_date_timestamp"},
+    "comments": {"comment_id", "post_id", "status", "is_comment_posted", "generated_comment"},
+}
+
+
+def _fill_comment_queue(conn: sqlite3.Connection) -> int:
+    conn.execute("DELETE FROM comment_queue")
+    return conn.execute(f"{_COMMENT_QUEUE_INSERT} {_COMMENT_QUEUE_SELECT.format(key='1')}").rowcount
+
+
+def rebuild_comment_queue(conn: sqlite3.Connection) -> int:
+    """Repopulate comment_queue from scratch; returns the number of queued comments."""
+    with _transaction(conn):
+        return _fill_comment_queue(conn)
+
+
+def ensure_comment_queue(conn: sqlite3.Connection) -> bool:
+    """
+    Create the trigger-maintained ``comment_queue`` table.
+
+    The queue holds one row per comment that is ready to post, so the poster
+    reads a small indexed table instead of joining profiles, posts and the
+    whole comment history. Triggers on the three source tables keep it
+    current; it is filled from the source tables when first created, in the
+    same transaction as its DDL, so it never exists with triggers but
+    without the comments generated before it. Returns False if the source
+    tables are not all in place yet.
+    """
+    for table, needed in _COMMENT_QUEUE_SOURCES.items():
+        if not needed <= _table_columns(conn, table):
+            logger.debug(f"Skipping comment_queue: {table} is missing or incomplete")
+            return False
+
+    created = not _table_columns(conn, "comment_queue")
+    with _transaction(conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS comment_queue (
+                comment_id INTEGER PRIMARY KEY,
+                profile_id INTEGER NOT NULL,
+                post_id INTEGER NOT NULL,
+                job_title_score INTEGER NOT NULL DEFAULT 0,
+                posted_date_timestamp INTEGER NOT NULL
+            )
+        """)
+        # Dequeue range read on recency; profile/post lookups for trigger refreshes
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_comment_queue_posted ON comment_queue (posted_date_timestamp)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_comment_queue_profile ON comment_queue (profile_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_comment_queue_post ON comment_queue (post_id)")
+        for name, (event, body) in COMMENT_QUEUE_TRIGGERS.items():
+            conn.execute(f"CREATE TRIGGER IF NOT EXISTS {name} {event} BEGIN\n{body}\nEND")
+        if created:
+            queued = _fill_comment_queue(conn)
+    if created:
+        logger.info(f"Created comment_queue with {queued} comments ready to post")
+    return True
@@ -0,0 +1,137 @@
+"""
+Typed runtime settings and logging setup shared by the pipeline scripts.
+
+Every script used to run ``load_dotenv``, read ``os.getenv`` into module
+constants, raise ``ValueError`` for missing credentials and attach its log
+``FileHandler`` at import time, so even ``--help`` needed a complete
+``.env`` and left a log file behind. ``load_settings()`` now reads ``.env``
+and the environment once per process into an immutable ``Settings``; the
+credentials are checked with ``Settings.require`` only by the code paths
+that call an API, and ``configure_logging`` runs from each ``main()``.
+"""
+
+import logging
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Mapping, NamedTuple, Optional
+
+from backend.identity_cache import parse_token_expiry
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_DB_PATH = "linkedin_project_db.sqlite3"
+LOG_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Settings field -> environment variable
+ENV_VARS = {
+    'db_path': 'DB_PATH',
+    'log_level': 'LOG_LEVEL',
+    'rapidapi_key': 'RAPIDAPI_KEY',
+    'posts_cache_ttl_hours': 'POSTS_CACHE_TTL_HOURS',
+    'posts_cache_max_mb': 'POSTS_CACHE_MAX_MB',
+    'linkedin_client_id': 'LINKEDIN_CLIENT_ID',
+    'linkedin_client_secret': 'LINKEDIN_CLIENT_SECRET',
+    'linkedin_access_token': 'LINKEDIN_ACCESS_TOKEN',
+    'linkedin_profile_id': 'LINKEDIN_PROFILE_ID',
+    'identity_cache_path': 'LINKEDIN_IDENTITY_CACHE_PATH',
+    'identity_cache_ttl_hours': 'LINKEDIN_IDENTITY_CACHE_TTL_HOURS',
+    'token_expires_at': 'LINKEDIN_TOKEN_EXPIRES_AT',
+    'openai_api_key': 'OPENAI_API_KEY',
+    'gemini_api_key': 'GEMINI_API_KEY',
+    'tavily_api_key': 'TAVILY_API_KEY',
+    'worker_id': 'WORKER_ID',
+    'lease_seconds': 'WORK_LEASE_SECONDS',
+}
+
+# Credentials needed by the LinkedIn API workers (liker and comment poster)
+LINKEDIN_CREDENTIALS = ('linkedin_client_id', 'linkedin_client_secret',
+                        'linkedin_access_token', 'linkedin_profile_id')
+# Keys needed by the comment generator
+AI_CREDENTIALS = ('openai_api_key', 'gemini_api_key', 'tavily_api_key')
+
+
+class Settings(NamedTuple):
+    db_path: str = DEFAULT_DB_PATH
+    log_level: str = "INFO"
+
+    # RapidAPI post scraping and its response cache (backend.response_cache)
+    rapidapi_key: Optional[str] = None
+    posts_cache_ttl_hours: float = 6.0
+    posts_cache_max_mb: int = 64
+
+    # LinkedIn API; the identity cache defaults to a file next to the database
+    linkedin_client_id: Optional[str] = None
+    linkedin_client_secret: Optional[str] = None
+    linkedin_access_token: Optional[str] = None
+    linkedin_profile_id: Optional[str] = None
+    identity_cache_path: Optional[str] = None
+    identity_cache_ttl_hours: float = 24.0
+    token_expires_at: Optional[float] = None
+
+    # Comment generation
+    openai_api_key: Optional[str] = None
+    gemini_api_key: Optional[str] = None
+    tavily_api_key: Optional[str] = None
+
+    # Work-queue leases (backend.leases); the owner defaults to host:pid:random
+    worker_id: Optional[str] = None
+    lease_seconds: float = 900.0
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> "Settings":
+        """Build settings from ``environ`` (default ``os.environ``); unset variables keep their defaults."""
+        environ = os.environ if environ is None else environ
+        values = {field: environ[name] for field, name in ENV_VARS.items() if environ.get(name)}
+        for field in ('posts_cache_ttl_hours', 'identity_cache_ttl_hours', 'lease_seconds'):
+            if field in values:
+                values[field] = float(values[field])
+        if 'posts_cache_max_mb' in values:
+            values['posts_cache_max_mb'] = int(values['posts_cache_max_mb'])
+        if 'token_expires_at' in values:
+            values['token_expires_at'] = parse_token_expiry(values['token_expires_at'])
+        return cls(**values)
+
+    def require(self, *fields: str) -> None:
+        """Raise ``ValueError`` naming the environment variables of any unset ``fields``."""
+        missing = [ENV_VARS[field] for field in fields if not getattr(self, field)]
+        if missing:
+            raise ValueError(f"Missing required environment variables: {', '.join(missing)}")
+
+
+def load_env_file(override: bool = False) -> None:
+    """
+    Load ``.env`` (project root first, then the working directory) into the environment.
+
+    Variables already set win unless ``override`` is given.
+    """
+    from dotenv import load_dotenv
+
+    env_path = PROJECT_ROOT / '.env'
+    if env_path.exists():
+        load_dotenv(dotenv_path=env_path, override=override)
+    elif Path('.env').exists():
+        load_dotenv(dotenv_path='.env', override=override)
+
+
+@lru_cache(maxsize=None)
+def load_settings() -> Settings:
+    """Load ``.env`` without overriding the environment and return the process settings."""
+    load_env_file()
+    return Settings.from_env()
+
+
+def configure_logging(log_file: Optional[str] = None, level: Optional[str] = None,
+                      fmt: str = LOG_FORMAT) -> None:
+    """
+    Log to stderr and, if given, ``log_file`` at ``level`` (default: LOG_LEVEL).
+
+    Only the first call in a process takes effect, so a script's own log
+    file is not added when it runs as a pipeline stage.
+    """
+    if logging.getLogger().handlers:
+        return
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(level=(level or load_settings().log_level).upper(), format=fmt, handlers=handlers)
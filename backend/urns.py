@@ -0,0 +1,91 @@
+"""
+Activity-to-thread URN resolution shared by the liker and comment poster.
+
+LinkedIn rejects likes and comments on reshared and ugcPost items addressed
+by their activity URN with "... is not the same as the actual threadUrn:
+urn:li:ugcPost:...". The liker and poster used to parse that error and
+retry on every run, paying two calls per such post. ``urn_resolutions``
+keeps the thread URN keyed by the original ``posts.urn``: it is written on
+the first mismatch (or by the scrapers, when the API payload already shows
+the thread URN) and consulted before every like or comment.
+"""
+
+import logging
+import re
+import sqlite3
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+# Tried in order against a mismatch error; the first match is the thread URN
+THREAD_URN_PATTERNS = [
+    re.compile(r'actual threadUrn: (urn:li:activity:\d+)'),  # Most common pattern
+    re.compile(r'actual threadUrn: (urn:li:ugcPost:\d+)'),   # Alternative pattern
+    re.compile(r'(urn:li:activity:\d+)'),                    # Fallback activity pattern
+    re.compile(r'(urn:li:ugcPost:\d+)'),                     # Fallback ugcPost pattern
+]
+
+THREAD_URN_MISMATCH = "is not the same as the actual threadUrn"
+
+# Thread URNs embedded in the share/post URLs of scraped posts
+_PAYLOAD_THREAD_URN = re.compile(r'urn:li:(?:ugcPost|share):\d+')
+
+_UPSERT_RESOLUTION = """
+    INSERT INTO urn_resolutions (post_urn, thread_urn, source) VALUES (?, ?, ?)
+    ON CONFLICT(post_urn) DO UPDATE SET
+        thread_urn = excluded.thread_urn,
+        source = excluded.source,
+        resolved_at = CURRENT_TIMESTAMP
+    WHERE urn_resolutions.thread_urn IS NOT excluded.thread_urn
+"""
+
+
+def extract_thread_urn(error_text: str) -> Optional[str]:
+    """Return the thread URN named in a URN-mismatch error, or None."""
+    for pattern in THREAD_URN_PATTERNS:
+        match = pattern.search(error_text)
+        if match:
+            logger.info(f"Found correct URN using pattern '{pattern.pattern}': {match.group(1)}")
+            return match.group(1)
+    return None
+
+
+def resolve_thread_urn(conn: sqlite3.Connection, post_urn: str) -> Optional[str]:
+    """Return the stored thread URN for ``post_urn`` (None when it was never resolved)."""
+    row = conn.execute("SELECT thread_urn FROM urn_resolutions WHERE post_urn = ?", (post_urn,)).fetchone()
+    return row[0] if row else None
+
+
+def record_thread_urn(conn: sqlite3.Connection, post_urn: str, thread_urn: str, source: str) -> None:
+    """Store the thread URN of ``post_urn``; ``source`` is 'mismatch' or 'scrape'."""
+    with conn:
+        conn.execute(_UPSERT_RESOLUTION, (post_urn, thread_urn, source))
+
+
+def payload_thread_urns(posts: Iterable[Dict]) -> List[Tuple[str, str]]:
+    """
+    Return ``(urn, thread_urn)`` for API posts whose share or post URL
+    exposes a ugcPost/share URN alongside the activity ``urn``.
+    """
+    pairs = []
+    for post in posts:
+        urn = post.get('urn')
+        if not urn:
+            continue
+        for field in ('shareUrl', 'postUrl'):
+            match = _PAYLOAD_THREAD_URN.search(unquote(post.get(field) or ''))
+            if match:
+                if match.group(0) != urn:
+                    pairs.append((urn, match.group(0)))
+                break
+    return pairs
+
+
+def record_payload_thread_urns(conn: sqlite3.Connection, posts: Iterable[Dict]) -> int:
+    """Pre-fill ``urn_resolutions`` from scraped posts; return the pairs found."""
+    pairs = payload_thread_urns(posts)
+    if pairs:
+        with conn:
+            conn.executemany(_UPSERT_RESOLUTION, ((urn, thread_urn, 'scrape') for urn, thread_urn in pairs))
+    return len(pairs)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-call sqlite3.connect vs the shared connection layer
+Purpose: Measure the per-call overhead the pipeline scripts paid before
+         backend.database kept one long-lived WAL connection per process
+Usage:
+    python benchmarks/bench_db_connections.py [--posts=100000] [--calls=2000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.database import close_all_connections, get_connection  # noqa: E402
+
+PROFILE_COUNT = 5000
+
+# The same shape of statements the scraper/liker run once per profile or post
+READ_SQL = "SELECT COUNT(*) AS count FROM posts WHERE profile_id = ? AND posted_date_timestamp > ?"
+WRITE_SQL = "UPDATE profiles SET status = ?, last_action_date = date('now') WHERE profile_id = ?"
+
+
+def build_database(db_path: str, post_count: int) -> None:
+    """Create a database with PROFILE_COUNT profiles and ``post_count`` posts."""
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE profiles (
+            profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            first_name TEXT NOT NULL,
+            last_name TEXT NOT NULL,
+            profile_url TEXT NOT NULL,
+            status TEXT DEFAULT 'not_started',
+            last_action_date DATE
+        );
+        CREATE TABLE posts (
+            post_id INTEGER PRIMARY KEY AUTOINCREMENT,
+            urn TEXT,
+            profile_id INTEGER NOT NULL,
+            text TEXT,
+            posted_date_timestamp INTEGER
+        );
+        CREATE INDEX idx_posts_profile ON posts (profile_id, posted_date_timestamp);
+    """)
+    conn.executemany(
+        "INSERT INTO profiles (first_name, last_name, profile_url) VALUES (?, ?, ?)",
+        ((f"First{i}", f"Last{i}", f"https://www.linkedin.com/in/user{i}") for i in range(PROFILE_COUNT)),
+    )
+    now_ms = int(time.time() * 1000)
+    conn.executemany(
+        "INSERT INTO posts (urn, profile_id, text, posted_date_timestamp) VALUES (?, ?, ?, ?)",
+        (
+            (str(7000000000000000000 + i), random.randint(1, PROFILE_COUNT), "lorem ipsum " * 20,
+             now_ms - random.randint(0, 90) * 86_400_000)
+            for i in range(post_count)
+        ),
+    )
+    conn.commit()
+    conn.close()
+
+
+def run_per_call(db_path: str, calls: int) -> float:
+    """Open and close a connection for every statement (the old behaviour)."""
+    cutoff = int(time.time() * 1000) - 21 * 86_400_000
+    start = time.perf_counter()
+    for i in range(calls):
+        profile_id = (i % PROFILE_COUNT) + 1
+        conn = sqlite3.connect(db_path)
+        conn.row_factory = sqlite3.Row
+        conn.execute(READ_SQL, (profile_id, cutoff)).fetchone()
+        conn.close()
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(WRITE_SQL, ("not_started", profile_id))
+        conn.commit()
+        conn.close()
+    return time.perf_counter() - start
+
+
+def run_shared(db_path: str, calls: int) -> float:
+    """Reuse the shared connection and its statement cache."""
+    cutoff = int(time.time() * 1000) - 21 * 86_400_000
+    conn = get_connection(db_path)
+    start = time.perf_counter()
+    for i in range(calls):
+        profile_id = (i % PROFILE_COUNT) + 1
+        conn.execute(READ_SQL, (profile_id, cutoff)).fetchone()
+        with conn:
+            conn.execute(WRITE_SQL, ("not_started", profile_id))
+    elapsed = time.perf_counter() - start
+    close_all_connections()
+    return elapsed
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Connection layer benchmark")
+    parser.add_argument('--posts', type=int, default=100_000,
+                       help='Number of posts in the benchmark database (default: 100000)')
+    parser.add_argument('--calls', type=int, default=2000,
+                       help='Read+write round trips per mode (default: 2000)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, "bench.sqlite3")
+        print(f"Building database with {args.posts} posts...")
+        build_database(db_path, args.posts)
+
+        per_call = run_per_call(db_path, args.calls)
+        shared = run_shared(db_path, args.calls)
+
+    print(f"\n{'='*60}")
+    print("CONNECTION BENCHMARK")
+    print(f"{'='*60}")
+    print(f"Per-call connect: {per_call:.3f}s ({args.calls / per_call:,.0f} round trips/s)")
+    print(f"Shared WAL conn:  {shared:.3f}s ({args.calls / shared:,.0f} round trips/s)")
+    print(f"Speedup: {per_call / shared:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
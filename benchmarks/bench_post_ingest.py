@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row post/media inserts vs the batched page ingestion path
+Purpose: Compare rows/sec of the old save_posts loop (one execute per post and
+         per media item, RETURNING post_id) with backend.posts.save_post_page
+Usage:
+    python benchmarks/bench_post_ingest.py [--profiles=300] [--page-size=50]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from backend.database import close_all_connections, get_connection  # noqa: E402
+from backend.posts import (  # noqa: E402
+    UPSERT_MEDIA_SQL,
+    UPSERT_POST_SQL,
+    media_items,
+    post_row,
+    save_post_page,
+)
+
+SCHEMA = """
+    CREATE TABLE posts (
+        post_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        urn TEXT, profile_id INTEGER NOT NULL, text TEXT, cleaned_text TEXT, category TEXT,
+        media_type TEXT, media_url TEXT, post_url TEXT, processed_post_text TEXT,
+        total_reaction_count INTEGER DEFAULT 0, like_count INTEGER DEFAULT 0,
+        appreciation_count INTEGER DEFAULT 0, empathy_count INTEGER DEFAULT 0,
+        interest_count INTEGER DEFAULT 0, praise_count INTEGER DEFAULT 0,
+        comments_count INTEGER DEFAULT 0, reposts_count INTEGER DEFAULT 0,
+        entertainments_count INTEGER DEFAULT 0, posted_at TEXT, posted_date TEXT,
+        scraped_date TIMESTAMP, ocr_text TEXT, poster_first_name TEXT, poster_last_name TEXT,
+        poster_headline TEXT, poster_image_url TEXT, poster_linkedin_url TEXT,
+        poster_public_id TEXT, article_title TEXT, article_subtitle TEXT,
+        article_target_url TEXT, article_description TEXT, reshared BOOLEAN DEFAULT 0,
+        resharer_comment TEXT, share_url TEXT, content_type TEXT,
+        posted_date_timestamp INTEGER, reposted BOOLEAN DEFAULT 0
+    );
+    CREATE UNIQUE INDEX ux_posts_urn ON posts (urn);
+    CREATE TABLE media (
+        media_id INTEGER PRIMARY KEY AUTOINCREMENT,
+        post_id INTEGER NOT NULL, media_url TEXT, media_type TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    );
+    CREATE UNIQUE INDEX ux_media_post_url ON media (post_id, media_url);
+"""
+
+
+def make_page(profile_index: int, page_size: int):
+    """Build one API page of posts shaped like the RapidAPI response."""
+    now_ms = int(time.time() * 1000)
+    return [
+        {
+            'urn': f"{7000000000000000000 + profile_index * page_size + i}",
+            'text': "lorem ipsum " * 40,
+            'postUrl': f"https://www.linkedin.com/posts/{profile_index}-{i}",
+            'totalReactionCount': i, 'likeCount': i, 'commentsCount': i % 7,
+            'postedDate': "2025-07-24 13:45:12.000 +0000 UTC",
+            'postedDateTimestamp': now_ms - i * 3_600_000,
+            'author': {'firstName': 'Ada', 'lastName': 'Lovelace', 'username': f'user{profile_index}',
+                       'profilePictures': [{'url': 'https://img/profile.png'}]},
+            'images': [[{'url': f"https://img/{profile_index}/{i}/{n}.png"} for n in range(2)]],
+        }
+        for i in range(page_size)
+    ]
+
+
+def run_per_row(conn, pages) -> float:
+    """The previous save_posts: one execute per post and per media item."""
+    start = time.perf_counter()
+    for profile_id, page in pages:
+        with conn:
+            for post in page:
+                row = post_row(post, profile_id, datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"))
+                post_id = conn.execute(UPSERT_POST_SQL + " RETURNING post_id", row).fetchall()[0][0]
+                for url, media_type in media_items(post):
+                    conn.execute(UPSERT_MEDIA_SQL, (post_id, url, media_type))
+    return time.perf_counter() - start
+
+
+def run_batched(conn, pages) -> float:
+    """One executemany per page for posts and one for media."""
+    start = time.perf_counter()
+    for profile_id, page in pages:
+        save_post_page(conn, page, profile_id)
+    return time.perf_counter() - start
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Post ingestion benchmark")
+    parser.add_argument('--profiles', type=int, default=300,
+                       help='Number of profiles (API pages) to ingest (default: 300)')
+    parser.add_argument('--page-size', type=int, default=50,
+                       help='Posts per API page (default: 50)')
+    args = parser.parse_args()
+
+    pages = [(index + 1, make_page(index, args.page_size)) for index in range(args.profiles)]
+    total_posts = args.profiles * args.page_size
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for name, runner in (("per-row", run_per_row), ("batched", run_batched)):
+            db_path = os.path.join(tmp_dir, f"{name}.sqlite3")
+            conn = get_connection(db_path)
+            conn.executescript(SCHEMA)
+            results[name] = (runner(conn, pages), runner(conn, pages))
+            close_all_connections()
+
+    print(f"\n{'='*60}")
+    print(f"POST INGEST BENCHMARK ({total_posts} posts, {total_posts * 2} media rows)")
+    print(f"{'='*60}")
+    for name, (fresh, rescrape) in results.items():
+        print(f"{name:<8} insert:   {fresh:.3f}s ({total_posts / fresh:,.0f} posts/s)")
+        print(f"{name:<8} rescrape: {rescrape:.3f}s ({total_posts / rescrape:,.0f} posts/s)")
+    print(f"Speedup (insert):   {results['per-row'][0] / results['batched'][0]:.1f}x")
+    print(f"Speedup (rescrape): {results['per-row'][1] / results['batched'][1]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
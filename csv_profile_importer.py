@@ -5,67 +5,100 @@ Purpose: Import LinkedIn profiles from CSV with duplicate prevention and connect
 Usage: 
     python csv_profile_importer.py prospects.csv prospect
     python csv_profile_importer.py connections.csv connection
+    python csv_profile_importer.py export.jsonl.gz prospect [--chunk-size=50000] [--no-resume] [--yes]
+    python csv_profile_importer.py --rescore
 """
 
+import argparse
+import json
 import os
 import sys
 import sqlite3
-import pandas as pd
 import logging
 from datetime import datetime
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('csv_importer.log')
-    ]
+from backend.counters import ensure_counters, read_counters, report_counter_drift
+from backend.database import get_connection
+from backend.job_titles import (
+    DEFAULT_JOB_TITLE_SCORE,
+    classify_roles,
+    ensure_role_categories,
+    rescore_profiles,
+    score_job_title,
+    score_job_titles,
 )
+from backend.schema import migrate
+from backend.settings import configure_logging, load_settings
+
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
-# Database configuration
-DB_PATH = "linkedin_project_db.sqlite3"
+# Rows read, cleaned and committed together when streaming an import file
+READ_CHUNK_SIZE = 50_000
+
+# Rows per executemany batch when bulk-inserting profiles
+IMPORT_CHUNK_SIZE = 5000
+
+# Bound parameters per IN (...) lookup, below SQLite's historical 999 limit
+URL_LOOKUP_CHUNK_SIZE = 500
+
+# Compression suffixes pandas detects with compression='infer'
+COMPRESSION_SUFFIXES = {'.gz', '.bz2', '.zip', '.xz', '.zst'}
+
+INSERT_PROFILE_SQL = """
+    INSERT INTO profiles (
+        first_name, last_name, username, profile_url,
+        company_name, job_title, status, connection_status,
+        job_title_score, priority_score, role_category, created_at
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+def read_input_chunks(file_path: str, chunk_size: int) -> "Iterator[pd.DataFrame]":
+    """
+    Yield an import file as DataFrames of at most ``chunk_size`` rows.
+
+    ``.jsonl``/``.ndjson`` files are read as JSON lines, anything else as
+    CSV; gzip and other compressed variants are detected from the suffix.
+    """
+    import pandas as pd
+
+    suffixes = [suffix.lower() for suffix in Path(file_path).suffixes]
+    if suffixes and suffixes[-1] in COMPRESSION_SUFFIXES:
+        suffixes.pop()
+
+    if suffixes and suffixes[-1] in ('.jsonl', '.ndjson'):
+        reader = pd.read_json(file_path, lines=True, chunksize=chunk_size, compression='infer', dtype=False)
+    else:
+        reader = pd.read_csv(file_path, chunksize=chunk_size, compression='infer')
+
+    with reader:
+        yield from reader
+
 
 class CSVProfileImporter:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: Optional[str] = None):
         """Initialize the CSV profile importer."""
-        self.db_path = db_path
+        self.db_path = db_path or load_settings().db_path
         self._setup_database()
         
     def _setup_database(self):
         """Ensure required database tables and columns exist."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Create profiles table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    username TEXT,
-                    profile_url TEXT NOT NULL,
-                    company_name TEXT,
-                    job_title TEXT,
-                    status TEXT DEFAULT 'not_started',
-                    connection_status TEXT DEFAULT 'prospect',
-                    job_title_score INTEGER DEFAULT 0,
-                    priority_score INTEGER DEFAULT 0,
-                    last_action_date DATE,
-                    weekly_batch INTEGER,
-                    daily_slot INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(profile_url, username)
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
+
+            # Versioned tables, columns and indexes shared by every script
+            migrate(conn)
+
+            # Classify profiles stored before role_category existed
+            ensure_role_categories(conn)
+
+            # Trigger-maintained counters read by get_import_stats
+            ensure_counters(conn)
+
             logger.info("Database setup completed")
             
         except Exception as e:
@@ -73,17 +106,13 @@ class CSVProfileImporter:
             raise
 
     def get_db_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            raise
+        """Return the shared, long-lived database connection for this process."""
+        return get_connection(self.db_path)
 
     def extract_username_from_url(self, profile_url: str) -> str:
         """Extract username from LinkedIn profile URL."""
+        import pandas as pd
+
         if pd.isna(profile_url) or not profile_url:
             return ''
         
@@ -102,43 +131,28 @@ class CSVProfileImporter:
         Calculate priority score based on job title to find a Product Manager role.
         Explicitly de-prioritizes non-relevant roles.
         """
+        import pandas as pd
+
         if not title or pd.isna(title):
-            return 1
-            
-        title_lower = str(title).lower()
-        
-        # Tier 1: Product Leadership & Recruiters (Highest Priority)
-        if any(word in title_lower for word in ['chief product officer', 'cpo', 'vp of product', 'head of product', 'director of product', 'product recruiter']):
-            return 10
-            
-        # Tier 2: Senior Product Managers
-        elif any(word in title_lower for word in ['senior product manager', 'principal product manager', 'lead product manager']):
-            return 8
-            
-        # Tier 3: Product Managers
-        elif 'product manager' in title_lower or 'pm' in title_lower:
-            return 6
-            
-        # Tier 4: Adjacent & Junior Product Roles
-        elif any(word in title_lower for word in ['associate product manager', 'apm', 'product owner', 'product marketing']):
-            return 4
-            
-        # Tier 5: General Tech Leadership
-        elif any(word in title_lower for word in ['cto', 'vp of engineering', 'director of engineering', 'recruiter', 'talent acquisition']):
-            return 2
-            
-        # Tier 6: Non-Relevant Roles (Explicitly de-prioritized)
-        elif any(word in title_lower for word in [
-            'sales', 'account executive', 'marketing', 'finance', 'accountant', 
-            'human resources', 'customer success', 'operations', 'legal', 'counsel'
-        ]):
-            return 1
-            
-        # Default catch-all for any other title
-        else:
-            return 1
+            return DEFAULT_JOB_TITLE_SCORE
+        return score_job_title(str(title))
+
+    def score_job_titles(self, titles: "pd.Series") -> "pd.Series":
+        """Vectorized calculate_job_title_score over a Series of titles."""
+        return score_job_titles(titles)
+
+    def extract_usernames(self, profile_urls: "pd.Series") -> "pd.Series":
+        """Vectorized extract_username_from_url over a Series of URLs."""
+        urls = profile_urls.astype('string')
+        usernames = (
+            urls.str.split('/in/').str[-1]
+            .str.rstrip('/')
+            .str.split('?').str[0]
+            .str.split('#').str[0]
+        )
+        return usernames.where(urls.str.contains('/in/', regex=False).fillna(False), '').astype(object)
 
-    def validate_csv_format(self, df: pd.DataFrame) -> bool:
+    def validate_csv_format(self, df: "pd.DataFrame") -> bool:
         """Validate that CSV has required columns."""
         required_cols = ['first_name', 'last_name', 'profile_url']
         missing_cols = [col for col in required_cols if col not in df.columns]
@@ -149,7 +163,7 @@ class CSVProfileImporter:
         
         return True
 
-    def clean_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+    def clean_dataframe(self, df: "pd.DataFrame") -> "pd.DataFrame":
         """Clean dataframe by removing completely empty rows and rows with missing critical data."""
         original_count = len(df)
         
@@ -171,90 +185,313 @@ class CSVProfileImporter:
         logger.info(f"Cleaned dataset: {original_count} → {len(df_cleaned)} rows ({original_count - len(df_cleaned)} removed)")
         return df_cleaned
 
-    def import_prospects(self, csv_file_path: str) -> Dict:
-        """Import new prospects from CSV."""
+    def _profile_values(self, df: "pd.DataFrame") -> List[tuple]:
+        """
+        Build (first_name, last_name, username, profile_url, company_name,
+        job_title, job_title_score, role_category) tuples column by column.
+        """
+        import pandas as pd
+
+        job_titles = df['job_title'] if 'job_title' in df.columns else pd.Series('', index=df.index)
+        company_names = df['company_name'] if 'company_name' in df.columns else pd.Series('', index=df.index)
+        scores = self.score_job_titles(job_titles).tolist()
+        categories = classify_roles(job_titles).tolist()
+
+        columns = [
+            df['first_name'], df['last_name'], df['username'], df['profile_url'],
+            company_names, job_titles,
+        ]
+        # NaN cells are stored as NULL, as the row-by-row insert did
+        values = [column.astype(object).where(column.notna(), None).tolist() for column in columns]
+        return list(zip(*values, scores, categories))
+
+    def _insert_profile_chunk(self, conn: sqlite3.Connection, rows: List[tuple]) -> tuple:
+        """
+        Insert a chunk of profile rows with executemany.
+
+        If any row fails the chunk is rolled back to a savepoint and retried
+        row by row, so one bad row is counted as one error as before.
+        Returns (inserted, errors).
+        """
+        # Keep the savepoint nested so releasing it does not commit early
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT profile_chunk")
         try:
-            # Read and validate CSV
-            df = pd.read_csv(csv_file_path)
-            logger.info(f"Read {len(df)} rows from CSV")
-            
-            if not self.validate_csv_format(df):
-                raise ValueError("CSV format validation failed")
-            
-            # Clean the dataframe
-            df = self.clean_dataframe(df)
-            
-            if len(df) == 0:
-                logger.error("No valid rows remaining after cleaning")
-                return {
-                    'total_rows': 0,
-                    'new_profiles': 0,
-                    'duplicates_skipped': 0,
-                    'errors': 0
-                }
-            
-            # Extract username if missing
+            conn.executemany(INSERT_PROFILE_SQL, rows)
+            conn.execute("RELEASE SAVEPOINT profile_chunk")
+            return len(rows), 0
+        except sqlite3.Error:
+            conn.execute("ROLLBACK TO SAVEPOINT profile_chunk")
+            conn.execute("RELEASE SAVEPOINT profile_chunk")
+
+        inserted = errors = 0
+        for row in rows:
+            try:
+                conn.execute(INSERT_PROFILE_SQL, row)
+                inserted += 1
+            except Exception as e:
+                logger.error(f"Error importing row: {e}")
+                errors += 1
+        return inserted, errors
+
+    def _existing_profile_keys(self, conn: sqlite3.Connection, profile_urls: List[str]) -> "pd.DataFrame":
+        """Return stored (profile_url, username) keys for just these URLs."""
+        import pandas as pd
+
+        rows = []
+        for start in range(0, len(profile_urls), URL_LOOKUP_CHUNK_SIZE):
+            chunk = profile_urls[start:start + URL_LOOKUP_CHUNK_SIZE]
+            placeholders = ', '.join('?' * len(chunk))
+            rows.extend(
+                tuple(row) for row in conn.execute(
+                    f"SELECT profile_url, username FROM profiles WHERE profile_url IN ({placeholders})", chunk
+                )
+            )
+        return pd.DataFrame(rows, columns=['profile_url', 'username'], dtype=object).drop_duplicates()
+
+    def _import_prospect_chunk(self, conn: sqlite3.Connection, df: "pd.DataFrame", results: Dict) -> None:
+        """Insert the prospects in one cleaned chunk that are not stored yet."""
+        # Anti-join against existing (profile_url, username) keys
+        existing = self._existing_profile_keys(conn, df['profile_url'].drop_duplicates().tolist())
+        keys = df[['profile_url', 'username']].astype(object)
+        is_duplicate = (
+            keys.merge(existing, on=['profile_url', 'username'], how='left', indicator=True)['_merge']
+            .eq('both')
+            .to_numpy()
+        )
+        duplicates = int(is_duplicate.sum())
+        results['duplicates_skipped'] += duplicates
+        if duplicates:
+            logger.info(f"Skipping {duplicates} profiles already in the database")
+        new_df = df[~is_duplicate]
+
+        created_at = datetime.now()
+        rows = [
+            (*fields, 'not_started', 'prospect', score, score, category, created_at)
+            for *fields, score, category in self._profile_values(new_df)
+        ]
+        for start in range(0, len(rows), IMPORT_CHUNK_SIZE):
+            inserted, errors = self._insert_profile_chunk(conn, rows[start:start + IMPORT_CHUNK_SIZE])
+            results['new_profiles'] += inserted
+            results['errors'] += errors
+
+    def _reconcile_staged_connections(self, conn: sqlite3.Connection, rows: List[tuple]) -> tuple:
+        """Reconcile connection rows with two set operations; return (reconciled, new)."""
+        # Stage the chunk so reconciliation is two set operations, not a query per row
+        conn.execute("DROP TABLE IF EXISTS temp.connection_staging")
+        conn.execute("""
+            CREATE TEMP TABLE connection_staging (
+                row_num INTEGER PRIMARY KEY,
+                first_name TEXT,
+                last_name TEXT,
+                username TEXT,
+                profile_url TEXT,
+                company_name TEXT,
+                job_title TEXT,
+                job_title_score INTEGER,
+                role_category TEXT
+            )
+        """)
+        conn.executemany("""
+            INSERT INTO temp.connection_staging (
+                first_name, last_name, username, profile_url,
+                company_name, job_title, job_title_score, role_category
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.execute("CREATE INDEX temp.idx_connection_staging_url ON connection_staging (profile_url)")
+
+        # Existing profiles (matched by URL regardless of status) that are not yet
+        # connections; like the row-by-row lookup, only the first profile per URL
+        reconciled = conn.execute("""
+            UPDATE profiles
+            SET status = 'maintenance',
+                connection_status = 'current_connection',
+                last_action_date = date('now')
+            WHERE profile_id IN (
+                SELECT MIN(p.profile_id)
+                FROM profiles p
+                JOIN (SELECT DISTINCT profile_url FROM temp.connection_staging) AS staged
+                  ON p.profile_url = staged.profile_url
+                GROUP BY p.profile_url
+            )
+              AND connection_status IS NOT 'current_connection'
+            RETURNING profile_id
+        """).fetchall()
+
+        # URLs not in profiles at all, first row per URL
+        new_count = conn.execute("""
+            INSERT INTO profiles (
+                first_name, last_name, username, profile_url,
+                company_name, job_title, status, connection_status,
+                job_title_score, priority_score, role_category, created_at
+            )
+            SELECT s.first_name, s.last_name, s.username, s.profile_url,
+                   s.company_name, s.job_title, 'maintenance', 'current_connection',
+                   s.job_title_score, s.job_title_score, s.role_category, ?
+            FROM temp.connection_staging s
+            WHERE s.row_num IN (
+                SELECT MIN(row_num) FROM temp.connection_staging GROUP BY profile_url
+            )
+              AND NOT EXISTS (SELECT 1 FROM profiles p WHERE p.profile_url = s.profile_url)
+            ORDER BY s.row_num
+        """, (datetime.now(),)).rowcount
+
+        conn.execute("DROP TABLE temp.connection_staging")
+        return len(reconciled), new_count
+
+    def _reconcile_connection_row(self, conn: sqlite3.Connection, row: tuple) -> str:
+        """Reconcile one connection row; return 'reconciled', 'new' or 'duplicate'."""
+        first_name, last_name, username, profile_url, company_name, job_title, score, category = row
+        existing = conn.execute(
+            "SELECT profile_id, connection_status FROM profiles WHERE profile_url = ? ORDER BY profile_id LIMIT 1",
+            (profile_url,),
+        ).fetchone()
+        if existing is None:
+            conn.execute(INSERT_PROFILE_SQL, (
+                first_name, last_name, username, profile_url, company_name, job_title,
+                'maintenance', 'current_connection', score, score, category, datetime.now(),
+            ))
+            return 'new'
+        if existing['connection_status'] != 'current_connection':
+            conn.execute("""
+                UPDATE profiles
+                SET status = 'maintenance',
+                    connection_status = 'current_connection',
+                    last_action_date = date('now')
+                WHERE profile_id = ?
+            """, (existing['profile_id'],))
+            return 'reconciled'
+        return 'duplicate'
+
+    def _import_connection_chunk(self, conn: sqlite3.Connection, df: "pd.DataFrame", results: Dict) -> None:
+        """
+        Reconcile one cleaned chunk of connections with set operations.
+
+        If the set operations fail the chunk is rolled back to a savepoint
+        and reconciled row by row, so one bad row is counted as one error.
+        """
+        rows = self._profile_values(df)
+        errors = 0
+
+        # Keep the savepoint nested so releasing it does not commit early
+        if not conn.in_transaction:
+            conn.execute("BEGIN")
+        conn.execute("SAVEPOINT connection_chunk")
+        try:
+            reconciled_count, new_count = self._reconcile_staged_connections(conn, rows)
+            conn.execute("RELEASE SAVEPOINT connection_chunk")
+        except sqlite3.Error as e:
+            logger.warning(f"Set-based reconciliation failed ({e}), retrying the chunk row by row")
+            conn.execute("ROLLBACK TO SAVEPOINT connection_chunk")
+            conn.execute("RELEASE SAVEPOINT connection_chunk")
+            reconciled_count = new_count = 0
+            for row in rows:
+                try:
+                    outcome = self._reconcile_connection_row(conn, row)
+                except Exception as e:
+                    logger.error(f"Error processing connection row: {e}")
+                    errors += 1
+                    continue
+                reconciled_count += outcome == 'reconciled'
+                new_count += outcome == 'new'
+
+        results['reconciled_prospects'] += reconciled_count
+        results['new_connections'] += new_count
+        results['errors'] += errors
+        # Everything else was already a connection or repeated in the file
+        results['duplicates_skipped'] += len(df) - reconciled_count - new_count - errors
+        logger.info(f"Reconciled {reconciled_count} prospects to connections, "
+                    f"added {new_count} new connections")
+
+    def _import_file(self, file_path: str, import_type: str, import_chunk: Callable,
+                     results: Dict, chunk_size: int, resume: bool) -> Dict:
+        """
+        Stream ``file_path`` through ``import_chunk`` one chunk at a time.
+
+        Each chunk is validated, cleaned and imported in its own transaction,
+        together with the import_progress row recording how far the file has
+        been read, so an interrupted import resumes after the last committed
+        chunk.
+        """
+        conn = self.get_db_connection()
+        stat = os.stat(file_path)
+        import_key = f"{import_type}:{os.path.abspath(file_path)}:{stat.st_size}:{stat.st_mtime_ns}"
+
+        progress = conn.execute(
+            "SELECT rows_read, chunks_committed, results, completed_at FROM import_progress WHERE import_key = ?",
+            (import_key,),
+        ).fetchone()
+        rows_to_skip = chunks_committed = 0
+        if progress and resume and not progress['completed_at']:
+            rows_to_skip = progress['rows_read']
+            chunks_committed = progress['chunks_committed']
+            results.update(json.loads(progress['results']))
+            logger.info(f"Resuming {import_type} import of {file_path} after row {rows_to_skip}")
+        else:
+            with conn:
+                conn.execute("DELETE FROM import_progress WHERE import_key = ?", (import_key,))
+                conn.execute(
+                    "INSERT INTO import_progress (import_key, import_type, file_path, results) VALUES (?, ?, ?, ?)",
+                    (import_key, import_type, file_path, json.dumps(results)),
+                )
+
+        rows_read = 0
+        validated = False
+        for chunk in read_input_chunks(file_path, chunk_size):
+            if not validated:
+                if not self.validate_csv_format(chunk):
+                    raise ValueError("CSV format validation failed")
+                if 'username' not in chunk.columns:
+                    logger.info("Extracting usernames from profile_url column")
+                validated = True
+
+            # Already committed by an earlier run
+            if rows_read + len(chunk) <= rows_to_skip:
+                rows_read += len(chunk)
+                continue
+            if rows_read < rows_to_skip:
+                chunk = chunk.iloc[rows_to_skip - rows_read:]
+                rows_read = rows_to_skip
+            rows_read += len(chunk)
+
+            df = self.clean_dataframe(chunk)
             if 'username' not in df.columns:
-                df['username'] = df['profile_url'].apply(self.extract_username_from_url)
-                logger.info("Extracted usernames from profile_url column")
-            
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            results = {
-                'total_rows': len(df),
+                df['username'] = self.extract_usernames(df['profile_url'])
+            results['total_rows'] += len(df)
+
+            with conn:
+                if len(df):
+                    import_chunk(conn, df, results)
+                chunks_committed += 1
+                conn.execute("""
+                    UPDATE import_progress
+                    SET rows_read = ?, chunks_committed = ?, results = ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE import_key = ?
+                """, (rows_read, chunks_committed, json.dumps(results), import_key))
+
+            logger.info(f"Chunk {chunks_committed}: {rows_read} rows read - {results}")
+
+        if results['total_rows'] == 0:
+            logger.error("No valid rows remaining after cleaning")
+
+        with conn:
+            conn.execute(
+                "UPDATE import_progress SET completed_at = CURRENT_TIMESTAMP WHERE import_key = ?",
+                (import_key,),
+            )
+        return results
+
+    def import_prospects(self, csv_file_path: str, chunk_size: int = READ_CHUNK_SIZE,
+                         resume: bool = True) -> Dict:
+        """Import new prospects from a CSV, gzip CSV or JSONL file, chunk by chunk."""
+        try:
+            results = self._import_file(csv_file_path, 'prospect', self._import_prospect_chunk, {
+                'total_rows': 0,
                 'new_profiles': 0,
                 'duplicates_skipped': 0,
                 'errors': 0
-            }
-            
-            # Get existing profiles to check duplicates
-            cursor.execute("SELECT profile_url, username FROM profiles")
-            existing_profiles = {(row['profile_url'], row['username']) for row in cursor.fetchall()}
-            
-            for _, row in df.iterrows():
-                try:
-                    profile_key = (row['profile_url'], row['username'])
-                    
-                    # Check if profile already exists
-                    if profile_key in existing_profiles:
-                        results['duplicates_skipped'] += 1
-                        logger.debug(f"Skipping duplicate: {row['first_name']} {row['last_name']}")
-                        continue
-                    
-                    # Calculate job title score
-                    job_title = row.get('job_title', '')
-                    job_title_score = self.calculate_job_title_score(job_title)
-                    
-                    # Insert new prospect
-                    cursor.execute("""
-                        INSERT INTO profiles (
-                            first_name, last_name, username, profile_url, 
-                            company_name, job_title, status, connection_status,
-                            job_title_score, priority_score, created_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        row['first_name'], 
-                        row['last_name'], 
-                        row['username'], 
-                        row['profile_url'], 
-                        row.get('company_name', ''),
-                        job_title,
-                        'not_started',
-                        'prospect',
-                        job_title_score, 
-                        job_title_score,
-                        datetime.now()
-                    ))
-                    
-                    results['new_profiles'] += 1
-                    
-                except Exception as e:
-                    logger.error(f"Error importing row: {e}")
-                    results['errors'] += 1
-            
-            conn.commit()
-            conn.close()
+            }, chunk_size, resume)
             
             logger.info(f"Prospect import completed: {results}")
             return results
@@ -263,108 +500,17 @@ class CSVProfileImporter:
             logger.error(f"Prospect import failed: {e}")
             raise
 
-    def import_connections(self, csv_file_path: str) -> Dict:
-        """Import current connections and reconcile with existing prospects."""
+    def import_connections(self, csv_file_path: str, chunk_size: int = READ_CHUNK_SIZE,
+                           resume: bool = True) -> Dict:
+        """Import current connections and reconcile with existing prospects, chunk by chunk."""
         try:
-            # Read and validate CSV
-            df = pd.read_csv(csv_file_path)
-            logger.info(f"Read {len(df)} connection rows from CSV")
-            
-            if not self.validate_csv_format(df):
-                raise ValueError("CSV format validation failed")
-            
-            # Clean the dataframe
-            df = self.clean_dataframe(df)
-            
-            if len(df) == 0:
-                logger.error("No valid rows remaining after cleaning")
-                return {
-                    'total_rows': 0,
-                    'new_connections': 0,
-                    'reconciled_prospects': 0,
-                    'duplicates_skipped': 0,
-                    'errors': 0
-                }
-            
-            # Extract username if missing
-            if 'username' not in df.columns:
-                df['username'] = df['profile_url'].apply(self.extract_username_from_url)
-            
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            results = {
-                'total_rows': len(df),
+            results = self._import_file(csv_file_path, 'connection', self._import_connection_chunk, {
+                'total_rows': 0,
                 'new_connections': 0,
                 'reconciled_prospects': 0,
                 'duplicates_skipped': 0,
                 'errors': 0
-            }
-            
-            for _, row in df.iterrows():
-                try:
-                    profile_url = row['profile_url']
-                    
-                    # Check if profile already exists (match by URL regardless of status)
-                    cursor.execute("""
-                        SELECT profile_id, status, connection_status, first_name, last_name 
-                        FROM profiles 
-                        WHERE profile_url = ?
-                    """, (profile_url,))
-                    
-                    existing_profile = cursor.fetchone()
-                    
-                    if existing_profile:
-                        # Only update if not already a connection
-                        if existing_profile['connection_status'] != 'current_connection':
-                            # Reconcile existing prospect to connection
-                            cursor.execute("""
-                                UPDATE profiles 
-                                SET status = 'maintenance',
-                                    connection_status = 'current_connection',
-                                    last_action_date = date('now')
-                                WHERE profile_id = ?
-                            """, (existing_profile['profile_id'],))
-                            
-                            results['reconciled_prospects'] += 1
-                            logger.info(f"Reconciled prospect to connection: {existing_profile['first_name']} {existing_profile['last_name']} (was {existing_profile['status']})")
-                        else:
-                            results['duplicates_skipped'] += 1
-                            logger.debug(f"Skipping existing connection: {existing_profile['first_name']} {existing_profile['last_name']}")
-                    else:
-                        # Insert new connection
-                        job_title = row.get('job_title', '')
-                        job_title_score = self.calculate_job_title_score(job_title)
-                        
-                        cursor.execute("""
-                            INSERT INTO profiles (
-                                first_name, last_name, username, profile_url, 
-                                company_name, job_title, status, connection_status,
-                                job_title_score, priority_score, created_at
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                        """, (
-                            row['first_name'], 
-                            row['last_name'], 
-                            row.get('username', ''), 
-                            profile_url, 
-                            row.get('company_name', ''),
-                            job_title,
-                            'maintenance',
-                            'current_connection',
-                            job_title_score, 
-                            job_title_score,
-                            datetime.now()
-                        ))
-                        
-                        results['new_connections'] += 1
-                        logger.info(f"Added new connection: {row['first_name']} {row['last_name']}")
-                    
-                except Exception as e:
-                    logger.error(f"Error processing connection row: {e}")
-                    results['errors'] += 1
-            
-            conn.commit()
-            conn.close()
+            }, chunk_size, resume)
             
             logger.info(f"Connection import completed: {results}")
             return results
@@ -373,85 +519,108 @@ class CSVProfileImporter:
             logger.error(f"Connection import failed: {e}")
             raise
 
+    def rescore_profiles(self) -> Dict:
+        """Recompute job title scores for every stored profile after a rule change."""
+        try:
+            results = rescore_profiles(self.get_db_connection())
+            logger.info(f"Rescore completed: {results}")
+            return results
+
+        except Exception as e:
+            logger.error(f"Rescore failed: {e}")
+            raise
+
     def get_import_stats(self) -> Dict:
-        """Get current database statistics."""
+        """Get current database statistics from the pipeline counters."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
             
             stats = {}
             
+            # By status
+            status_counts = read_counters(conn, 'profile_status')
+            
             # Total profiles
-            cursor.execute("SELECT COUNT(*) as count FROM profiles")
-            stats['total_profiles'] = cursor.fetchone()['count']
+            stats['total_profiles'] = sum(status_counts.values())
             
             # By connection status
-            cursor.execute("""
-                SELECT connection_status, COUNT(*) as count 
-                FROM profiles 
-                GROUP BY connection_status
-            """)
-            for row in cursor.fetchall():
-                stats[f"{row['connection_status']}_count"] = row['count']
+            for connection_status, count in read_counters(conn, 'profile_connection_status').items():
+                stats[f"{connection_status}_count"] = count
             
-            # By status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM profiles 
-                GROUP BY status
-            """)
-            status_counts = {}
-            for row in cursor.fetchall():
-                status_counts[row['status']] = row['count']
             stats['status_breakdown'] = status_counts
             
-            conn.close()
             return stats
             
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
             return {}
 
-def print_usage():
-    """Print usage instructions."""
-    print("\nCSV Profile Importer")
-    print("===================")
-    print("Usage:")
-    print("  python csv_profile_importer.py <csv_file> <import_type>")
-    print("\nImport Types:")
-    print("  prospect    - Import new prospects (status: not_started)")
-    print("  connection  - Import current connections (status: maintenance)")
-    print("\nRequired CSV Columns:")
-    print("  - first_name")
-    print("  - last_name") 
-    print("  - profile_url")
-    print("\nOptional CSV Columns:")
-    print("  - username (extracted from profile_url if missing)")
-    print("  - company_name")
-    print("  - job_title")
-    print("\nExamples:")
-    print("  python csv_profile_importer.py prospects.csv prospect")
-    print("  python csv_profile_importer.py my_connections.csv connection")
+USAGE_EPILOG = """
+Import Types:
+  prospect    - Import new prospects (status: not_started)
+  connection  - Import current connections (status: maintenance)
+
+Input Formats:
+  .csv, .jsonl/.ndjson, optionally compressed (.gz, .bz2, .zip, .xz, .zst)
+
+Required Columns:
+  - first_name
+  - last_name
+  - profile_url
+
+Optional Columns:
+  - username (extracted from profile_url if missing)
+  - company_name
+  - job_title
+
+Examples:
+  python csv_profile_importer.py prospects.csv prospect
+  python csv_profile_importer.py my_connections.csv.gz connection --chunk-size=20000
+  python csv_profile_importer.py --rescore
+"""
 
 def main():
     """Main function."""
-    if len(sys.argv) != 3:
-        print_usage()
-        sys.exit(1)
+    parser = argparse.ArgumentParser(
+        description='CSV Profile Importer',
+        epilog=USAGE_EPILOG,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument('csv_file', nargs='?', help='CSV or JSONL file to import')
+    parser.add_argument('import_type', nargs='?', type=str.lower, choices=['prospect', 'connection'],
+                       help='Kind of profiles in the file')
+    parser.add_argument('--rescore', action='store_true',
+                       help='Recompute job_title_score/priority_score for all stored profiles and exit')
+    parser.add_argument('--chunk-size', type=int, default=READ_CHUNK_SIZE,
+                       help=f'Rows read and committed per chunk (default: {READ_CHUNK_SIZE})')
+    parser.add_argument('--no-resume', action='store_true',
+                       help='Start from the top even if an earlier import of this file was interrupted')
+    parser.add_argument('--yes', action='store_true',
+                       help='Skip the confirmation prompt')
+    parser.add_argument('--verify-counters', action='store_true',
+                       help='Recount the pipeline counters with full scans, repair any drift and exit')
+    args = parser.parse_args()
+    configure_logging('csv_importer.log')
+    
+    if args.verify_counters:
+        sys.exit(0 if report_counter_drift(CSVProfileImporter().get_db_connection()) else 1)
+    
+    if args.rescore:
+        results = CSVProfileImporter().rescore_profiles()
+        print(f"Rescored {results['profiles_scanned']} profiles, updated {results['profiles_updated']}")
+        return
     
-    csv_file = sys.argv[1]
-    import_type = sys.argv[2].lower()
+    if not args.csv_file or not args.import_type:
+        parser.error("csv_file and import_type are required unless --rescore or --verify-counters is given")
+    
+    csv_file = args.csv_file
+    import_type = args.import_type
     
     # Validate arguments
     if not Path(csv_file).exists():
         logger.error(f"CSV file not found: {csv_file}")
         sys.exit(1)
     
-    if import_type not in ['prospect', 'connection']:
-        logger.error(f"Invalid import type: {import_type}")
-        print_usage()
-        sys.exit(1)
-    
     try:
         # Initialize importer
         importer = CSVProfileImporter()
@@ -468,25 +637,28 @@ def main():
             for status, count in stats['status_breakdown'].items():
                 logger.info(f"    {status}: {count}")
         
-        # Preview CSV
-        df = pd.read_csv(csv_file)
-        logger.info(f"\nCSV Preview ({len(df)} rows):")
+        # Preview the first rows only; the import itself streams the file
+        import pandas as pd
+        df = next(read_input_chunks(csv_file, 5), pd.DataFrame())
+        logger.info(f"\nFile Preview ({csv_file}):")
         logger.info(f"Columns: {list(df.columns)}")
         if not df.empty:
             logger.info("First few rows:")
             print(df.head().to_string())
         
         # Confirm import
-        response = input(f"\nProceed with {import_type} import of {len(df)} profiles? (y/n): ")
-        if response.lower() != 'y':
-            logger.info("Import cancelled by user")
-            return
+        if not args.yes:
+            response = input(f"\nProceed with {import_type} import of {csv_file}? (y/n): ")
+            if response.lower() != 'y':
+                logger.info("Import cancelled by user")
+                return
         
         # Execute import
+        resume = not args.no_resume
         if import_type == 'prospect':
-            results = importer.import_prospects(csv_file)
+            results = importer.import_prospects(csv_file, chunk_size=args.chunk_size, resume=resume)
         else:
-            results = importer.import_connections(csv_file)
+            results = importer.import_connections(csv_file, chunk_size=args.chunk_size, resume=resume)
         
         # Display results
         print(f"\n{'='*50}")
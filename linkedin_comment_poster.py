@@ -6,156 +6,76 @@ Usage:
     python comment_poster.py [--max-comments=25] [--delay=30]
 """
 
-import os
 import sys
 import sqlite3
-import requests
 import json
 import time
 import logging
 import argparse
 import random
 from datetime import datetime, date
+from functools import cached_property
 from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('comment_poster.log')
-    ]
-)
-logger = logging.getLogger(__name__)
-
-# Database and LinkedIn API configuration
-DB_PATH = "linkedin_project_db.sqlite3"
+from backend.counters import ensure_counters, read_counter, read_counters, report_counter_drift
+from backend.database import get_connection
+from backend.identity_cache import CACHE_FILE_NAME, IdentityCache
+from backend.leases import WorkLease
+from backend.posts import backfill_posted_timestamps, recency_cutoff_ms
+from backend.schema import ensure_comment_queue, migrate
+from backend.settings import LINKEDIN_CREDENTIALS, Settings, configure_logging, load_settings
+from backend.urns import THREAD_URN_MISMATCH, extract_thread_urn, record_thread_urn, resolve_thread_urn
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+logger = logging.getLogger(__name__)
 
-# LinkedIn API credentials from environment
-CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
-CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
-ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
-LINKEDIN_PROFILE_ID = os.getenv("LINKEDIN_PROFILE_ID")
+# Only comment on posts newer than this
+RECENT_POST_DAYS = 30
 
-# Validate required environment variables
-required_vars = ["LINKEDIN_CLIENT_ID", "LINKEDIN_CLIENT_SECRET", "LINKEDIN_ACCESS_TOKEN", "LINKEDIN_PROFILE_ID"]
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-if missing_vars:
-    raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+# Most recent comments posted per profile in one batch
+MAX_COMMENTS_PER_PROFILE = 2
 
 class CommentPoster:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: Optional[str] = None, settings: Optional[Settings] = None):
         """Initialize the comment poster."""
-        self.db_path = db_path
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.settings = settings or load_settings()
+        self.db_path = db_path or self.settings.db_path
+        self.identity_cache = IdentityCache(
+            self.settings.identity_cache_path or Path(self.db_path).resolve().with_name(CACHE_FILE_NAME),
+            ttl_seconds=self.settings.identity_cache_ttl_hours * 3600,
+            token_expires_at=self.settings.token_expires_at,
+        )
+        self._setup_database()
+        # Claims on the comments this worker posts, so parallel posters split the queue
+        self.lease = WorkLease(self.get_db_connection(), "comments", owner=self.settings.worker_id,
+                               lease_seconds=self.settings.lease_seconds)
+
+    @cached_property
+    def http(self):
+        """LinkedIn API client, created (and httpx imported) on first use."""
+        from backend.http_client import HttpClient
+
+        return HttpClient(headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
-        self._setup_database()
         
     def _setup_database(self):
         """Ensure required database tables and columns exist."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Create profiles table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    username TEXT,
-                    profile_url TEXT NOT NULL,
-                    company_name TEXT,
-                    job_title TEXT,
-                    status TEXT DEFAULT 'not_started',
-                    connection_status TEXT DEFAULT 'prospect',
-                    job_title_score INTEGER DEFAULT 0,
-                    priority_score INTEGER DEFAULT 0,
-                    last_action_date DATE,
-                    weekly_batch INTEGER,
-                    daily_slot INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(profile_url, username)
-                )
-            """)
-            
-            # Create posts table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS posts (
-                    post_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    urn TEXT,
-                    profile_id INTEGER NOT NULL,
-                    text TEXT,
-                    cleaned_text TEXT,
-                    category TEXT,
-                    media_type TEXT,
-                    media_url TEXT,
-                    post_url TEXT,
-                    processed_post_text TEXT,
-                    total_reaction_count INTEGER DEFAULT 0,
-                    like_count INTEGER DEFAULT 0,
-                    appreciation_count INTEGER DEFAULT 0,
-                    empathy_count INTEGER DEFAULT 0,
-                    interest_count INTEGER DEFAULT 0,
-                    praise_count INTEGER DEFAULT 0,
-                    comments_count INTEGER DEFAULT 0,
-                    reposts_count INTEGER DEFAULT 0,
-                    entertainments_count INTEGER DEFAULT 0,
-                    posted_at TEXT,
-                    posted_date TEXT,
-                    scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ocr_text TEXT,
-                    poster_first_name TEXT,
-                    poster_last_name TEXT,
-                    poster_headline TEXT,
-                    poster_image_url TEXT,
-                    poster_linkedin_url TEXT,
-                    poster_public_id TEXT,
-                    article_title TEXT,
-                    article_subtitle TEXT,
-                    article_target_url TEXT,
-                    article_description TEXT,
-                    reshared BOOLEAN DEFAULT 0,
-                    resharer_comment TEXT,
-                    share_url TEXT,
-                    content_type TEXT,
-                    posted_date_timestamp INTEGER,
-                    reposted BOOLEAN DEFAULT 0,
-                    liked_to_linkedin_at TIMESTAMP,
-                    linkedin_like_id TEXT,
-                    linkedin_like_urn TEXT,
-                    is_post_liked BOOLEAN DEFAULT FALSE,
-                    like_failed BOOLEAN DEFAULT FALSE,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (profile_id)
-                )
-            """)
-            
-            # Create comments table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS comments (
-                    comment_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    post_id INTEGER NOT NULL,
-                    generated_comment TEXT NOT NULL,
-                    status TEXT DEFAULT 'GENERATED',
-                    is_comment_posted BOOLEAN DEFAULT FALSE,
-                    posted_to_linkedin_at TIMESTAMP,
-                    linkedin_comment_id TEXT,
-                    linkedin_comment_urn TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (post_id) REFERENCES posts (post_id)
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
+
+            # Versioned tables, columns and indexes shared by every script
+            migrate(conn)
+
+            # Recency filters read posted_date_timestamp; fill it for legacy rows
+            backfill_posted_timestamps(conn)
+
+            # Trigger-maintained queue of comments ready to post
+            ensure_comment_queue(conn)
+
+            # Trigger-maintained counters read by the stats methods
+            ensure_counters(conn)
+
             logger.info("Database setup completed")
             
         except Exception as e:
@@ -163,99 +83,110 @@ class CommentPoster:
             raise
 
     def get_db_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            raise
+        """Return the shared, long-lived database connection for this process."""
+        return get_connection(self.db_path)
 
     def get_headers(self) -> Dict[str, str]:
         """Generate headers for LinkedIn API requests."""
         return {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
+            "Authorization": f"Bearer {self.settings.linkedin_access_token}",
             "Content-Type": "application/json",
             "X-Restli-Protocol-Version": "2.0.0",
         }
 
-    def get_comments_to_post(self) -> List[Dict]:
-        """Get generated comments for profiles in week2_commenting status with recent posts (max 2 per profile)."""
+    def get_comments_to_post(self, max_comments: Optional[int] = None,
+                             per_profile: int = MAX_COMMENTS_PER_PROFILE) -> List[Dict]:
+        """
+        Get generated comments for profiles in week2_commenting status with recent posts.
+
+        Reads the trigger-maintained comment_queue, so the cost depends on
+        the number of comments waiting rather than the comment history. The
+        per-profile cap (most recent ``per_profile`` posts) and ``max_comments``
+        are applied in SQL, highest job_title_score first, newest first.
+        Comments leased by another worker are left out after ranking, so two
+        posters never exceed the cap of one profile between them.
+        """
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Use the exact SQL query specified by the user, modified for comments
+            # SQLite treats a negative LIMIT as no limit
+            # MATERIALIZED keeps the recency range read on idx_comment_queue_posted
+            # instead of letting the window walk the whole queue in profile order
             cursor.execute("""
-                SELECT profiles.profile_id, profiles.first_name, profiles.last_name,
+                WITH recent AS MATERIALIZED (
+                    SELECT comment_id, profile_id, post_id, job_title_score, posted_date_timestamp
+                    FROM comment_queue
+                    WHERE posted_date_timestamp > ?
+                )
+                SELECT queued.profile_id, profiles.first_name, profiles.last_name,
                        profiles.connection_status,
-                       posts.post_id, posts.urn, posts.text, posts.posted_date,
-                       comments.comment_id, comments.generated_comment
-                FROM profiles
-                JOIN posts ON posts.profile_id = profiles.profile_id
-                JOIN comments ON comments.post_id = posts.post_id
-                WHERE profiles.status = 'week2_commenting'
-                AND posts.posted_date > datetime('now', '-30 days')
-                  AND comments.status = 'GENERATED'
-                  AND comments.is_comment_posted = FALSE
-                  AND comments.generated_comment IS NOT NULL
-                  AND comments.generated_comment != ''
-                  AND posts.urn IS NOT NULL
-                  AND posts.urn != ''
-                ORDER BY profiles.job_title_score DESC, posts.posted_date DESC
-            """)
-            
-            all_comments = [dict(row) for row in cursor.fetchall()]
-            conn.close()
-            
-            # Apply per-profile rate limiting (max 2 comments per profile)
-            if not all_comments:
+                       queued.post_id, posts.urn, posts.posted_date,
+                       queued.comment_id, comments.generated_comment
+                FROM (
+                    SELECT recent.*,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY profile_id
+                               ORDER BY posted_date_timestamp DESC, comment_id DESC
+                           ) AS profile_rank
+                    FROM recent
+                ) AS queued
+                JOIN profiles ON profiles.profile_id = queued.profile_id
+                JOIN posts ON posts.post_id = queued.post_id
+                JOIN comments ON comments.comment_id = queued.comment_id
+                WHERE queued.profile_rank <= ?
+                  AND (comments.lease_owner IS NULL OR comments.lease_owner = ? OR comments.lease_expires_at <= ?)
+                ORDER BY queued.job_title_score DESC, queued.posted_date_timestamp DESC, queued.comment_id DESC
+                LIMIT ?
+            """, (
+                recency_cutoff_ms(RECENT_POST_DAYS),
+                per_profile,
+                *self.lease.params(),
+                -1 if max_comments is None else max_comments,
+            ))
+            
+            comments = [dict(row) for row in cursor.fetchall()]
+            
+            if not comments:
                 logger.info("No comments found that need posting")
                 return []
             
-            profile_counts = {}
-            filtered_comments = []
-            
-            for comment in all_comments:
-                profile_id = comment['profile_id']
-                current_count = profile_counts.get(profile_id, 0)
-                
-                if current_count < 2:  # Max 2 comments per profile
-                    filtered_comments.append(comment)
-                    profile_counts[profile_id] = current_count + 1
-            
-            logger.info(f"Found {len(filtered_comments)} comments ready for posting (max 2 per profile)")
-            if len(all_comments) != len(filtered_comments):
-                profiles_limited = len([p for p in profile_counts.values() if p >= 2])
-                logger.info(f"Rate limiting applied: {len(all_comments)} total comments → {len(filtered_comments)} comments "
-                           f"({profiles_limited} profiles hit the 2-comment limit)")
-            
-            return filtered_comments
+            logger.info(f"Found {len(comments)} comments ready for posting (max {per_profile} per profile)")
+            return comments
             
         except Exception as e:
             logger.error(f"Error getting comments to post: {e}")
             return []
 
     def validate_linkedin_credentials(self) -> Dict:
-        """Validate LinkedIn credentials and get user info."""
+        """Validate LinkedIn credentials and get user info (from the identity cache when warm)."""
+        cached = self.identity_cache.get(self.settings.linkedin_access_token)
+        if cached and cached.get('sub'):
+            logger.info(f"Using cached LinkedIn identity. User ID: {cached['sub']}")
+            return {'valid': True, 'user_id': cached['sub'], 'user_data': cached, 'cached': True}
+
         try:
             url = "https://api.linkedin.com/v2/userinfo"
             headers = self.get_headers()
             
             logger.info("Validating LinkedIn credentials...")
-            response = self.session.get(url, headers=headers, timeout=30)
+            response = self.http.get(url, headers=headers, endpoint="linkedin userinfo")
             
             if response.status_code == 200:
                 user_data = response.json()
                 user_id = user_data.get('sub')
                 logger.info(f"LinkedIn validation successful. User ID: {user_id}")
+                if user_id:
+                    # Only the member ID is kept on disk
+                    self.identity_cache.put(self.settings.linkedin_access_token, {'sub': user_id})
                 return {
                     'valid': True,
                     'user_id': user_id,
                     'user_data': user_data
                 }
             else:
+                if response.status_code == 401:
+                    self.identity_cache.invalidate(self.settings.linkedin_access_token)
                 logger.error(f"LinkedIn validation failed: {response.status_code}")
                 logger.error(f"Response: {response.text}")
                 return {'valid': False, 'error': f"HTTP {response.status_code}"}
@@ -317,9 +248,15 @@ class CommentPoster:
         return f"https://api.linkedin.com/v2/socialActions/{encoded_urn}/comments"
 
     def post_comment_to_linkedin(self, comment_text: str, post_urn: str, user_id: str) -> Optional[Dict]:
-        """Post comment to LinkedIn using v2 API with enhanced URN handling and retry logic."""
+        """
+        Post comment to LinkedIn using v2 API with enhanced URN handling and retry logic.
+
+        A thread URN resolved earlier (urn_resolutions) is used directly; one
+        learned from a mismatch error is stored before the retry.
+        """
         try:
-            formatted_urn = self.format_post_urn(post_urn)
+            formatted_urn = (resolve_thread_urn(self.get_db_connection(), post_urn)
+                             or self.format_post_urn(post_urn))
             logger.info(f"Posting comment to LinkedIn for post: {formatted_urn}")
             
             payload = self.create_linkedin_comment_payload(comment_text, formatted_urn, user_id)
@@ -330,11 +267,13 @@ class CommentPoster:
             cleaned_comment = self.clean_comment_for_linkedin(comment_text)
             logger.debug(f"Comment preview: {cleaned_comment[:100]}...")
             
-            response = self.session.post(
+            # Comment POSTs are not idempotent: only 429s and connection
+            # failures are retried, never 5xx or read timeouts
+            response = self.http.post(
                 endpoint_url,
                 headers=headers,
                 json=payload,
-                timeout=30
+                endpoint="linkedin comment"
             )
             
             logger.debug(f"LinkedIn API response status: {response.status_code}")
@@ -359,39 +298,25 @@ class CommentPoster:
                 error_text = response.text
                 
                 # Handle URN mismatch with retry logic (same as post liker)
-                if "is not the same as the actual threadUrn" in error_text:
+                if THREAD_URN_MISMATCH in error_text:
                     logger.warning(f"URN mismatch for {formatted_urn}. Attempting to extract correct URN.")
                     
                     # Extract correct URN from error message - support multiple formats
-                    correct_urn = None
-                    
-                    # Try different URN patterns
-                    patterns = [
-                        r'actual threadUrn: (urn:li:activity:\d+)',  # Most common pattern
-                        r'actual threadUrn: (urn:li:ugcPost:\d+)',   # Alternative pattern
-                        r'(urn:li:activity:\d+)',                    # Fallback activity pattern
-                        r'(urn:li:ugcPost:\d+)'                      # Fallback ugcPost pattern
-                    ]
-                    
-                    import re
-                    for pattern in patterns:
-                        match = re.search(pattern, error_text)
-                        if match:
-                            correct_urn = match.group(1)
-                            logger.info(f"Found correct URN using pattern '{pattern}': {correct_urn}")
-                            break
+                    correct_urn = extract_thread_urn(error_text)
                     
                     if correct_urn:
+                        # Remember it so this post is never resolved again
+                        record_thread_urn(self.get_db_connection(), post_urn, correct_urn, 'mismatch')
                         try:
                             # Retry with correct URN
                             retry_payload = self.create_linkedin_comment_payload(comment_text, correct_urn, user_id)
                             retry_endpoint_url = self.get_comment_endpoint_url(correct_urn)
                             
-                            retry_response = self.session.post(
+                            retry_response = self.http.post(
                                 retry_endpoint_url,
                                 headers=headers,
                                 json=retry_payload,
-                                timeout=30
+                                endpoint="linkedin comment"
                             )
                             
                             if retry_response.status_code == 201:
@@ -422,6 +347,9 @@ class CommentPoster:
                     logger.error(f"Response: {error_text}")
                     return None
             else:
+                if response.status_code == 401:
+                    # The token was revoked or expired: validate again next run
+                    self.identity_cache.invalidate(self.settings.linkedin_access_token)
                 logger.error(f"LinkedIn API error: {response.status_code}")
                 logger.error(f"Response: {response.text}")
                 return None
@@ -433,22 +361,18 @@ class CommentPoster:
     def mark_comment_as_posted(self, comment_id: int, linkedin_comment_id: str, linkedin_comment_urn: str) -> bool:
         """Mark comment as successfully posted in the database."""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE comments
-                SET 
-                    is_comment_posted = TRUE,
-                    posted_to_linkedin_at = CURRENT_TIMESTAMP,
-                    linkedin_comment_id = ?,
-                    linkedin_comment_urn = ?
-                WHERE comment_id = ?
-            """, (linkedin_comment_id, linkedin_comment_urn, comment_id))
-            
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+            with self.get_db_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE comments
+                    SET 
+                        is_comment_posted = TRUE,
+                        posted_to_linkedin_at = CURRENT_TIMESTAMP,
+                        linkedin_comment_id = ?,
+                        linkedin_comment_urn = ?
+                    WHERE comment_id = ?
+                """, (linkedin_comment_id, linkedin_comment_urn, comment_id))
+            
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Marked comment {comment_id} as posted")
@@ -464,18 +388,14 @@ class CommentPoster:
     def mark_comment_as_failed(self, comment_id: int, error_message: str) -> bool:
         """Mark comment as failed to post."""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE comments
-                SET status = 'FAILED'
-                WHERE comment_id = ?
-            """, (comment_id,))
+            with self.get_db_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE comments
+                    SET status = 'FAILED'
+                    WHERE comment_id = ?
+                """, (comment_id,))
             
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Marked comment {comment_id} as failed: {error_message}")
@@ -500,18 +420,14 @@ class CommentPoster:
     def update_profile_status(self, profile_id: int, new_status: str, reason: str = "") -> bool:
         """Update profile status after successful comment posting."""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
+            with self.get_db_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE profiles 
+                    SET status = ?, last_action_date = date('now')
+                    WHERE profile_id = ?
+                """, (new_status, profile_id))
             
-            cursor.execute("""
-                UPDATE profiles 
-                SET status = ?, last_action_date = date('now')
-                WHERE profile_id = ?
-            """, (new_status, profile_id))
-            
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Updated profile {profile_id} to status '{new_status}'. {reason}")
@@ -594,8 +510,9 @@ class CommentPoster:
         return result
 
     def post_comments_batch(self, max_comments: int = 25, delay_range: Tuple[int, int] = (30, 90)) -> Dict:
-        """Post a batch of comments with human-like delays."""
+        """Post a batch of comments with human-like delays; the comments are leased to this worker until it ends."""
         logger.info(f"Starting comment posting batch (max {max_comments} comments)")
+        self.settings.require(*LINKEDIN_CREDENTIALS)
         
         # Validate credentials
         validation_result = self.validate_linkedin_credentials()
@@ -618,8 +535,9 @@ class CommentPoster:
                 'profiles_advanced': 0
             }
         
-        # Get comments to post
-        comments_to_post = self.get_comments_to_post()
+        # Get comments to post, already capped per profile and at max_comments,
+        # and keep the ones this worker wins the lease on
+        comments_to_post = self.lease.claim_rows(self.get_comments_to_post(max_comments=max_comments))
         
         if not comments_to_post:
             logger.info("No comments found that need posting")
@@ -630,8 +548,7 @@ class CommentPoster:
                 'message': 'No comments to post'
             }
         
-        # Limit to max_comments
-        comments_to_process = comments_to_post[:max_comments]
+        comments_to_process = comments_to_post
         logger.info(f"Processing {len(comments_to_process)} comments")
         
         batch_results = {
@@ -642,33 +559,37 @@ class CommentPoster:
             'results': []
         }
         
-        for i, comment_data in enumerate(comments_to_process):
-            logger.info(f"Processing comment {i+1}/{len(comments_to_process)}")
-            
-            # Post the comment
-            result = self.post_comment(comment_data, user_id)
-            batch_results['results'].append(result)
-            
-            if result['success']:
-                batch_results['comments_posted'] += 1
-                if result['profile_updated']:
-                    batch_results['profiles_advanced'] += 1
-            else:
-                if 'error' in result:
-                    batch_results['errors'].append(result['error'])
-            
-            # Apply human-like delay between comments (except after the last one)
-            if i < len(comments_to_process) - 1:
-                # Longer delays for comments to simulate reading and composing
-                delay = random.randint(delay_range[0], delay_range[1])
-                logger.info(f"Human-like delay: {delay}s...")
-                time.sleep(delay)
+        try:
+            for i, comment_data in enumerate(comments_to_process):
+                logger.info(f"Processing comment {i+1}/{len(comments_to_process)}")
+                self.lease.heartbeat()
+                
+                # Post the comment
+                result = self.post_comment(comment_data, user_id)
+                batch_results['results'].append(result)
+                
+                if result['success']:
+                    batch_results['comments_posted'] += 1
+                    if result['profile_updated']:
+                        batch_results['profiles_advanced'] += 1
+                else:
+                    if 'error' in result:
+                        batch_results['errors'].append(result['error'])
+                
+                # Apply human-like delay between comments (except after the last one)
+                if i < len(comments_to_process) - 1:
+                    # Longer delays for comments to simulate reading and composing
+                    delay = random.randint(delay_range[0], delay_range[1])
+                    logger.info(f"Human-like delay: {delay}s...")
+                    time.sleep(delay)
+        finally:
+            self.lease.release()
         
         logger.info(f"Batch commenting completed: {batch_results['comments_posted']} comments, {batch_results['profiles_advanced']} profiles advanced")
         return batch_results
 
     def get_commenting_stats(self) -> Dict:
-        """Get current commenting statistics."""
+        """Get current commenting statistics (counts from the pipeline counters)."""
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
@@ -676,55 +597,25 @@ class CommentPoster:
             stats = {}
             
             # Profiles by status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM profiles 
-                GROUP BY status
-            """)
-            status_counts = {}
-            for row in cursor.fetchall():
-                status_counts[row['status']] = row['count']
-            stats['status_breakdown'] = status_counts
+            stats['status_breakdown'] = read_counters(conn, 'profile_status')
             
             # Comments stats
-            cursor.execute("SELECT COUNT(*) as count FROM comments WHERE status = 'GENERATED'")
-            stats['total_generated_comments'] = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM comments WHERE is_comment_posted = TRUE")
-            stats['posted_comments'] = cursor.fetchone()['count']
-            
-            cursor.execute("SELECT COUNT(*) as count FROM comments WHERE status = 'FAILED'")
-            stats['failed_comments'] = cursor.fetchone()['count']
+            stats['total_generated_comments'] = read_counter(conn, 'comments', 'generated')[0]
+            posted_comments, last_posted = read_counter(conn, 'comments', 'posted')
+            stats['posted_comments'] = posted_comments
+            stats['failed_comments'] = read_counter(conn, 'comments', 'failed')[0]
             
             # Week2 commenting candidates
             cursor.execute("""
-                SELECT COUNT(DISTINCT profiles.profile_id) as count
-                FROM profiles
-                JOIN posts ON posts.profile_id = profiles.profile_id
-                JOIN comments ON comments.post_id = posts.post_id
-                WHERE profiles.status = 'week2_commenting'
-                  AND date(posts.posted_date) > date('now', '-30 days')
-                  AND comments.status = 'GENERATED'
-                  AND comments.is_comment_posted = FALSE
-                  AND comments.generated_comment IS NOT NULL
-                  AND comments.generated_comment != ''
-                  AND posts.urn IS NOT NULL
-                  AND posts.urn != ''
-            """)
+                SELECT COUNT(DISTINCT profile_id) as count
+                FROM comment_queue
+                WHERE posted_date_timestamp > ?
+            """, (recency_cutoff_ms(RECENT_POST_DAYS),))
             stats['week2_candidates'] = cursor.fetchone()['count']
             
             # Last posted date
-            cursor.execute("""
-                SELECT posted_to_linkedin_at 
-                FROM comments 
-                WHERE is_comment_posted = TRUE 
-                ORDER BY posted_to_linkedin_at DESC 
-                LIMIT 1
-            """)
-            result = cursor.fetchone()
-            stats['last_posted'] = result['posted_to_linkedin_at'] if result else None
-            
-            conn.close()
+            stats['last_posted'] = last_posted
+            
             return stats
             
         except Exception as e:
@@ -742,13 +633,19 @@ def main():
                        help='Maximum delay between comments in seconds (default: 90)')
     parser.add_argument('--stats-only', action='store_true',
                        help='Show statistics only, do not post comments')
+    parser.add_argument('--verify-counters', action='store_true',
+                       help='Recount the pipeline counters with full scans, repair any drift and exit')
     
     args = parser.parse_args()
+    configure_logging('comment_poster.log')
     
     try:
         # Initialize poster
         poster = CommentPoster()
         
+        if args.verify_counters:
+            sys.exit(0 if report_counter_drift(poster.get_db_connection()) else 1)
+        
         # Show current stats
         logger.info("Current commenting statistics:")
         stats = poster.get_commenting_stats()
@@ -791,6 +688,9 @@ def main():
             print(f"Errors encountered: {len(results['errors'])}")
             for error in results['errors'][:3]:  # Show first 3 errors
                 print(f"  - {error}")
+        from backend.http_client import format_metrics
+        for line in format_metrics(poster.http.metrics()):
+            print(f"HTTP {line}")
         
         if results['comments_posted'] > 0:
             print("✅ Commenting completed successfully!")
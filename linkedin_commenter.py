@@ -1,57 +1,28 @@
 # linkedin_commenter.py
 import logging
-import os
 import sys
 import argparse
 from pathlib import Path
-from dotenv import load_dotenv
+from typing import Optional
 
 # Add the project root to the Python path
 project_root = Path(__file__).parent.absolute()
 sys.path.insert(0, str(project_root))
 
-try:
-    from backend.linkedin.graph import LinkedInGraph
-except ImportError as e:
-    print(f"Import error: {e}")
-    print(f"Current working directory: {os.getcwd()}")
-    print(f"Project root: {project_root}")
-    print(f"Python path: {sys.path}")
-    sys.exit(1)
-
-# Load environment variables
-env_path = project_root / '.env'
-if env_path.exists():
-    load_dotenv(dotenv_path=env_path, override=True)
-else:
-    # Try loading from current directory
-    if Path('.env').exists():
-        load_dotenv(override=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('linkedin_commenter.log')
-    ]
-)
+from backend.settings import AI_CREDENTIALS, configure_logging, load_env_file, load_settings
 
 logger = logging.getLogger(__name__)
 
-def validate_environment() -> bool:
-    """Validate required environment variables and database"""
-    required_vars = ["OPENAI_API_KEY", "GEMINI_API_KEY", "TAVILY_API_KEY"]
-    missing_vars = [var for var in required_vars if not os.getenv(var)]
-    
-    if missing_vars:
-        logger.error(f"Missing required environment variables: {missing_vars}")
+def validate_environment(db_path: str) -> bool:
+    """Validate required environment variables and the database at ``db_path``"""
+    try:
+        load_settings().require(*AI_CREDENTIALS)
+    except ValueError as e:
+        logger.error(str(e))
         logger.error("Please set these in your .env file or environment")
         return False
     
     # Check if database file exists
-    db_path = "linkedin_project_db.sqlite3"
     if not Path(db_path).exists():
         logger.error(f"Database file {db_path} not found")
         logger.error("Please ensure the LinkedIn database exists with posts table")
@@ -59,54 +30,36 @@ def validate_environment() -> bool:
     
     return True
 
-def main():
-    """Main function to process one LinkedIn post"""
-    
-    # Parse command line arguments
-    parser = argparse.ArgumentParser(description="LinkedIn Comment Generator and Poster")
-    parser.add_argument(
-        "--max-posts", 
-        type=int, 
-        default=10, 
-        help="Maximum number of posts to process (default: 10)"
-    )
-    parser.add_argument(
-        "--db-path",
-        type=str,
-        default="linkedin_project_db.sqlite3",
-        help="Path to the SQLite database file"
-    )
-    parser.add_argument(
-        "--log-level",
-        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
-        default="INFO",
-        help="Set the logging level"
-    )
-    parser.add_argument(
-        "--dry-run",
-        action="store_true",
-        help="Run in dry-run mode (don't actually post comments)"
-    )
-    
-    args = parser.parse_args()
-    
-    # Set logging level
-    logging.getLogger().setLevel(getattr(logging, args.log_level))
-    
+def generate_comments(max_posts: int = 10, dry_run: bool = False, db_path: Optional[str] = None) -> dict:
+    """
+    Run the comment-generation graph over up to ``max_posts`` unprocessed posts.
+
+    ``db_path`` defaults to DB_PATH (``load_settings().db_path``).
+
+    Returns a summary dict: ``success``, ``posts_processed``,
+    ``profiles_cleaned_up`` and, on failure, ``error``. Used by ``main`` and
+    by the pipeline orchestrator (linkedin_pipeline.py).
+    """
+    summary = {'success': False, 'posts_processed': 0, 'profiles_cleaned_up': 0}
     try:
         logger.info("=== LinkedIn Commenter Starting ===")
         
+        db_path = db_path or load_settings().db_path
+        
         # Validate environment
-        if not validate_environment():
-            return False
+        if not validate_environment(db_path):
+            summary['error'] = 'Invalid environment'
+            return summary
         
-        # Initialize the graph
+        # Initialize the graph; the generation stack is only imported for a real run
         logger.info("Initializing LinkedIn graph...")
         try:
-            graph = LinkedInGraph()
+            from backend.linkedin.graph import LinkedInGraph
+            graph = LinkedInGraph(db_path)
         except Exception as e:
             logger.error(f"Failed to initialize graph: {e}")
-            return False
+            summary['error'] = f"Failed to initialize graph: {e}"
+            return summary
         
         # Show current stats
         try:
@@ -115,23 +68,25 @@ def main():
             
             if stats['total_posts'] == 0:
                 logger.warning("No posts found in database")
-                return False
+                summary['error'] = 'No posts found in database'
+                return summary
             
             unprocessed_count = stats['total_posts'] - stats['processed_posts']
             if unprocessed_count == 0:
                 logger.info("All posts have been processed")
-                return True
+                summary['success'] = True
+                return summary
             
             logger.info(f"Found {unprocessed_count} unprocessed posts")
         except Exception as e:
             logger.error(f"Error getting stats: {e}")
-            return False
+            summary['error'] = f"Error getting stats: {e}"
+            return summary
         
         # Process posts in a loop (one at a time through the graph)
         posts_processed = 0
-        max_posts = args.max_posts  # Use command line argument
         
-        if args.dry_run:
+        if dry_run:
             logger.info("Running in DRY-RUN mode - no comments will be posted")
         
         while posts_processed < max_posts:
@@ -163,11 +118,13 @@ def main():
                     logger.warning(f"Error getting updated stats: {e}")
         
         logger.info(f"=== LinkedIn Commenter Finished - Processed {posts_processed} posts ===")
+        summary['posts_processed'] = posts_processed
         
         # Cleanup: Move profiles with no generated comments to next stage
         try:
             logger.info("Running cleanup for profiles without generated comments...")
             cleaned_up = graph.db_service.cleanup_profiles_without_comments()
+            summary['profiles_cleaned_up'] = cleaned_up
             if cleaned_up > 0:
                 logger.info(f"Cleanup completed: {cleaned_up} profiles moved to next stage")
             else:
@@ -175,11 +132,51 @@ def main():
         except Exception as e:
             logger.warning(f"Error during profile cleanup: {e}")
         
-        return True
+        summary['success'] = True
+        return summary
         
     except Exception as e:
         logger.error(f"Fatal error in main: {e}", exc_info=True)
-        return False
+        summary['error'] = str(e)
+        return summary
+
+def main():
+    """Main function to process one LinkedIn post"""
+    
+    # Parse command line arguments
+    parser = argparse.ArgumentParser(description="LinkedIn Comment Generator and Poster")
+    parser.add_argument(
+        "--max-posts", 
+        type=int, 
+        default=10, 
+        help="Maximum number of posts to process (default: 10)"
+    )
+    parser.add_argument(
+        "--db-path",
+        type=str,
+        default=None,
+        help="Path to the SQLite database file (default: DB_PATH or linkedin_project_db.sqlite3)"
+    )
+    parser.add_argument(
+        "--log-level",
+        choices=["DEBUG", "INFO", "WARNING", "ERROR"],
+        default=None,
+        help="Set the logging level (default: LOG_LEVEL or INFO)"
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Run in dry-run mode (don't actually post comments)"
+    )
+    
+    args = parser.parse_args()
+    
+    # Run on its own, the commenter has always let .env override the environment
+    load_env_file(override=True)
+    configure_logging('linkedin_commenter.log', level=args.log_level,
+                      fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    
+    return generate_comments(max_posts=args.max_posts, dry_run=args.dry_run, db_path=args.db_path)['success']
 
 if __name__ == "__main__":
     success = main()
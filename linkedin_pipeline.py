@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+LinkedIn Pipeline - Orchestrator
+Purpose: Run the daily sequence (scrape prospects, scrape 1st connections, like, generate, post)
+         as stages of one process, with the randomized inter-stage delays of linkedin_automation.sh
+Usage:
+    python linkedin_pipeline.py [--only=like,post | --skip=generate] [--no-delays] [--summary-file=run.json]
+
+Each stage imports its script lazily, so dotenv, the schema migrations, the
+shared SQLite connection and the HTTP clients are set up once per process;
+the liker and comment poster share one LinkedIn client. A failing stage is
+recorded and the sequence moves on, like the shell script did. The run
+summary (per-stage status, exit status, duration and batch totals) is
+printed as JSON; the exit status is 1 when any selected stage failed.
+"""
+
+import argparse
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from backend.settings import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+class Stage(NamedTuple):
+    name: str
+    run: Callable[["PipelineContext"], Dict]
+    # Random pause before the stage, in seconds
+    delay: Tuple[int, int]
+    # Extra random start offset inside the stage's window (liker and poster)
+    start_window: Tuple[int, int] = (0, 0)
+
+
+class PipelineContext:
+    """Objects shared between stages of one run, created on first use."""
+
+    def __init__(self):
+        self.linkedin_http = None
+
+    def share_linkedin_client(self, worker) -> None:
+        # The liker and poster talk to the same host with the same headers;
+        # a worker's own client is only created on first use, so none is wasted
+        if self.linkedin_http is None:
+            self.linkedin_http = worker.http
+        else:
+            worker.http = self.linkedin_http
+
+
+def _scrape_prospects(context: PipelineContext) -> Dict:
+    from retrieve_posts_prospects import PostScraper
+    return PostScraper().scrape_batch(max_profiles=15)
+
+
+def _scrape_connections(context: PipelineContext) -> Dict:
+    from retrieve_post_1stconnections import PostScraper
+    return PostScraper().scrape_batch(max_profiles=15)
+
+
+def _like(context: PipelineContext) -> Dict:
+    from linkedin_post_liker import PostLiker
+    liker = PostLiker()
+    context.share_linkedin_client(liker)
+    return liker.like_posts_batch(max_likes=25, delay_range=(5, 25))
+
+
+def _generate(context: PipelineContext) -> Dict:
+    from linkedin_commenter import generate_comments
+    return generate_comments()
+
+
+def _post(context: PipelineContext) -> Dict:
+    from linkedin_comment_poster import CommentPoster
+    poster = CommentPoster()
+    context.share_linkedin_client(poster)
+    return poster.post_comments_batch(max_comments=25, delay_range=(30, 90))
+
+
+# Same order, batch sizes and delays as linkedin_automation.sh
+STAGES: List[Stage] = [
+    Stage("scrape_prospects", _scrape_prospects, delay=(0, 300)),
+    Stage("scrape_connections", _scrape_connections, delay=(120, 480)),
+    # Longer pause before engagement, then a start anywhere in a 45-minute window
+    Stage("like", _like, delay=(180, 720), start_window=(0, 2700)),
+    Stage("generate", _generate, delay=(300, 900)),
+    Stage("post", _post, delay=(600, 1500), start_window=(0, 2700)),
+]
+STAGE_NAMES = [stage.name for stage in STAGES]
+
+
+def select_stages(stages: List[Stage], only: Optional[List[str]] = None,
+                  skip: Optional[List[str]] = None) -> List[Stage]:
+    """Return ``stages`` filtered by ``--only``/``--skip`` names, in pipeline order."""
+    names = {stage.name for stage in stages}
+    unknown = set(only or []) | set(skip or [])
+    unknown -= names
+    if unknown:
+        raise ValueError(f"Unknown stages: {', '.join(sorted(unknown))} (choose from {', '.join(STAGE_NAMES)})")
+    return [
+        stage for stage in stages
+        if (not only or stage.name in only) and stage.name not in (skip or [])
+    ]
+
+
+def _summarize_result(result) -> Dict:
+    """Batch totals of a stage result, without the per-item result lists."""
+    if not isinstance(result, dict):
+        return {}
+    return {key: value for key, value in result.items() if key != 'results'}
+
+
+def run_pipeline(stages: List[Stage], delays: bool = True,
+                 sleep: Callable[[float], None] = time.sleep,
+                 rng: random.Random = random) -> Dict:
+    """
+    Run ``stages`` in order and return the run summary.
+
+    Delays are only taken before stages that run. A stage fails when it
+    raises or returns ``success: False``; the remaining stages still run.
+    """
+    context = PipelineContext()
+    started = time.monotonic()
+    summary = {
+        'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'stages': [],
+    }
+
+    for stage in stages:
+        if delays:
+            delay = rng.randint(*stage.delay) + rng.randint(*stage.start_window)
+            logger.info(f"Delay before {stage.name}: {delay} seconds ({delay // 60} minutes)")
+            sleep(delay)
+
+        logger.info(f"Stage {stage.name}: starting")
+        stage_started = time.monotonic()
+        record = {'stage': stage.name}
+        try:
+            result = stage.run(context)
+            record['result'] = _summarize_result(result)
+            failed = isinstance(result, dict) and result.get('success') is False
+            if failed:
+                record['error'] = result.get('error', 'Stage reported failure')
+        except Exception as e:
+            logger.error(f"Stage {stage.name} raised: {e}", exc_info=True)
+            record['error'] = str(e)
+            failed = True
+        # SystemExit and KeyboardInterrupt still stop the run
+
+        record['status'] = 'failed' if failed else 'ok'
+        record['exit_status'] = 1 if failed else 0
+        record['duration_seconds'] = round(time.monotonic() - stage_started, 2)
+        summary['stages'].append(record)
+        logger.info(f"{'❌' if failed else '✅'} Stage {stage.name} {record['status']} "
+                    f"in {record['duration_seconds']}s")
+
+    if context.linkedin_http is not None:
+        context.linkedin_http.close()
+
+    summary['duration_seconds'] = round(time.monotonic() - started, 2)
+    summary['exit_status'] = max((record['exit_status'] for record in summary['stages']), default=0)
+    return summary
+
+
+def _stage_list(value: str) -> List[str]:
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def main():
+    """Main function."""
+    parser = argparse.ArgumentParser(description="LinkedIn engagement pipeline")
+    selection = parser.add_mutually_exclusive_group()
+    selection.add_argument('--only', type=_stage_list, default=None,
+                           help=f"Comma-separated stages to run ({', '.join(STAGE_NAMES)})")
+    selection.add_argument('--skip', type=_stage_list, default=None,
+                           help='Comma-separated stages to leave out')
+    parser.add_argument('--no-delays', action='store_true',
+                        help='Run the stages back to back, without the randomized delays')
+    parser.add_argument('--summary-file', type=str, default=None,
+                        help='Also write the JSON run summary to this file')
+
+    args = parser.parse_args()
+    configure_logging('linkedin_automation.log')
+
+    try:
+        stages = select_stages(STAGES, only=args.only, skip=args.skip)
+    except ValueError as e:
+        parser.error(str(e))
+
+    logger.info(f"=== Starting LinkedIn pipeline: {', '.join(stage.name for stage in stages)} ===")
+    summary = run_pipeline(stages, delays=not args.no_delays)
+    logger.info("=== LinkedIn pipeline completed ===")
+
+    text = json.dumps(summary, indent=2, default=str)
+    print(text)
+    if args.summary_file:
+        with open(args.summary_file, 'w', encoding='utf-8') as f:
+            f.write(text + "\n")
+
+    sys.exit(summary['exit_status'])
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,8 @@ Usage:
     python post_liker.py [--max-likes=25] [--delay=5]
 """
 
-import os
 import sys
 import sqlite3
-import requests
 import json
 import re
 import time
@@ -17,147 +15,65 @@ import logging
 import argparse
 import random
 from datetime import datetime, date
+from functools import cached_property
 from typing import Dict, Optional, List, Tuple
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('post_liker.log')
-    ]
-)
-logger = logging.getLogger(__name__)
-
-# Database and LinkedIn API configuration
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+from backend.counters import ensure_counters, read_counter, read_counters, report_counter_drift
+from backend.database import get_connection
+from backend.identity_cache import CACHE_FILE_NAME, IdentityCache
+from backend.leases import WorkLease
+from backend.posts import backfill_posted_timestamps, recency_cutoff_ms
+from backend.schema import migrate
+from backend.settings import LINKEDIN_CREDENTIALS, Settings, configure_logging, load_settings
+from backend.urns import THREAD_URN_MISMATCH, extract_thread_urn, record_thread_urn, resolve_thread_urn
 
-# Database configuration
-DB_PATH = os.getenv("DB_PATH", "linkedin_project_db.sqlite3")
+logger = logging.getLogger(__name__)
 
-# LinkedIn API credentials from environment
-CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
-CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
-ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
-LINKEDIN_PROFILE_ID = os.getenv("LINKEDIN_PROFILE_ID")
+# Only posts newer than this are liked
+RECENT_POST_DAYS = 21
 
-# Validate required environment variables
-required_vars = ["LINKEDIN_CLIENT_ID", "LINKEDIN_CLIENT_SECRET", "LINKEDIN_ACCESS_TOKEN", "LINKEDIN_PROFILE_ID"]
-missing_vars = [var for var in required_vars if not os.getenv(var)]
-if missing_vars:
-    raise ValueError(f"Missing required environment variables: {', '.join(missing_vars)}")
+# Most recent posts liked per profile in one batch
+MAX_LIKES_PER_PROFILE = 3
 
 class PostLiker:
-    def __init__(self, db_path: str = DB_PATH):
+    def __init__(self, db_path: Optional[str] = None, settings: Optional[Settings] = None):
         """Initialize the post liker."""
-        self.db_path = db_path
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.settings = settings or load_settings()
+        self.db_path = db_path or self.settings.db_path
+        self.identity_cache = IdentityCache(
+            self.settings.identity_cache_path or Path(self.db_path).resolve().with_name(CACHE_FILE_NAME),
+            ttl_seconds=self.settings.identity_cache_ttl_hours * 3600,
+            token_expires_at=self.settings.token_expires_at,
+        )
+        self._setup_database()
+        # Claims on the posts this worker likes, so parallel likers split the queue
+        self.lease = WorkLease(self.get_db_connection(), "posts", owner=self.settings.worker_id,
+                               lease_seconds=self.settings.lease_seconds)
+
+    @cached_property
+    def http(self):
+        """LinkedIn API client, created (and httpx imported) on first use."""
+        from backend.http_client import HttpClient
+
+        return HttpClient(headers={
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         })
-        self._setup_database()
         
     def _setup_database(self):
         """Ensure required database tables and columns exist."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Create profiles table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    username TEXT,
-                    profile_url TEXT NOT NULL,
-                    company_name TEXT,
-                    job_title TEXT,
-                    status TEXT DEFAULT 'not_started',
-                    connection_status TEXT DEFAULT 'prospect',
-                    job_title_score INTEGER DEFAULT 0,
-                    priority_score INTEGER DEFAULT 0,
-                    last_action_date DATE,
-                    weekly_batch INTEGER,
-                    daily_slot INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(profile_url, username)
-                )
-            """)
-            
-            # Create posts table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS posts (
-                    post_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    urn TEXT,
-                    profile_id INTEGER NOT NULL,
-                    text TEXT,
-                    cleaned_text TEXT,
-                    category TEXT,
-                    media_type TEXT,
-                    media_url TEXT,
-                    post_url TEXT,
-                    processed_post_text TEXT,
-                    total_reaction_count INTEGER DEFAULT 0,
-                    like_count INTEGER DEFAULT 0,
-                    appreciation_count INTEGER DEFAULT 0,
-                    empathy_count INTEGER DEFAULT 0,
-                    interest_count INTEGER DEFAULT 0,
-                    praise_count INTEGER DEFAULT 0,
-                    comments_count INTEGER DEFAULT 0,
-                    reposts_count INTEGER DEFAULT 0,
-                    entertainments_count INTEGER DEFAULT 0,
-                    posted_at TEXT,
-                    posted_date TEXT,
-                    scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ocr_text TEXT,
-                    poster_first_name TEXT,
-                    poster_last_name TEXT,
-                    poster_headline TEXT,
-                    poster_image_url TEXT,
-                    poster_linkedin_url TEXT,
-                    poster_public_id TEXT,
-                    article_title TEXT,
-                    article_subtitle TEXT,
-                    article_target_url TEXT,
-                    article_description TEXT,
-                    reshared BOOLEAN DEFAULT 0,
-                    resharer_comment TEXT,
-                    share_url TEXT,
-                    content_type TEXT,
-                    posted_date_timestamp INTEGER,
-                    reposted BOOLEAN DEFAULT 0,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (profile_id)
-                )
-            """)
-            
-            # Add missing columns to existing posts table
-            cursor.execute("PRAGMA table_info(posts)")
-            existing_columns = {col[1] for col in cursor.fetchall()}
-            
-            new_columns = [
-                ("liked_to_linkedin_at", "TIMESTAMP"),
-                ("linkedin_like_id", "TEXT"),
-                ("linkedin_like_urn", "TEXT"),
-                ("is_post_liked", "BOOLEAN DEFAULT FALSE"),
-                ("like_failed", "BOOLEAN DEFAULT FALSE")
-            ]
-            
-            for column_name, column_def in new_columns:
-                if column_name not in existing_columns:
-                    try:
-                        cursor.execute(f"ALTER TABLE posts ADD COLUMN {column_name} {column_def}")
-                        logger.info(f"Added column {column_name} to posts table")
-                    except sqlite3.OperationalError as e:
-                        if "duplicate column" not in str(e).lower():
-                            raise
-            
-            conn.commit()
-            conn.close()
+
+            # Versioned tables, columns and indexes shared by every script
+            migrate(conn)
+
+            # Recency filters read posted_date_timestamp; fill it for legacy rows
+            backfill_posted_timestamps(conn)
+
+            # Trigger-maintained counters read by the stats methods
+            ensure_counters(conn)
+
             logger.info("Database setup completed")
             
         except Exception as e:
@@ -165,106 +81,111 @@ class PostLiker:
             raise
 
     def get_db_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            raise
+        """Return the shared, long-lived database connection for this process."""
+        return get_connection(self.db_path)
 
     def get_headers(self) -> Dict[str, str]:
         """Generate headers for LinkedIn API requests."""
         return {
-            "Authorization": f"Bearer {ACCESS_TOKEN}",
+            "Authorization": f"Bearer {self.settings.linkedin_access_token}",
             "Content-Type": "application/json",
             "X-Restli-Protocol-Version": "2.0.0",
         }
 
-    def get_posts_to_like(self) -> List[Dict]:
-        """Get posts from profiles in week1_liking status with recent posts (max 3 per profile)."""
+    def get_posts_to_like(self, max_likes: Optional[int] = None,
+                          per_profile: int = MAX_LIKES_PER_PROFILE) -> List[Dict]:
+        """
+        Get posts from profiles in week1_liking status with recent posts.
+
+        The per-profile cap (most recent ``per_profile`` posts) and the batch
+        size ``max_likes`` are applied in SQL, so only the rows that will be
+        liked are fetched, highest job_title_score first, newest first.
+        Posts leased by another worker are left out after ranking, so two
+        likers never exceed the cap of one profile between them.
+        """
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Check if required columns exist
-            cursor.execute("PRAGMA table_info(posts)")
-            existing_columns = {col[1] for col in cursor.fetchall()}
-            
-            # Build the query based on available columns
-            if 'is_post_liked' in existing_columns:
-                liked_condition = "AND (posts.is_post_liked IS NULL OR posts.is_post_liked = FALSE)"
-            else:
-                liked_condition = ""
-            
-            query = f"""
-                SELECT profiles.profile_id, profiles.first_name, profiles.last_name,
-                       profiles.connection_status,
-                       posts.post_id, posts.urn, posts.text, posts.posted_date
-                FROM profiles
-                JOIN posts ON posts.profile_id = profiles.profile_id
-                WHERE profiles.status = 'week1_liking'
-                  AND date(substr(posts.posted_date, 1, 10)) > date('now', '-21 days')
-                  {liked_condition}
-                  AND posts.urn IS NOT NULL
-                  AND posts.urn != ''
-                ORDER BY profiles.job_title_score DESC, posts.posted_date DESC
+            # Columns come from backend.schema migrations, so the SQL is static
+            # and reused from the connection's statement cache
+            query = """
+                SELECT profile_id, first_name, last_name, connection_status,
+                       post_id, urn, posted_date
+                FROM (
+                    SELECT profiles.profile_id, profiles.first_name, profiles.last_name,
+                           profiles.connection_status, profiles.job_title_score,
+                           posts.post_id, posts.urn, posts.posted_date, posts.posted_date_timestamp,
+                           posts.lease_owner, posts.lease_expires_at,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY posts.profile_id
+                               ORDER BY posts.posted_date_timestamp DESC, posts.post_id DESC
+                           ) AS profile_rank
+                    FROM profiles
+                    JOIN posts ON posts.profile_id = profiles.profile_id
+                    WHERE profiles.status = 'week1_liking'
+                      AND posts.posted_date_timestamp > ?
+                      AND (posts.is_post_liked IS NULL OR posts.is_post_liked = FALSE)
+                      AND posts.urn IS NOT NULL
+                      AND posts.urn != ''
+                )
+                WHERE profile_rank <= ?
+                  AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires_at <= ?)
+                ORDER BY job_title_score DESC, posted_date_timestamp DESC, post_id DESC
+                LIMIT ?
             """
             
             logger.debug(f"Executing query: {query}")
-            cursor.execute(query)
+            # SQLite treats a negative LIMIT as no limit
+            cursor.execute(query, (
+                recency_cutoff_ms(RECENT_POST_DAYS),
+                per_profile,
+                *self.lease.params(),
+                -1 if max_likes is None else max_likes,
+            ))
             
-            all_posts = [dict(row) for row in cursor.fetchall()]
-            conn.close()
+            posts = [dict(row) for row in cursor.fetchall()]
             
-            # Apply per-profile rate limiting (max 3 posts per profile)
-            if not all_posts:
+            if not posts:
                 logger.info("No posts found that need liking")
                 return []
             
-            profile_counts = {}
-            filtered_posts = []
-            
-            for post in all_posts:
-                profile_id = post['profile_id']
-                current_count = profile_counts.get(profile_id, 0)
-                
-                if current_count < 3:  # Max 3 posts per profile
-                    filtered_posts.append(post)
-                    profile_counts[profile_id] = current_count + 1
-            
-            logger.info(f"Found {len(filtered_posts)} posts ready for liking (max 3 per profile)")
-            if len(all_posts) != len(filtered_posts):
-                profiles_limited = len([p for p in profile_counts.values() if p >= 3])
-                logger.info(f"Rate limiting applied: {len(all_posts)} total posts → {len(filtered_posts)} posts "
-                           f"({profiles_limited} profiles hit the 3-post limit)")
-            
-            return filtered_posts
+            logger.info(f"Found {len(posts)} posts ready for liking (max {per_profile} per profile)")
+            return posts
             
         except Exception as e:
             logger.error(f"Error getting posts to like: {e}")
             return []
 
     def validate_linkedin_credentials(self) -> Dict:
-        """Validate LinkedIn credentials and get user info."""
+        """Validate LinkedIn credentials and get user info (from the identity cache when warm)."""
+        cached = self.identity_cache.get(self.settings.linkedin_access_token)
+        if cached and cached.get('sub'):
+            logger.info(f"Using cached LinkedIn identity. User ID: {cached['sub']}")
+            return {'valid': True, 'user_id': cached['sub'], 'user_data': cached, 'cached': True}
+
         try:
             url = "https://api.linkedin.com/v2/userinfo"
             headers = self.get_headers()
             
             logger.info("Validating LinkedIn credentials...")
-            response = self.session.get(url, headers=headers, timeout=30)
+            response = self.http.get(url, headers=headers, endpoint="linkedin userinfo")
             
             if response.status_code == 200:
                 user_data = response.json()
                 user_id = user_data.get('sub')
                 logger.info(f"LinkedIn validation successful. User ID: {user_id}")
+                if user_id:
+                    # Only the member ID is kept on disk
+                    self.identity_cache.put(self.settings.linkedin_access_token, {'sub': user_id})
                 return {
                     'valid': True,
                     'user_id': user_id,
                     'user_data': user_data
                 }
             else:
+                if response.status_code == 401:
+                    self.identity_cache.invalidate(self.settings.linkedin_access_token)
                 logger.error(f"LinkedIn validation failed: {response.status_code}")
                 logger.error(f"Response: {response.text}")
                 return {'valid': False, 'error': f"HTTP {response.status_code}"}
@@ -314,8 +235,16 @@ class PostLiker:
         return f"https://api.linkedin.com/v2/socialActions/{encoded_urn}/likes"
 
     def like_post_on_linkedin(self, post_urn: str, user_id: str) -> Optional[Dict]:
-        """Like post on LinkedIn using v2 API with retry logic for URN mismatches."""
-        formatted_urn = self.format_post_urn(post_urn)
+        """
+        Like post on LinkedIn using v2 API with retry logic for URN mismatches.
+
+        A thread URN resolved earlier (urn_resolutions) is used directly; one
+        learned from a mismatch error is stored before the retry.
+        """
+        import httpx
+
+        formatted_urn = (resolve_thread_urn(self.get_db_connection(), post_urn)
+                         or self.format_post_urn(post_urn))
         
         try:
             logger.info(f"Attempting to like post: {formatted_urn}")
@@ -324,7 +253,10 @@ class PostLiker:
             headers = self.get_headers()
             endpoint_url = self.get_like_endpoint_url(formatted_urn)
             
-            response = self.session.post(endpoint_url, headers=headers, json=payload, timeout=30)
+            # A repeated like answers 409, which counts as success, so 5xx and
+            # read timeouts are safe to retry
+            response = self.http.post(endpoint_url, headers=headers, json=payload,
+                                      endpoint="linkedin like", idempotent=True)
             
             if response.status_code in [200, 201]:
                 response_data = response.json() if response.content else {}
@@ -348,44 +280,33 @@ class PostLiker:
                     'response_data': {'status': 'already_liked'}
                 }
             else:
-                raise requests.exceptions.HTTPError(response=response)
+                raise httpx.HTTPStatusError(f"HTTP {response.status_code}",
+                                            request=response.request, response=response)
 
-        except requests.exceptions.HTTPError as e:
+        except httpx.HTTPStatusError as e:
             error_text = e.response.text
             
             # Handle URN mismatch with retry logic
-            if e.response.status_code == 400 and "is not the same as the actual threadUrn" in error_text:
+            if e.response.status_code == 400 and THREAD_URN_MISMATCH in error_text:
                 logger.warning(f"URN mismatch for {formatted_urn}. Attempting to extract correct URN.")
                 
                 # Extract correct URN from error message - support multiple formats
-                correct_urn = None
-                
-                # Try different URN patterns
-                patterns = [
-                    r'actual threadUrn: (urn:li:activity:\d+)',  # Most common pattern
-                    r'actual threadUrn: (urn:li:ugcPost:\d+)',   # Alternative pattern
-                    r'(urn:li:activity:\d+)',                    # Fallback activity pattern
-                    r'(urn:li:ugcPost:\d+)'                      # Fallback ugcPost pattern
-                ]
-                
-                for pattern in patterns:
-                    match = re.search(pattern, error_text)
-                    if match:
-                        correct_urn = match.group(1)
-                        logger.info(f"Found correct URN using pattern '{pattern}': {correct_urn}")
-                        break
+                correct_urn = extract_thread_urn(error_text)
                 
                 if correct_urn:
+                    # Remember it so this post is never resolved again
+                    record_thread_urn(self.get_db_connection(), post_urn, correct_urn, 'mismatch')
                     try:
                         # Retry with correct URN
                         retry_payload = self.create_linkedin_like_payload(correct_urn, user_id)
                         retry_endpoint_url = self.get_like_endpoint_url(correct_urn)
                         
-                        retry_response = self.session.post(
-                            retry_endpoint_url, 
-                            headers=headers, 
-                            json=retry_payload, 
-                            timeout=30
+                        retry_response = self.http.post(
+                            retry_endpoint_url,
+                            headers=headers,
+                            json=retry_payload,
+                            endpoint="linkedin like",
+                            idempotent=True
                         )
                         
                         if retry_response.status_code in [200, 201]:
@@ -419,6 +340,9 @@ class PostLiker:
                     logger.error(f"Could not extract correct URN from error: {error_text}")
                     return None
             else:
+                if e.response.status_code == 401:
+                    # The token was revoked or expired: validate again next run
+                    self.identity_cache.invalidate(self.settings.linkedin_access_token)
                 logger.error(f"LinkedIn API error: {e.response.status_code} - {error_text}")
                 return None
         
@@ -432,46 +356,16 @@ class PostLiker:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Check what columns exist
-            cursor.execute("PRAGMA table_info(posts)")
-            existing_columns = {col[1] for col in cursor.fetchall()}
-            
-            # Build update query based on available columns
-            update_parts = []
-            params = []
-            
-            if 'is_post_liked' in existing_columns:
-                update_parts.append("is_post_liked = TRUE")
-            
-            if 'liked_to_linkedin_at' in existing_columns:
-                update_parts.append("liked_to_linkedin_at = CURRENT_TIMESTAMP")
-            
-            if 'linkedin_like_id' in existing_columns:
-                update_parts.append("linkedin_like_id = ?")
-                params.append(linkedin_like_id)
-            
-            if 'linkedin_like_urn' in existing_columns:
-                update_parts.append("linkedin_like_urn = ?")
-                params.append(linkedin_like_urn)
-            
-            if not update_parts:
-                logger.warning("No appropriate columns found to mark post as liked")
-                conn.close()
-                return False
-            
-            params.append(post_id)
-            
-            update_sql = f"""
-                UPDATE posts
-                SET {', '.join(update_parts)}
-                WHERE post_id = ?
-            """
-            
-            cursor.execute(update_sql, params)
-            
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+            with conn:
+                cursor.execute("""
+                    UPDATE posts
+                    SET is_post_liked = TRUE,
+                        liked_to_linkedin_at = CURRENT_TIMESTAMP,
+                        linkedin_like_id = ?,
+                        linkedin_like_urn = ?
+                    WHERE post_id = ?
+                """, (linkedin_like_id, linkedin_like_urn, post_id))
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Marked post {post_id} as liked")
@@ -490,11 +384,7 @@ class PostLiker:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            # Check if like_failed column exists
-            cursor.execute("PRAGMA table_info(posts)")
-            existing_columns = {col[1] for col in cursor.fetchall()}
-            
-            if 'like_failed' in existing_columns:
+            with conn:
                 cursor.execute("""
                     UPDATE posts
                     SET like_failed = TRUE
@@ -502,15 +392,10 @@ class PostLiker:
                 """, (post_id,))
                 
                 updated = cursor.rowcount > 0
-                conn.commit()
-                
-                if updated:
-                    logger.info(f"Marked post {post_id} as failed to like: {error_message}")
-            else:
-                logger.info(f"Post {post_id} failed to like (no tracking column): {error_message}")
-                updated = True  # Consider it successful since we logged it
             
-            conn.close()
+            if updated:
+                logger.info(f"Marked post {post_id} as failed to like: {error_message}")
+            
             return updated
             
         except sqlite3.Error as e:
@@ -531,18 +416,14 @@ class PostLiker:
     def update_profile_status(self, profile_id: int, new_status: str, reason: str = "") -> bool:
         """Update profile status after successful like."""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                UPDATE profiles 
-                SET status = ?, last_action_date = date('now')
-                WHERE profile_id = ?
-            """, (new_status, profile_id))
+            with self.get_db_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE profiles 
+                    SET status = ?, last_action_date = date('now')
+                    WHERE profile_id = ?
+                """, (new_status, profile_id))
             
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Updated profile {profile_id} to status '{new_status}'. {reason}")
@@ -622,8 +503,9 @@ class PostLiker:
         return result
 
     def like_posts_batch(self, max_likes: int = 25, delay_range: Tuple[int, int] = (5, 25)) -> Dict:
-        """Like a batch of posts with human-like delays."""
+        """Like a batch of posts with human-like delays; the posts are leased to this worker until it ends."""
         logger.info(f"Starting post liking batch (max {max_likes} likes)")
+        self.settings.require(*LINKEDIN_CREDENTIALS)
         
         # Validate credentials
         validation_result = self.validate_linkedin_credentials()
@@ -646,8 +528,9 @@ class PostLiker:
                 'profiles_advanced': 0
             }
         
-        # Get posts to like
-        posts_to_like = self.get_posts_to_like()
+        # Get posts to like, already capped per profile and at max_likes, and
+        # keep the ones this worker wins the lease on
+        posts_to_like = self.lease.claim_rows(self.get_posts_to_like(max_likes=max_likes))
         
         if not posts_to_like:
             logger.info("No posts found that need liking")
@@ -658,8 +541,7 @@ class PostLiker:
                 'message': 'No posts to like'
             }
         
-        # Limit to max_likes
-        posts_to_process = posts_to_like[:max_likes]
+        posts_to_process = posts_to_like
         logger.info(f"Processing {len(posts_to_process)} posts")
         
         batch_results = {
@@ -670,26 +552,30 @@ class PostLiker:
             'results': []
         }
         
-        for i, post_data in enumerate(posts_to_process):
-            logger.info(f"Processing post {i+1}/{len(posts_to_process)}")
-            
-            # Like the post
-            result = self.like_post(post_data, user_id)
-            batch_results['results'].append(result)
-            
-            if result['success']:
-                batch_results['likes_completed'] += 1
-                if result['profile_updated']:
-                    batch_results['profiles_advanced'] += 1
-            else:
-                if 'error' in result:
-                    batch_results['errors'].append(result['error'])
-            
-            # Apply human-like delay between likes (except after the last one)
-            if i < len(posts_to_process) - 1:
-                delay = random.randint(delay_range[0], delay_range[1])
-                logger.info(f"Human-like delay: {delay}s...")
-                time.sleep(delay)
+        try:
+            for i, post_data in enumerate(posts_to_process):
+                logger.info(f"Processing post {i+1}/{len(posts_to_process)}")
+                self.lease.heartbeat()
+                
+                # Like the post
+                result = self.like_post(post_data, user_id)
+                batch_results['results'].append(result)
+                
+                if result['success']:
+                    batch_results['likes_completed'] += 1
+                    if result['profile_updated']:
+                        batch_results['profiles_advanced'] += 1
+                else:
+                    if 'error' in result:
+                        batch_results['errors'].append(result['error'])
+                
+                # Apply human-like delay between likes (except after the last one)
+                if i < len(posts_to_process) - 1:
+                    delay = random.randint(delay_range[0], delay_range[1])
+                    logger.info(f"Human-like delay: {delay}s...")
+                    time.sleep(delay)
+        finally:
+            self.lease.release()
         
         logger.info(f"Batch liking completed: {batch_results['likes_completed']} likes, {batch_results['profiles_advanced']} profiles advanced")
         return batch_results
@@ -723,35 +609,33 @@ class PostLiker:
             for row in week1_details:
                 logger.info(f"  Profile {row['profile_id']} ({row['first_name']} {row['last_name']}): Post {row['post_id']}, URN: {row['urn']}, Date: {row['posted_date']}, Liked: {row['is_post_liked']}")
             
-            # Check the exact query we use
+            # Check the exact recency test we use
+            cutoff_ms = recency_cutoff_ms(RECENT_POST_DAYS)
             cursor.execute("""
                 SELECT profiles.profile_id, profiles.first_name, profiles.last_name,
                        posts.post_id, posts.urn, posts.posted_date,
-                       date(posts.posted_date) as parsed_date,
-                       date(substr(posts.posted_date, 1, 10)) as substr_date,
-                       date('now', '-21 days') as threshold_date,
-                       (date(posts.posted_date) > date('now', '-21 days')) as is_recent_original,
-                       (date(substr(posts.posted_date, 1, 10)) > date('now', '-21 days')) as is_recent_substr,
-                       julianday('now') - julianday(substr(posts.posted_date, 1, 10)) as days_ago
+                       datetime(posts.posted_date_timestamp / 1000, 'unixepoch') as parsed_date,
+                       datetime(? / 1000, 'unixepoch') as threshold_date,
+                       (posts.posted_date_timestamp > ?) as is_recent,
+                       (strftime('%s', 'now') * 1000 - posts.posted_date_timestamp) / 86400000.0 as days_ago
                 FROM profiles
                 JOIN posts ON posts.profile_id = profiles.profile_id
                 WHERE profiles.status = 'week1_liking'
                   AND posts.urn IS NOT NULL
                   AND posts.urn != ''
                 LIMIT 5
-            """)
+            """, (cutoff_ms, cutoff_ms))
             query_details = cursor.fetchall()
             logger.info("Query breakdown (before date filter):")
             for row in query_details:
                 logger.info(f"  Profile {row['profile_id']}: Post {row['post_id']}, Date: {row['posted_date']}, Parsed: {row['parsed_date']}, Threshold: {row['threshold_date']}, Recent: {row['is_recent']}")
             
-            conn.close()
             
         except Exception as e:
             logger.error(f"Error in debug query: {e}")
 
     def get_liking_stats(self) -> Dict:
-        """Get current liking statistics."""
+        """Get current liking statistics (counts from the pipeline counters)."""
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
@@ -759,76 +643,43 @@ class PostLiker:
             stats = {}
             
             # Profiles by status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM profiles 
-                GROUP BY status
-            """)
-            status_counts = {}
-            for row in cursor.fetchall():
-                status_counts[row['status']] = row['count']
-            stats['status_breakdown'] = status_counts
+            stats['status_breakdown'] = read_counters(conn, 'profile_status')
             
             # Posts stats
-            cursor.execute("SELECT COUNT(*) as count FROM posts WHERE urn IS NOT NULL AND urn != ''")
-            stats['total_posts_with_urn'] = cursor.fetchone()['count']
-            
-            # Check if columns exist before querying them
-            cursor.execute("PRAGMA table_info(posts)")
-            existing_columns = {col[1] for col in cursor.fetchall()}
-            
-            if 'is_post_liked' in existing_columns:
-                cursor.execute("SELECT COUNT(*) as count FROM posts WHERE is_post_liked = TRUE")
-                stats['liked_posts'] = cursor.fetchone()['count']
-            else:
-                stats['liked_posts'] = 0
-            
-            if 'like_failed' in existing_columns:
-                cursor.execute("SELECT COUNT(*) as count FROM posts WHERE like_failed = TRUE")
-                stats['failed_likes'] = cursor.fetchone()['count']
-            else:
-                stats['failed_likes'] = 0
-            
-            # Week1 liking candidates with debug info
+            stats['total_posts_with_urn'] = read_counter(conn, 'posts', 'with_urn')[0]
+            liked_posts, last_liked = read_counter(conn, 'likes', 'liked')
+            stats['liked_posts'] = liked_posts
+            stats['failed_likes'] = read_counter(conn, 'likes', 'failed')[0]
+            
+            # Week1 liking candidates with debug info; counts over the recency
+            # window depend on the clock, so they stay as indexed queries
+            cutoff_ms = recency_cutoff_ms(RECENT_POST_DAYS)
             cursor.execute("""
                 SELECT COUNT(DISTINCT profiles.profile_id) as count
                 FROM profiles
                 JOIN posts ON posts.profile_id = profiles.profile_id
                 WHERE profiles.status = 'week1_liking'
-                  AND date(substr(posts.posted_date, 1, 10)) > date('now', '-21 days')
+                  AND posts.posted_date_timestamp > ?
                   AND (posts.is_post_liked IS NULL OR posts.is_post_liked = FALSE)
                   AND posts.urn IS NOT NULL
                   AND posts.urn != ''
-            """)
+            """, (cutoff_ms,))
             stats['week1_candidates'] = cursor.fetchone()['count']
             
             # Debug: Check what profiles are in week1_liking
-            cursor.execute("SELECT COUNT(*) as count FROM profiles WHERE status = 'week1_liking'")
-            stats['debug_week1_profiles'] = cursor.fetchone()['count']
+            stats['debug_week1_profiles'] = stats['status_breakdown'].get('week1_liking', 0)
             
             # Debug: Check posts with recent dates
             cursor.execute("""
                 SELECT COUNT(*) as count FROM posts 
-                WHERE date(substr(posts.posted_date, 1, 10)) > date('now', '-21 days')
+                WHERE posted_date_timestamp > ?
                 AND urn IS NOT NULL AND urn != ''
-            """)
+            """, (cutoff_ms,))
             stats['debug_recent_posts'] = cursor.fetchone()['count']
             
             # Last liked date
-            if 'liked_to_linkedin_at' in existing_columns:
-                cursor.execute("""
-                    SELECT liked_to_linkedin_at 
-                    FROM posts 
-                    WHERE is_post_liked = TRUE 
-                    ORDER BY liked_to_linkedin_at DESC 
-                    LIMIT 1
-                """)
-                result = cursor.fetchone()
-                stats['last_liked'] = result['liked_to_linkedin_at'] if result else None
-            else:
-                stats['last_liked'] = None
+            stats['last_liked'] = last_liked
             
-            conn.close()
             return stats
             
         except Exception as e:
@@ -848,13 +699,19 @@ def main():
                        help='Show statistics only, do not like posts')
     parser.add_argument('--debug', action='store_true',
                        help='Show detailed debug information about posts and profiles')
+    parser.add_argument('--verify-counters', action='store_true',
+                       help='Recount the pipeline counters with full scans, repair any drift and exit')
     
     args = parser.parse_args()
+    configure_logging('post_liker.log')
     
     try:
         # Initialize liker
         liker = PostLiker()
         
+        if args.verify_counters:
+            sys.exit(0 if report_counter_drift(liker.get_db_connection()) else 1)
+        
         # Show current stats
         logger.info("Current liking statistics:")
         stats = liker.get_liking_stats()
@@ -871,7 +728,7 @@ def main():
         
         # Debug information
         logger.info(f"DEBUG - Profiles in week1_liking status: {stats.get('debug_week1_profiles', 0)}")
-        logger.info(f"DEBUG - Posts with recent dates (<21 days): {stats.get('debug_recent_posts', 0)}")
+        logger.info(f"DEBUG - Posts with recent dates (<{RECENT_POST_DAYS} days): {stats.get('debug_recent_posts', 0)}")
         
         if stats.get('last_liked'):
             logger.info(f"Last liked: {stats['last_liked']}")
@@ -904,6 +761,9 @@ def main():
             print(f"Errors encountered: {len(results['errors'])}")
             for error in results['errors'][:3]:  # Show first 3 errors
                 print(f"  - {error}")
+        from backend.http_client import format_metrics
+        for line in format_metrics(liker.http.metrics()):
+            print(f"HTTP {line}")
         
         if results['likes_completed'] > 0:
             print("✅ Liking completed successfully!")
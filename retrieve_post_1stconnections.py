@@ -3,142 +3,119 @@
 Post Scraper - Standalone Script
 Purpose: Scrape LinkedIn posts for profiles and manage pre-qualification logic
 Usage: 
-    python post_scraper.py [--max-profiles=5] [--delay=2]
+    python post_scraper.py [--max-profiles=5] [--delay=2 | --async [--rps=2] [--concurrency=4]] [--no-cache | --refresh]
 """
 
-import os
 import sys
 import sqlite3
-import requests
 import json
 import time
 import logging
 import argparse
 from datetime import datetime, timezone, date
-from typing import List, Dict, Optional, Tuple
+from itertools import islice
+from functools import cached_property
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('post_scraper.log')
-    ]
+from backend.async_scrape import DEFAULT_CONCURRENCY, DEFAULT_REQUESTS_PER_SECOND, scrape_concurrently
+from backend.counters import ensure_counters, read_counter, read_counters, report_counter_drift
+from backend.database import get_connection
+from backend.job_titles import ensure_role_categories
+from backend.leases import WorkLease
+from backend.posts import (
+    advance_post_watermark, backfill_posted_timestamps, load_known_urns, posted_timestamp_ms, recency_cutoff_ms,
+    save_post_page,
 )
+from backend.response_cache import ResponseCache
+from backend.schema import migrate
+from backend.settings import Settings, configure_logging, load_settings
+from backend.urns import record_payload_thread_urns
+
 logger = logging.getLogger(__name__)
 
-# Load environment variables
-from dotenv import load_dotenv
-load_dotenv()
+# Profiles fetched per keyset page by iter_profiles_for_scraping
+PROFILE_PAGE_SIZE = 100
+
+POSTS_API_URL = "https://real-time-data-enrichment.p.rapidapi.com/get-profile-posts"
 
-# Configuration
-DB_PATH = os.getenv("DB_PATH", "linkedin_project_db.sqlite3")
-API_KEY = os.getenv("RAPIDAPI_KEY")  # RapidAPI key from environment
+# Cached get-profile-posts responses (shared by both scrapers); TTL and size
+# come from POSTS_CACHE_TTL_HOURS / POSTS_CACHE_MAX_MB (backend.settings)
+POSTS_CACHE_ENDPOINT = "get-profile-posts"
+# Metrics name of the posts requests sent in --async mode
+ASYNC_POSTS_ENDPOINT = "rapidapi get-profile-posts (async)"
 
-if not API_KEY:
-    raise ValueError("RAPIDAPI_KEY environment variable is required")
+# get-profile-posts pagination: pages of up to POSTS_PAGE_SIZE posts, newest
+# first. Paging stops once a page ends past the horizon (older posts are
+# never liked or commented on) or after MAX_POST_PAGES pages.
+POSTS_PAGE_SIZE = 50
+POST_HORIZON_DAYS = 30  # current connections are commented on over a longer window
+MAX_POST_PAGES = 4
 
 class PostScraper:
-    def __init__(self, db_path: str = DB_PATH, api_key: str = API_KEY):
+    def __init__(self, db_path: Optional[str] = None, api_key: Optional[str] = None,
+                 use_cache: bool = True, refresh_cache: bool = False,
+                 horizon_days: int = POST_HORIZON_DAYS, max_pages: int = MAX_POST_PAGES,
+                 settings: Optional[Settings] = None):
         """Initialize the post scraper."""
-        self.db_path = db_path
-        self.api_key = api_key
+        self.settings = settings or load_settings()
+        self.db_path = db_path or self.settings.db_path
+        self.horizon_days = horizon_days
+        self.max_pages = max_pages
+        # Stored post URNs of the profiles in the current batch (scrape_batch)
+        self.known_urns: Optional[Set[str]] = None
+        # Metrics of the posts requests sent by scrape_batch_async
+        self.async_stats = None
+        self.api_key = api_key or self.settings.rapidapi_key
+        self.api_url = POSTS_API_URL
         self.headers = {
             "x-rapidapi-key": self.api_key,
             "x-rapidapi-host": "real-time-data-enrichment.p.rapidapi.com"
         }
         self._setup_database()
+        # Claims on the profiles this worker scrapes, so parallel scrapers split the queue
+        self.lease = WorkLease(self.get_db_connection(), "profiles", owner=self.settings.worker_id,
+                               lease_seconds=self.settings.lease_seconds)
+        self.cache = ResponseCache(
+            self.get_db_connection(),
+            ttl_seconds=self.settings.posts_cache_ttl_hours * 3600,
+            max_bytes=self.settings.posts_cache_max_mb * 1024 * 1024,
+            enabled=use_cache,
+            refresh=refresh_cache,
+        )
         
+    @cached_property
+    def http(self):
+        """Pooled keep-alive client with retries, reused for every profile; created on first use."""
+        from backend.http_client import HttpClient
+
+        return HttpClient(headers=self.headers)
+
+    def http_metrics(self) -> Dict[str, Dict]:
+        """Per-endpoint metrics of the API calls made so far, synchronous and async."""
+        # Checked on the instance so a run that never used the client does not create one
+        metrics = self.http.metrics() if 'http' in vars(self) else {}
+        if self.async_stats is not None:
+            metrics[ASYNC_POSTS_ENDPOINT] = self.async_stats.as_dict()
+        return metrics
+
     def _setup_database(self):
         """Ensure required database tables exist."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            # Create posts table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS posts (
-                    post_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    urn TEXT,
-                    profile_id INTEGER NOT NULL,
-                    text TEXT,
-                    cleaned_text TEXT,
-                    category TEXT,
-                    media_type TEXT,
-                    media_url TEXT,
-                    post_url TEXT,
-                    processed_post_text TEXT,
-                    total_reaction_count INTEGER DEFAULT 0,
-                    like_count INTEGER DEFAULT 0,
-                    appreciation_count INTEGER DEFAULT 0,
-                    empathy_count INTEGER DEFAULT 0,
-                    interest_count INTEGER DEFAULT 0,
-                    praise_count INTEGER DEFAULT 0,
-                    comments_count INTEGER DEFAULT 0,
-                    reposts_count INTEGER DEFAULT 0,
-                    entertainments_count INTEGER DEFAULT 0,
-                    posted_at TEXT,
-                    posted_date TEXT,
-                    scraped_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    ocr_text TEXT,
-                    poster_first_name TEXT,
-                    poster_last_name TEXT,
-                    poster_headline TEXT,
-                    poster_image_url TEXT,
-                    poster_linkedin_url TEXT,
-                    poster_public_id TEXT,
-                    article_title TEXT,
-                    article_subtitle TEXT,
-                    article_target_url TEXT,
-                    article_description TEXT,
-                    reshared BOOLEAN DEFAULT 0,
-                    resharer_comment TEXT,
-                    share_url TEXT,
-                    content_type TEXT,
-                    posted_date_timestamp INTEGER,
-                    reposted BOOLEAN DEFAULT 0,
-                    FOREIGN KEY (profile_id) REFERENCES profiles (profile_id)
-                )
-            """)
-            
-            # Create media table if it doesn't exist
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS media (
-                    media_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    post_id INTEGER NOT NULL,
-                    media_url TEXT,
-                    media_type TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (post_id) REFERENCES posts (post_id)
-                )
-            """)
-            
-            # Create profiles table if it doesn't exist (minimal version for standalone operation)
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS profiles (
-                    profile_id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    first_name TEXT NOT NULL,
-                    last_name TEXT NOT NULL,
-                    username TEXT,
-                    profile_url TEXT NOT NULL,
-                    company_name TEXT,
-                    job_title TEXT,
-                    status TEXT DEFAULT 'not_started',
-                    connection_status TEXT DEFAULT 'prospect',
-                    job_title_score INTEGER DEFAULT 0,
-                    priority_score INTEGER DEFAULT 0,
-                    last_action_date DATE,
-                    weekly_batch INTEGER,
-                    daily_slot INTEGER,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    UNIQUE(profile_url, username)
-                )
-            """)
-            
-            conn.commit()
-            conn.close()
+
+            # Versioned tables, columns and indexes shared by every script
+            migrate(conn)
+
+            # Classify profiles stored before role_category existed
+            ensure_role_categories(conn)
+
+            # Recency filters read posted_date_timestamp; fill it for legacy rows
+            backfill_posted_timestamps(conn)
+
+            # Trigger-maintained counters read by the stats methods
+            ensure_counters(conn)
+
             logger.info("Database setup completed")
             
         except Exception as e:
@@ -146,14 +123,8 @@ class PostScraper:
             raise
 
     def get_db_connection(self) -> sqlite3.Connection:
-        """Create and return a database connection."""
-        try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
-            return conn
-        except sqlite3.Error as e:
-            logger.error(f"Database connection error: {e}")
-            raise
+        """Return the shared, long-lived database connection for this process."""
+        return get_connection(self.db_path)
 
     def extract_username_from_url(self, profile_url: str) -> Optional[str]:
         """Extract username from LinkedIn profile URL."""
@@ -171,36 +142,44 @@ class PostScraper:
             logger.error(f"Error extracting username from URL {profile_url}: {e}")
             return None
 
-    def get_profiles_for_scraping(self) -> List[Dict]:
-        """Get profiles that need post scraping (status = 'not_started')."""
+    # Product-role current connections not scraped in the last 180 days, in
+    # job_title_score DESC, profile_id order; the keyset condition continues
+    # after the last profile of the previous page. Profiles leased by another
+    # worker (backend.leases) are skipped.
+    PROFILES_FOR_SCRAPING_SQL = """
+        SELECT profile_id, first_name, last_name, username, profile_url, job_title_score,
+               posts_watermark_ts
+        FROM profiles
+        WHERE status = 'maintenance'
+          AND connection_status = 'current_connection'
+          AND role_category IN ('product_management', 'product')
+          AND job_title_score > 0
+          AND (
+              last_action_date < date('now', '-180 days')
+              OR last_action_date IS NULL
+          )
+          AND profile_url IS NOT NULL
+          AND (lease_owner IS NULL OR lease_owner = ? OR lease_expires_at <= ?)
+          {after}
+        ORDER BY COALESCE(job_title_score, -1) DESC, profile_id
+        LIMIT ?
+    """
+    KEYSET_AFTER = (
+        "AND (COALESCE(job_title_score, -1) < COALESCE(?, -1) "
+        "OR (COALESCE(job_title_score, -1) = COALESCE(?, -1) AND profile_id > ?))"
+    )
+
+    def get_profiles_for_scraping(self, limit: Optional[int] = None) -> List[Dict]:
+        """Get up to ``limit`` current connections due for a maintenance scrape."""
         try:
             conn = self.get_db_connection()
             cursor = conn.cursor()
             
-            cursor.execute("""
-                 SELECT  profile_id, first_name,
-                    last_name,
-                    username,
-                    profile_url
-                    FROM
-                    profiles
-                    WHERE
-                    status = 'maintenance'
-                AND connection_status like 'current_connection'
-				AND job_title like '%product%'
-                 AND job_title_score > 0
-               AND (
-                  last_action_date < date('now', '-180 days')
-                   OR last_action_date IS NULL
-                 )
-                    AND profile_url IS NOT NULL
-                    ORDER BY
-                    job_title_score DESC,
-                    profile_id;
-            """)
+            # SQLite treats a negative LIMIT as no limit
+            cursor.execute(self.PROFILES_FOR_SCRAPING_SQL.format(after=""),
+                           (*self.lease.params(), -1 if limit is None else limit))
             
             profiles = [dict(row) for row in cursor.fetchall()]
-            conn.close()
             
             logger.info(f"Found {len(profiles)} profiles ready for scraping")
             return profiles
@@ -209,237 +188,180 @@ class PostScraper:
             logger.error(f"Error getting profiles for scraping: {e}")
             return []
 
-    def fetch_linkedin_posts(self, profile_url: str) -> List[Dict]:
-        """Fetch LinkedIn posts for a given profile URL using RapidAPI."""
+    def iter_profiles_for_scraping(self, page_size: int = PROFILE_PAGE_SIZE) -> Iterator[Dict]:
+        """
+        Yield profiles that need scraping, one keyset page at a time.
+
+        Each page is read completely before its profiles are yielded, so no
+        statement stays open while the caller scrapes and writes. Profiles
+        updated while iterating (their last_action_date moves to today) do
+        not shift later pages the way an OFFSET would. Each page is leased to
+        this worker before it is yielded; profiles another worker claimed in
+        the meantime are left out.
+        """
+        conn = self.get_db_connection()
+        page = conn.execute(self.PROFILES_FOR_SCRAPING_SQL.format(after=""),
+                            (*self.lease.params(), page_size)).fetchall()
+        while page:
+            claimed = self.lease.claim(row['profile_id'] for row in page)
+            for row in page:
+                if row['profile_id'] in claimed:
+                    yield dict(row)
+            if len(page) < page_size:
+                return
+            last = page[-1]
+            page = conn.execute(
+                self.PROFILES_FOR_SCRAPING_SQL.format(after=self.KEYSET_AFTER),
+                (*self.lease.params(), last['job_title_score'], last['job_title_score'], last['profile_id'],
+                 page_size),
+            ).fetchall()
+
+    def posts_request(self, profile_url: str, start: int = 0) -> Optional[Tuple[str, Dict]]:
+        """Return the ``(url, params)`` of the posts API call, or None without a username."""
         username = self.extract_username_from_url(profile_url)
         if not username:
             logger.error(f"Could not extract username from URL: {profile_url}")
+            return None
+        return self.api_url, {"username": username, "start": str(start)}
+
+    def parse_posts_response(self, response, profile_url: str) -> List[Dict]:
+        """Extract the posts from an httpx response ([] on any failure)."""
+        if response.status_code == 200:
+            data = response.json()
+            logger.debug(f"API response data: {data}")
+            
+            if data.get("success"):
+                posts = data.get("data", [])
+                logger.info(f"Successfully fetched {len(posts)} posts for {profile_url}")
+                return posts
+            else:
+                logger.warning(f"API response indicates failure: {data.get('message')}")
+                return []
+        else:
+            logger.error(
+                f"Error fetching posts for '{profile_url}': "
+                f"{response.status_code} - {response.text}"
+            )
             return []
 
-        url = "https://real-time-data-enrichment.p.rapidapi.com/get-profile-posts"
-        
-        query_params = {
-            "username": username,
-            "start": "0"
-        }
+    def cached_posts_response(self, query_params: Dict):
+        """Return the cached posts response for these query params as an httpx response, or None."""
+        cached = self.cache.get(POSTS_CACHE_ENDPOINT, query_params['username'], query_params['start'])
+        if cached is None:
+            return None
+        logger.info(f"Using cached posts for username: {query_params['username']} "
+                    f"(start={query_params['start']})")
+        import httpx
+        return httpx.Response(200, content=cached)
+
+    def cache_posts_response(self, query_params: Dict, response) -> None:
+        """Store a posts response in the cache if it succeeded."""
+        # Only successful responses are cached; failures are retried next run
+        if response.status_code == 200 and response.json().get("success"):
+            self.cache.put(POSTS_CACHE_ENDPOINT, response.content, query_params['username'], query_params['start'])
+
+    def fetch_posts_page(self, profile_url: str, start: int = 0) -> List[Dict]:
+        """Fetch one page of posts, from the response cache or RapidAPI ([] on any failure)."""
+        request = self.posts_request(profile_url, start)
+        if request is None:
+            return []
+        url, query_params = request
+
+        cached = self.cached_posts_response(query_params)
+        if cached is not None:
+            return self.parse_posts_response(cached, profile_url)
 
-        logger.info(f"Fetching posts for username: {username}")
+        logger.info(f"Fetching posts for username: {query_params['username']} (start={start})")
         
         try:
-            response = requests.get(url, headers=self.headers, params=query_params, timeout=30)
-            if response.status_code == 200:
-                data = response.json()
-                logger.debug(f"API response data: {data}")
-                
-                if data.get("success"):
-                    posts = data.get("data", [])
-                    logger.info(f"Successfully fetched {len(posts)} posts for {username}")
-                    return posts
-                else:
-                    logger.warning(f"API response indicates failure: {data.get('message')}")
-                    return []
-            else:
-                logger.error(
-                    f"Error fetching posts for '{profile_url}': "
-                    f"{response.status_code} - {response.text}"
-                )
-                return []
+            response = self.http.get(url, params=query_params, endpoint="rapidapi get-profile-posts")
+            posts = self.parse_posts_response(response, profile_url)
+            self.cache_posts_response(query_params, response)
+            return posts
         except Exception as e:
             logger.error(f"Exception while fetching posts for {profile_url}: {str(e)}")
             return []
 
-    def extract_media(self, post: Dict, post_id: int) -> List[Dict]:
-        """Extract media from post for storage in media table."""
-        media_items = []
-        
-        try:
-            # Handle images (nested arrays)
-            if post.get('images'):
-                for image_group in post['images']:
-                    if isinstance(image_group, list):
-                        for image in image_group:
-                            media_items.append({
-                                'post_id': post_id,
-                                'media_url': image.get('url'),
-                                'media_type': 'image'
-                            })
-            
-            # Handle single image array
-            if post.get('image'):
-                for image in post['image']:
-                    media_items.append({
-                        'post_id': post_id,
-                        'media_url': image.get('url'),
-                        'media_type': 'image'
-                    })
-            
-            # Handle video (array)
-            if post.get('video'):
-                for video in post['video']:
-                    media_items.append({
-                        'post_id': post_id,
-                        'media_url': video.get('url'),
-                        'media_type': 'video'
-                    })
-            
-            # Handle document
-            if post.get('document') and post['document'].get('TranscribedDocumentUrl'):
-                media_items.append({
-                    'post_id': post_id,
-                    'media_url': post['document'].get('TranscribedDocumentUrl'),
-                    'media_type': 'document'
-                })
-                
-        except Exception as e:
-            logger.error(f"Error extracting media: {str(e)}")
-        
-        return media_items
+    def iter_linkedin_posts(self, profile_url: str, horizon_days: Optional[int] = None,
+                            max_pages: Optional[int] = None,
+                            watermark_ts: Optional[int] = None) -> Iterator[List[Dict]]:
+        """
+        Yield pages of posts for a profile, following ``start`` pagination.
 
-    def save_media(self, media_items: List[Dict], cursor) -> None:
-        """Save media items to the media table."""
-        if not media_items:
-            return
+        Stops after a short (last) page, a page whose oldest post is older
+        than ``horizon_days``, a page that reaches content already stored
+        (its last post is in ``known_urns`` or not newer than the profile's
+        ``watermark_ts``), or ``max_pages`` pages. Pages are yielded whole,
+        including any posts past the stopping point on the final one.
+        """
+        max_pages = self.max_pages if max_pages is None else max_pages
 
-        insert_sql = """INSERT OR IGNORE INTO media (
-            post_id, media_url, media_type
-        ) VALUES (?, ?, ?)"""
+        start = 0
+        for page_number in range(1, max_pages + 1):
+            posts = self.fetch_posts_page(profile_url, start)
+            if not posts:
+                return
+            yield posts
+            start = self.next_page_start(profile_url, posts, start, page_number, horizon_days=horizon_days,
+                                         max_pages=max_pages, watermark_ts=watermark_ts)
+            if start is None:
+                return
 
-        try:
-            for media in media_items:
-                cursor.execute(insert_sql, (
-                    media['post_id'],
-                    media['media_url'],
-                    media['media_type']
-                ))
-            
-            logger.debug(f"Saved {len(media_items)} media items")
-        except Exception as e:
-            logger.error(f"Error saving media: {str(e)}")
-            raise
+    def next_page_start(self, profile_url: str, posts: List[Dict], start: int, page_number: int,
+                        horizon_days: Optional[int] = None, max_pages: Optional[int] = None,
+                        watermark_ts: Optional[int] = None) -> Optional[int]:
+        """
+        Return the ``start`` of the page after ``posts`` (page ``page_number``,
+        fetched at ``start``), or None when iter_linkedin_posts should stop.
+        """
+        horizon_days = self.horizon_days if horizon_days is None else horizon_days
+        max_pages = self.max_pages if max_pages is None else max_pages
+        if len(posts) < POSTS_PAGE_SIZE:
+            return None
+        # A pinned post can sit first, so judge the page by its last post
+        oldest_ms = posted_timestamp_ms(posts[-1])
+        if oldest_ms is not None and oldest_ms < recency_cutoff_ms(horizon_days):
+            logger.debug(f"Page {page_number} reaches past the {horizon_days}-day horizon, stopping")
+            return None
+        if posts[-1].get('urn') in (self.known_urns or ()) or (
+            watermark_ts is not None and oldest_ms is not None and oldest_ms <= watermark_ts
+        ):
+            logger.debug(f"Page {page_number} reaches posts already stored, stopping")
+            return None
+        if page_number >= max_pages:
+            logger.info(f"Stopped at the {max_pages}-page cap for {profile_url}")
+            return None
+        return start + len(posts)
+
+    def fetch_linkedin_posts(self, profile_url: str, watermark_ts: Optional[int] = None) -> List[Dict]:
+        """Fetch every page of LinkedIn posts within the horizon and newer than the watermark."""
+        return [post for page in self.iter_linkedin_posts(profile_url, watermark_ts=watermark_ts) for post in page]
 
     def save_posts(self, posts: List[Dict], profile_id: int) -> int:
-        """Save posts to the database and return number of posts saved."""
+        """
+        Upsert posts by URN and return the number of new posts saved.
+
+        Posts already stored only have their reaction and comment counters
+        refreshed; everything else, including like state, is left untouched.
+        The profile's watermark moves to the newest post saved, and thread
+        URNs visible in the payload pre-fill urn_resolutions for the liker
+        and comment poster.
+        """
         if not posts:
             logger.info("No posts to save")
             return 0
 
-        insert_sql = """INSERT OR IGNORE INTO posts (
-            urn, profile_id, text, cleaned_text, category, media_type, 
-            media_url, post_url, processed_post_text, total_reaction_count,
-            like_count, appreciation_count, empathy_count, interest_count,
-            praise_count, comments_count, reposts_count, entertainments_count,
-            posted_at, posted_date, scraped_date, ocr_text,
-            poster_first_name, poster_last_name, poster_headline, poster_image_url,
-            poster_linkedin_url, poster_public_id, article_title, article_subtitle,
-            article_target_url, article_description, reshared, resharer_comment,
-            share_url, content_type, posted_date_timestamp, reposted
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"""
-
-        conn = None
-        posts_saved = 0
-        
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
-            
-            for post in posts:
-                # Extract author information
-                author = post.get('author', {})
-                
-                # Get profile picture URL
-                profile_pictures = author.get('profilePictures', [])
-                profile_pic_url = profile_pictures[0].get('url') if profile_pictures else ''
-                
-                # Determine primary media for backward compatibility
-                primary_media_type = None
-                primary_media_url = None
-                
-                if post.get('images'):
-                    primary_media_type = 'image'
-                    if post['images'] and isinstance(post['images'][0], list):
-                        primary_media_url = post['images'][0][0].get('url') if post['images'][0] else None
-                    elif post['images']:
-                        primary_media_url = post['images'][0].get('url')
-                elif post.get('image'):
-                    primary_media_type = 'image'
-                    primary_media_url = post['image'][0].get('url') if post['image'] else None
-                elif post.get('video'):
-                    primary_media_type = 'video'
-                    primary_media_url = post['video'][0].get('url') if post['video'] else None
-                elif post.get('document'):
-                    primary_media_type = 'document'
-                    primary_media_url = post['document'].get('TranscribedDocumentUrl')
-
-                # Handle article information
-                article = post.get('article', {})
-                
-                # Map API fields to database fields
-                post_data = (
-                    post.get('urn', ''),                                    # urn
-                    profile_id,                                             # profile_id
-                    post.get('text', ''),                                   # text
-                    None,                                                   # cleaned_text
-                    None,                                                   # category
-                    primary_media_type,                                     # media_type
-                    primary_media_url,                                      # media_url
-                    post.get('postUrl', ''),                                # post_url
-                    None,                                                   # processed_post_text
-                    post.get('totalReactionCount', 0),                      # total_reaction_count
-                    post.get('likeCount', 0),                               # like_count
-                    post.get('appreciationCount', 0),                       # appreciation_count
-                    post.get('empathyCount', 0),                            # empathy_count
-                    post.get('InterestCount', 0),                           # interest_count
-                    post.get('praiseCount', 0),                             # praise_count
-                    post.get('commentsCount', 0),                           # comments_count
-                    post.get('repostsCount', 0),                            # reposts_count
-                    post.get('funnyCount', 0),                              # entertainments_count
-                    post.get('postedAt', ''),                               # posted_at
-                    post.get('postedDate', ''),                             # posted_date
-                    datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),  # scraped_date
-                    None,                                                   # ocr_text
-                    author.get('firstName', ''),                            # poster_first_name
-                    author.get('lastName', ''),                             # poster_last_name
-                    author.get('headline', ''),                             # poster_headline
-                    profile_pic_url,                                        # poster_image_url
-                    author.get('url', ''),                                  # poster_linkedin_url
-                    author.get('username', ''),                             # poster_public_id
-                    article.get('title', ''),                               # article_title
-                    article.get('subtitle', ''),                            # article_subtitle
-                    article.get('link', ''),                                # article_target_url
-                    '',                                                     # article_description
-                    bool(post.get('resharedPost')),                         # reshared
-                    post.get('text', '') if post.get('resharedPost') else '',  # resharer_comment
-                    post.get('shareUrl', ''),                               # share_url
-                    post.get('contentType', ''),                            # content_type
-                    post.get('postedDateTimestamp', 0),                     # posted_date_timestamp
-                    post.get('reposted', False)                             # reposted
-                )
-
-                cursor.execute(insert_sql, post_data)
-                
-                # Check if the post was actually inserted (not a duplicate)
-                if cursor.rowcount > 0:
-                    posts_saved += 1
-                    post_id = cursor.lastrowid
-                    
-                    # Extract and save media if post was inserted
-                    if post_id:
-                        media_items = self.extract_media(post, post_id)
-                        if media_items:
-                            self.save_media(media_items, cursor)
-
-            conn.commit()
+            posts_saved = save_post_page(conn, posts, profile_id, known_urns=self.known_urns)
+            advance_post_watermark(conn, profile_id, posts)
+            record_payload_thread_urns(conn, posts)
             logger.info(f"Saved {posts_saved} new posts for profile_id={profile_id}")
             return posts_saved
-            
+
         except Exception as e:
             logger.error(f"Database error while saving posts: {str(e)}")
-            if conn:
-                conn.rollback()
             raise
-        finally:
-            if conn:
-                conn.close()
 
     def check_recent_posts(self, profile_id: int, days_threshold: int = 21) -> bool:
         """Check if profile has posts newer than the threshold."""
@@ -451,11 +373,10 @@ class PostScraper:
                 SELECT COUNT(*) as count
                 FROM posts 
                 WHERE profile_id = ?
-                AND posted_date > datetime('now', '-{} days')
-            """.format(days_threshold), (profile_id,))
+                AND posted_date_timestamp > ?
+            """, (profile_id, recency_cutoff_ms(days_threshold)))
             
             result = cursor.fetchone()
-            conn.close()
             
             has_recent = result['count'] > 0
             logger.debug(f"Profile {profile_id} has recent posts (<{days_threshold} days): {has_recent}")
@@ -468,18 +389,14 @@ class PostScraper:
     def update_profile_status(self, profile_id: int, new_status: str, reason: str = "") -> bool:
         """Update profile status after scraping."""
         try:
-            conn = self.get_db_connection()
-            cursor = conn.cursor()
+            with self.get_db_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE profiles 
+                    SET status = ?, last_action_date = date('now')
+                    WHERE profile_id = ?
+                """, (new_status, profile_id))
             
-            cursor.execute("""
-                UPDATE profiles 
-                SET status = ?, last_action_date = date('now')
-                WHERE profile_id = ?
-            """, (new_status, profile_id))
-            
-            updated = cursor.rowcount > 0
-            conn.commit()
-            conn.close()
+                updated = cursor.rowcount > 0
             
             if updated:
                 logger.info(f"Updated profile {profile_id} to status '{new_status}'. {reason}")
@@ -494,12 +411,22 @@ class PostScraper:
 
     def scrape_profile(self, profile: Dict) -> Dict:
         """Scrape posts for a single profile and return results."""
+        logger.info(f"Scraping profile: {profile['first_name']} {profile['last_name']} (ID: {profile['profile_id']})")
+        posts = self.fetch_linkedin_posts(profile['profile_url'], watermark_ts=profile.get('posts_watermark_ts'))
+        return self.record_scraped_posts(profile, posts)
+
+    def _with_known_urns(self, profiles: Iterable[Dict], chunk_size: int) -> Iterator[Dict]:
+        """Yield ``profiles``, first loading the stored URNs of each chunk into ``known_urns``."""
+        profiles = iter(profiles)
+        while chunk := list(islice(profiles, chunk_size)):
+            self.known_urns |= load_known_urns(self.get_db_connection(), [p['profile_id'] for p in chunk])
+            yield from chunk
+
+    def record_scraped_posts(self, profile: Dict, posts: List[Dict]) -> Dict:
+        """Save fetched posts, advance the profile's status and return the per-profile result."""
         profile_id = profile['profile_id']
-        profile_url = profile['profile_url']
         name = f"{profile['first_name']} {profile['last_name']}"
         
-        logger.info(f"Scraping profile: {name} (ID: {profile_id})")
-        
         result = {
             'profile_id': profile_id,
             'name': name,
@@ -511,8 +438,8 @@ class PostScraper:
         }
         
         try:
-            # Fetch posts from LinkedIn API
-            posts = self.fetch_linkedin_posts(profile_url)
+            # Keep the batch's leases alive while it runs (throttled)
+            self.lease.heartbeat()
             result['posts_fetched'] = len(posts)
             
             if posts:
@@ -546,111 +473,150 @@ class PostScraper:
         
         return result
 
-    def scrape_batch(self, max_profiles: int = 15, delay_seconds: int = 2) -> Dict:
-        """Scrape posts for a batch of profiles."""
+    def scrape_batch(self, max_profiles: int = 15, delay_seconds: int = 2,
+                     sink: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Scrape posts for a batch of profiles.
+
+        Profiles are streamed from iter_profiles_for_scraping, and each
+        per-profile result is handed to ``sink`` as soon as it is ready
+        instead of being kept in the returned totals. The stored post URNs
+        of each page of profiles are loaded into ``known_urns`` up front, so
+        paging and new-post counts do not query posts URN by URN. The
+        batch's profile leases are released when it ends, however it ends.
+        """
         logger.info(f"Starting batch scraping (max {max_profiles} profiles, {delay_seconds}s delay)")
-        
-        # Get profiles to scrape
-        profiles = self.get_profiles_for_scraping()
-        
-        if not profiles:
-            logger.info("No profiles found that need scraping")
-            return {
-                'profiles_processed': 0,
-                'profiles_scraped': 0,
-                'total_posts_saved': 0,
-                'profiles_to_week1': 0,
-                'profiles_to_week3': 0,
-                'results': []
-            }
-        
-        # Limit to max_profiles
-        profiles_to_process = profiles[:max_profiles]
-        logger.info(f"Processing {len(profiles_to_process)} profiles")
+        if not self.api_key:
+            raise ValueError("RAPIDAPI_KEY environment variable is required")
         
         batch_results = {
-            'profiles_processed': len(profiles_to_process),
+            'profiles_processed': 0,
             'profiles_scraped': 0,
             'total_posts_saved': 0,
             'profiles_to_week1': 0,
             'profiles_to_week3': 0,
-            'results': []
         }
         
-        for i, profile in enumerate(profiles_to_process):
-            logger.info(f"Processing profile {i+1}/{len(profiles_to_process)}")
-            
-            # Scrape the profile
-            result = self.scrape_profile(profile)
-            batch_results['results'].append(result)
-            
-            if result['success']:
-                batch_results['profiles_scraped'] += 1
-                batch_results['total_posts_saved'] += result['posts_saved']
+        page_size = min(max_profiles, PROFILE_PAGE_SIZE)
+        self.known_urns = set()
+        profiles = self._with_known_urns(islice(self.iter_profiles_for_scraping(page_size=page_size), max_profiles),
+                                         page_size)
+        try:
+            for profile in profiles:
+                # Apply delay between requests (not before the first one)
+                if batch_results['profiles_processed']:
+                    logger.info(f"Applying {delay_seconds}s delay...")
+                    time.sleep(delay_seconds)
                 
-                if result['new_status'] == 'week1_liking':
-                    batch_results['profiles_to_week1'] += 1
-                elif result['new_status'] == 'week3_invitation':
-                    batch_results['profiles_to_week3'] += 1
-            
-            # Apply delay between requests (except after the last one)
-            if i < len(profiles_to_process) - 1:
-                logger.info(f"Applying {delay_seconds}s delay...")
-                time.sleep(delay_seconds)
+                batch_results['profiles_processed'] += 1
+                logger.info(f"Processing profile {batch_results['profiles_processed']}/{max_profiles}")
+                
+                # Scrape the profile
+                result = self.scrape_profile(profile)
+                if sink is not None:
+                    sink(result)
+                
+                if result['success']:
+                    batch_results['profiles_scraped'] += 1
+                    batch_results['total_posts_saved'] += result['posts_saved']
+                    
+                    if result['new_status'] == 'week1_liking':
+                        batch_results['profiles_to_week1'] += 1
+                    elif result['new_status'] == 'week3_invitation':
+                        batch_results['profiles_to_week3'] += 1
+        finally:
+            self.lease.release()
+        
+        if not batch_results['profiles_processed']:
+            logger.info("No profiles found that need scraping")
         
         logger.info(f"Batch scraping completed: {batch_results}")
         return batch_results
 
+    def scrape_batch_async(self, max_profiles: int = 15,
+                           requests_per_second: float = DEFAULT_REQUESTS_PER_SECOND,
+                           concurrency: int = DEFAULT_CONCURRENCY,
+                           sink: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """
+        Scrape a batch with concurrent API calls paced by a token bucket.
+
+        Same profiles, results and totals as scrape_batch, but up to
+        ``concurrency`` fetches run at once at ``requests_per_second``
+        instead of one request followed by a fixed delay. Posts are saved
+        by a single writer task (backend.async_scrape). Pages are followed
+        and cached as in scrape_batch: the same horizon, page cap, watermark
+        and ``known_urns`` stops apply, and cached responses are used and
+        fresh ones stored.
+        """
+        logger.info(f"Starting async batch scraping (max {max_profiles} profiles, "
+                    f"{requests_per_second} req/s, {concurrency} concurrent)")
+        if not self.api_key:
+            raise ValueError("RAPIDAPI_KEY environment variable is required")
+        
+        page_size = min(max_profiles, PROFILE_PAGE_SIZE)
+        self.known_urns = set()
+        profiles = self._with_known_urns(islice(self.iter_profiles_for_scraping(page_size=page_size), max_profiles),
+                                         page_size)
+        from backend.http_client import EndpointStats
+
+        self.async_stats = self.async_stats or EndpointStats()
+        try:
+            batch_results = scrape_concurrently(
+                profiles,
+                build_request=lambda profile, start: self.posts_request(profile['profile_url'], start),
+                next_start=lambda profile, page, start, page_number: self.next_page_start(
+                    profile['profile_url'], page, start, page_number,
+                    watermark_ts=profile.get('posts_watermark_ts')),
+                parse_response=lambda response, profile: self.parse_posts_response(response, profile['profile_url']),
+                persist=self.record_scraped_posts,
+                headers=self.headers,
+                requests_per_second=requests_per_second,
+                concurrency=concurrency,
+                sink=sink,
+                stats=self.async_stats,
+                read_cache=self.cached_posts_response,
+                write_cache=self.cache_posts_response,
+            )
+        finally:
+            self.lease.release()
+        
+        logger.info(f"Async batch scraping completed: {batch_results}")
+        return batch_results
+
     def get_scraping_stats(self) -> Dict:
-        """Get current scraping statistics."""
+        """Get current scraping statistics from the pipeline counters."""
         try:
             conn = self.get_db_connection()
-            cursor = conn.cursor()
             
             stats = {}
             
             # Profiles by status
-            cursor.execute("""
-                SELECT status, COUNT(*) as count 
-                FROM profiles 
-                GROUP BY status
-            """)
-            status_counts = {}
-            for row in cursor.fetchall():
-                status_counts[row['status']] = row['count']
-            stats['status_breakdown'] = status_counts
+            stats['status_breakdown'] = read_counters(conn, 'profile_status')
             
             # Total posts
-            cursor.execute("SELECT COUNT(*) as count FROM posts")
-            stats['total_posts'] = cursor.fetchone()['count']
+            stats['total_posts'] = read_counter(conn, 'posts', 'total')[0]
             
             # Posts by profile status
-            cursor.execute("""
-                SELECT p.status, COUNT(po.post_id) as post_count
-                FROM profiles p
-                LEFT JOIN posts po ON p.profile_id = po.profile_id
-                GROUP BY p.status
-            """)
-            posts_by_status = {}
-            for row in cursor.fetchall():
-                posts_by_status[row['status']] = row['post_count']
-            stats['posts_by_status'] = posts_by_status
+            posts_by_status = read_counters(conn, 'posts_by_profile_status')
+            stats['posts_by_status'] = {
+                status: posts_by_status.get(status, 0) for status in stats['status_breakdown']
+            }
             
-            # Recent scraping activity
-            cursor.execute("""
-                SELECT COUNT(*) as count
-                FROM profiles 
-                WHERE last_action_date = date('now')
-            """)
-            stats['scraped_today'] = cursor.fetchone()['count']
+            # Recent scraping activity (last_action_date is written as SQLite's UTC date('now'))
+            today = datetime.now(timezone.utc).date().isoformat()
+            stats['scraped_today'] = read_counter(conn, 'profile_last_action_date', today)[0]
             
-            conn.close()
             return stats
             
         except Exception as e:
             logger.error(f"Error getting scraping stats: {e}")
             return {}
 
+def print_profile_result(result: Dict) -> None:
+    """scrape_batch sink that prints one line per scraped profile."""
+    status = "✅" if result['success'] else "❌"
+    print(f"{status} {result['name']}: {result['posts_saved']} posts → {result['new_status']}")
+
 def main():
     """Main function."""
     parser = argparse.ArgumentParser(description="LinkedIn Post Scraper")
@@ -660,12 +626,33 @@ def main():
                        help='Delay in seconds between API calls (default: 2)')
     parser.add_argument('--stats-only', action='store_true',
                        help='Show statistics only, do not scrape')
+    parser.add_argument('--async', dest='async_mode', action='store_true',
+                       help='Fetch profiles concurrently, paced by --rps instead of --delay')
+    parser.add_argument('--rps', type=float, default=DEFAULT_REQUESTS_PER_SECOND,
+                       help=f'API requests per second in --async mode (default: {DEFAULT_REQUESTS_PER_SECOND})')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                       help=f'Requests in flight in --async mode (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--verify-counters', action='store_true',
+                       help='Recount the pipeline counters with full scans, repair any drift and exit')
+    parser.add_argument('--horizon-days', type=int, default=POST_HORIZON_DAYS,
+                       help=f'Stop paging once posts are older than this (default: {POST_HORIZON_DAYS})')
+    parser.add_argument('--max-pages', type=int, default=MAX_POST_PAGES,
+                       help=f'Maximum pages of posts fetched per profile (default: {MAX_POST_PAGES})')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Neither read nor store cached API responses')
+    parser.add_argument('--refresh', action='store_true',
+                       help='Ignore cached API responses but store the fresh ones')
     
     args = parser.parse_args()
+    configure_logging('post_scraper.log')
     
     try:
         # Initialize scraper
-        scraper = PostScraper()
+        scraper = PostScraper(use_cache=not args.no_cache, refresh_cache=args.refresh,
+                              horizon_days=args.horizon_days, max_pages=args.max_pages)
+        
+        if args.verify_counters:
+            sys.exit(0 if report_counter_drift(scraper.get_db_connection()) else 1)
         
         # Show current stats
         logger.info("Current scraping statistics:")
@@ -682,11 +669,21 @@ def main():
         if args.stats_only:
             return
         
-        # Run batch scraping
-        results = scraper.scrape_batch(
-            max_profiles=args.max_profiles,
-            delay_seconds=args.delay
-        )
+        # Run batch scraping; small batches print each profile as it finishes
+        sink = print_profile_result if args.max_profiles <= 5 else None
+        if args.async_mode:
+            results = scraper.scrape_batch_async(
+                max_profiles=args.max_profiles,
+                requests_per_second=args.rps,
+                concurrency=args.concurrency,
+                sink=sink
+            )
+        else:
+            results = scraper.scrape_batch(
+                max_profiles=args.max_profiles,
+                delay_seconds=args.delay,
+                sink=sink
+            )
         
         # Display results
         print(f"\n{'='*60}")
@@ -697,19 +694,18 @@ def main():
         print(f"Total posts saved: {results['total_posts_saved']}")
         print(f"Profiles moved to week1_liking: {results['profiles_to_week1']}")
         print(f"Profiles moved to week3_invitation: {results['profiles_to_week3']}")
+        if results.get('requests_failed'):
+            print(f"Requests failed (left for the next run): {results['requests_failed']}")
+        print(scraper.cache.summary())
+        from backend.http_client import format_metrics
+        for line in format_metrics(scraper.http_metrics()):
+            print(f"HTTP {line}")
         
         if results['profiles_scraped'] > 0:
             print("✅ Scraping completed successfully!")
         else:
             print("⚠️ No profiles were successfully scraped")
         
-        # Show individual results if requested
-        if len(results['results']) <= 5:  # Only show details for small batches
-            print(f"\nIndividual Results:")
-            for result in results['results']:
-                status = "✅" if result['success'] else "❌"
-                print(f"{status} {result['name']}: {result['posts_saved']} posts → {result['new_status']}")
-        
     except Exception as e:
         logger.error(f"Post scraper failed: {e}")
         sys.exit(1)
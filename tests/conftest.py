@@ -0,0 +1,42 @@
+"""Shared fixtures for the LinkedIn Engagement test suite."""
+
+import importlib
+import os
+
+import pytest
+
+from backend.database import close_all_connections
+
+# Dummy credentials so the standalone scripts can be imported under test
+TEST_ENV = {
+    "RAPIDAPI_KEY": "test-key",
+    "LINKEDIN_CLIENT_ID": "test-client-id",
+    "LINKEDIN_CLIENT_SECRET": "test-client-secret",
+    "LINKEDIN_ACCESS_TOKEN": "test-access-token",
+    "LINKEDIN_PROFILE_ID": "test-profile-id",
+}
+
+
+@pytest.fixture(scope="session")
+def load_script(tmp_path_factory):
+    """Import a top-level pipeline script with test credentials, keeping its log file out of the repo."""
+    log_dir = tmp_path_factory.mktemp("logs")
+
+    def _load(module_name):
+        for key, value in TEST_ENV.items():
+            os.environ.setdefault(key, value)
+        cwd = os.getcwd()
+        os.chdir(log_dir)
+        try:
+            return importlib.import_module(module_name)
+        finally:
+            os.chdir(cwd)
+
+    return _load
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path to a fresh database file; shared connections are closed afterwards."""
+    yield str(tmp_path / "linkedin_test.sqlite3")
+    close_all_connections()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Tests for the concurrent scrape mode against a local mock of the posts API
+
+The mock server adds latency to every request and answers the first request
+for every third username with a 429, so the tests exercise pacing, bounded
+concurrency and Retry-After handling without touching RapidAPI.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from backend.async_scrape import TokenBucket
+
+LATENCY_SECONDS = 0.2
+PROFILE_COUNT = 12
+PAGE_SIZE = 50
+
+
+class MockPostsAPI:
+    """Shared state of the mock server: request log and in-flight high-water mark."""
+
+    def __init__(self, always_limited=(), malformed=None, full_pages=0):
+        self.lock = threading.Lock()
+        self.requests = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.limited = set()
+        self.always_limited = set(always_limited)
+        # username -> body of a 200 that is not the expected JSON object
+        self.malformed = dict(malformed or {})
+        # Pages of PAGE_SIZE posts per username before the last, one-post page
+        self.full_pages = full_pages
+
+    def handler(self):
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                username, start = query["username"][0], int(query["start"][0])
+                with api.lock:
+                    api.requests.append(username)
+                    api.in_flight += 1
+                    api.max_in_flight = max(api.max_in_flight, api.in_flight)
+                    number = int(username[1:])
+                    rate_limited = username in api.always_limited or (
+                        number % 3 == 0 and username not in api.limited
+                    )
+                    api.limited.add(username)
+                try:
+                    time.sleep(LATENCY_SECONDS)
+                    if rate_limited:
+                        body, status = b'{"message": "Too many requests"}', 429
+                    elif username in api.malformed:
+                        body, status = api.malformed[username], 200
+                    else:
+                        # Newest first, one minute apart
+                        count = PAGE_SIZE if start < api.full_pages * PAGE_SIZE else 1
+                        now_ms = int(time.time() * 1000)
+                        posts = [{'urn': f"urn:{username}:{n}", 'text': 'hello',
+                                  'postedDateTimestamp': now_ms - n * 60_000}
+                                 for n in range(start, start + count)]
+                        body, status = json.dumps({'success': True, 'data': posts}).encode(), 200
+                    self.send_response(status)
+                    if rate_limited:
+                        self.send_header("Retry-After", "0.1")
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                finally:
+                    with api.lock:
+                        api.in_flight -= 1
+
+        return Handler
+
+
+@pytest.fixture
+def mock_api():
+    servers = []
+
+    def start(**kwargs):
+        api = MockPostsAPI(**kwargs)
+        server = ThreadingHTTPServer(("127.0.0.1", 0), api.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        api.url = f"http://127.0.0.1:{server.server_address[1]}/get-profile-posts"
+        return api
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def scraper(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    with scraper.get_db_connection() as conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, job_title_score) "
+            "VALUES (?, 'First', 'Last', ?, 5)",
+            [(n, f"https://www.linkedin.com/in/u{n}") for n in range(1, PROFILE_COUNT + 1)],
+        )
+    return scraper
+
+
+def test_concurrent_scrape_retries_429s_and_overlaps_requests(scraper, mock_api):
+    api = mock_api()
+    scraper.api_url = api.url
+    seen = []
+
+    start = time.monotonic()
+    results = scraper.scrape_batch_async(max_profiles=PROFILE_COUNT, requests_per_second=50,
+                                         concurrency=4, sink=seen.append)
+    elapsed = time.monotonic() - start
+
+    assert results['profiles_processed'] == results['profiles_scraped'] == PROFILE_COUNT
+    assert results['profiles_to_week1'] == PROFILE_COUNT
+    assert results['requests_failed'] == 0
+    assert sorted(r['profile_id'] for r in seen) == list(range(1, PROFILE_COUNT + 1))
+
+    # Every third username was rate limited once and retried
+    assert len(api.requests) == PROFILE_COUNT + PROFILE_COUNT // 3
+    assert 2 <= api.max_in_flight <= 4
+    # One request at a time would take (12 + 4) x 200ms
+    assert elapsed < len(api.requests) * LATENCY_SECONDS / 2
+
+    conn = scraper.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == PROFILE_COUNT
+    assert conn.execute("SELECT COUNT(*) FROM profiles WHERE status = 'not_started'").fetchone()[0] == 0
+
+
+def test_persistent_429_leaves_profile_queued(scraper, mock_api):
+    api = mock_api(always_limited={"u1"})
+    scraper.api_url = api.url
+
+    results = scraper.scrape_batch_async(max_profiles=2, requests_per_second=50, concurrency=2)
+
+    assert (results['profiles_processed'], results['profiles_scraped'], results['requests_failed']) == (2, 1, 1)
+    assert api.requests.count("u1") == 4  # first attempt plus three retries
+    status = scraper.get_db_connection().execute("SELECT status FROM profiles WHERE profile_id = 1").fetchone()[0]
+    assert status == 'not_started'
+
+
+def test_async_requests_are_reported_in_http_metrics(scraper, mock_api):
+    api = mock_api()
+    scraper.api_url = api.url
+
+    scraper.scrape_batch_async(max_profiles=6, requests_per_second=50, concurrency=3)
+
+    metrics = scraper.http_metrics()
+    assert list(metrics) == ["rapidapi get-profile-posts (async)"]
+    assert metrics["rapidapi get-profile-posts (async)"]['requests'] == len(api.requests) == 8
+    assert metrics["rapidapi get-profile-posts (async)"]['retries'] == 2
+    assert metrics["rapidapi get-profile-posts (async)"]['statuses'] == {200: 6, 429: 2}
+    assert 'http' not in vars(scraper)  # the synchronous client was never built
+
+
+def test_async_scrape_uses_and_fills_the_response_cache(scraper, mock_api):
+    api = mock_api()
+    scraper.api_url = api.url
+    conn = scraper.get_db_connection()
+
+    def rescrape():
+        with conn:
+            conn.execute("UPDATE profiles SET status = 'not_started'")
+        return scraper.scrape_batch_async(max_profiles=2, requests_per_second=50, concurrency=2)
+
+    assert rescrape()['profiles_scraped'] == 2
+    assert (len(api.requests), scraper.cache.stores) == (2, 2)
+
+    assert rescrape()['profiles_to_week1'] == 2
+    assert (len(api.requests), scraper.cache.hits) == (2, 2)  # served from the cache
+
+    scraper.cache.refresh = True  # --refresh
+    assert rescrape()['profiles_scraped'] == 2
+    assert (len(api.requests), scraper.cache.hits, scraper.cache.stores) == (4, 2, 4)
+
+
+def test_async_scrape_follows_pages_up_to_the_cap_and_watermark(scraper, mock_api):
+    api = mock_api(full_pages=10)
+    scraper.api_url = api.url
+    with scraper.get_db_connection() as conn:
+        # Everything on u2's first page is already stored
+        conn.execute("UPDATE profiles SET posts_watermark_ts = ? WHERE profile_id = 2",
+                     (int(time.time() * 1000) + 60_000,))
+
+    results = scraper.scrape_batch_async(max_profiles=2, requests_per_second=50, concurrency=2)
+
+    assert api.requests.count("u1") == scraper.max_pages == 4
+    assert api.requests.count("u2") == 1
+    assert results['total_posts_saved'] == 5 * PAGE_SIZE
+
+
+def test_malformed_200_fails_only_its_profile(scraper, mock_api):
+    api = mock_api(malformed={"u1": b"<html>Service unavailable</html>", "u2": b"[1, 2, 3]"})
+    scraper.api_url = api.url
+
+    results = scraper.scrape_batch_async(max_profiles=4, requests_per_second=50, concurrency=2)
+
+    assert (results['profiles_processed'], results['profiles_scraped'], results['requests_failed']) == (4, 2, 2)
+    statuses = dict(scraper.get_db_connection().execute(
+        "SELECT profile_id, status FROM profiles WHERE profile_id <= 4"
+    ).fetchall())
+    assert statuses == {1: 'not_started', 2: 'not_started', 3: 'week1_liking', 4: 'week1_liking'}
+
+
+def test_token_bucket_paces_to_rate():
+    async def take(count):
+        bucket = TokenBucket(rate=20, capacity=1)
+        start = time.monotonic()
+        for _ in range(count):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    # The first token is saved up; the other ten arrive at 20/s
+    assert asyncio.run(take(11)) >= 10 / 20 * 0.9
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the trigger-maintained comment_queue table
+"""
+
+import sqlite3
+import time
+
+import pytest
+
+import backend.schema
+from backend.database import get_connection
+from backend.schema import ensure_comment_queue, migrate, rebuild_comment_queue
+
+MS_PER_DAY = 86_400_000
+
+
+@pytest.fixture
+def poster(load_script, db_path):
+    return load_script("linkedin_comment_poster").CommentPoster(db_path=db_path)
+
+
+def queued_ids(conn):
+    return sorted(row[0] for row in conn.execute("SELECT comment_id FROM comment_queue"))
+
+
+def seed(conn, now_ms):
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, connection_status, "
+            "job_title_score) VALUES (?, 'A', 'B', ?, ?, 'prospect', ?)",
+            [(1, 'u1', 'week2_commenting', 6), (2, 'u2', 'week2_commenting', 10), (3, 'u3', 'week1_liking', 10)],
+        )
+        conn.executemany(
+            "INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp) VALUES (?, ?, ?, ?)",
+            [(post_id, profile_id, f"urn:{post_id}", now_ms - days_ago * MS_PER_DAY)
+             for post_id, profile_id, days_ago in
+             [(11, 1, 1), (12, 1, 2), (13, 1, 3), (14, 1, 45), (21, 2, 5), (31, 3, 1)]],
+        )
+        conn.executemany(
+            "INSERT INTO comments (comment_id, post_id, generated_comment) VALUES (?, ?, ?)",
+            [(111, 11, 'Nice'), (112, 12, 'Great'), (113, 13, 'Agreed'), (114, 14, 'Old'),
+             (121, 21, 'Well said'), (131, 31, 'Not yet'), (115, 11, '')],
+        )
+
+
+def test_triggers_track_comment_and_profile_changes(poster):
+    conn = poster.get_db_connection()
+    seed(conn, int(time.time() * 1000))
+
+    # Expired posts stay queued (recency is applied at dequeue); empty and week1 comments do not
+    assert queued_ids(conn) == [111, 112, 113, 114, 121]
+
+    poster.mark_comment_as_posted(111, 'id', 'urn')
+    poster.mark_comment_as_failed(112, 'boom')
+    assert queued_ids(conn) == [113, 114, 121]
+
+    poster.update_profile_status(3, 'week2_commenting')
+    assert queued_ids(conn) == [113, 114, 121, 131]
+    poster.update_profile_status(1, 'week3_invitation')
+    assert queued_ids(conn) == [121, 131]
+
+    with conn:
+        conn.execute("UPDATE posts SET urn = NULL WHERE post_id = 21")
+        conn.execute("DELETE FROM posts WHERE post_id = 31")
+    assert queued_ids(conn) == []
+
+    # The triggers and a full rebuild agree
+    with conn:
+        conn.execute("UPDATE profiles SET status = 'week2_commenting'")
+        conn.execute("UPDATE posts SET urn = 'urn:21' WHERE post_id = 21")
+    incremental = queued_ids(conn)
+    rebuild_comment_queue(conn)
+    assert queued_ids(conn) == incremental == [113, 114, 121]
+
+
+def test_dequeue_caps_per_profile_and_orders_by_score(poster):
+    conn = poster.get_db_connection()
+    seed(conn, int(time.time() * 1000))
+
+    comments = poster.get_comments_to_post()
+    assert [c['comment_id'] for c in comments] == [121, 111, 112]
+    assert comments[0]['generated_comment'] == 'Well said'
+    assert [c['comment_id'] for c in poster.get_comments_to_post(max_comments=2)] == [121, 111]
+    assert [c['comment_id'] for c in poster.get_comments_to_post(per_profile=1)] == [121, 111]
+
+
+def test_queue_is_built_for_existing_comments(load_script, poster, db_path):
+    conn = poster.get_db_connection()
+    seed(conn, int(time.time() * 1000))
+    with conn:
+        conn.execute("DROP TABLE comment_queue")
+
+    load_script("linkedin_comment_poster").CommentPoster(db_path=db_path)
+    assert queued_ids(conn) == [111, 112, 113, 114, 121]
+
+
+def test_failed_initial_fill_rolls_back_the_queue(db_path, monkeypatch):
+    conn = get_connection(db_path)
+    migrate(conn)
+    seed(conn, int(time.time() * 1000))
+
+    def failing_fill(conn):
+        raise sqlite3.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(backend.schema, "_fill_comment_queue", failing_fill)
+    with pytest.raises(sqlite3.OperationalError):
+        ensure_comment_queue(conn)
+    assert conn.execute(
+        "SELECT name FROM sqlite_master WHERE name LIKE '%comment_queue%'"
+    ).fetchall() == []
+
+    # The next start creates and fills it
+    monkeypatch.undo()
+    assert ensure_comment_queue(conn)
+    assert queued_ids(conn) == [111, 112, 113, 114, 121]
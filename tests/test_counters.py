@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Tests for the trigger-maintained pipeline counters
+"""
+
+import pytest
+
+from backend.counters import read_counter, read_counters, verify_counters
+
+
+@pytest.fixture
+def workers(load_script, db_path):
+    # The poster creates comments, the liker the like-tracking columns
+    poster = load_script("linkedin_comment_poster").CommentPoster(db_path=db_path)
+    liker = load_script("linkedin_post_liker").PostLiker(db_path=db_path)
+    return poster, liker
+
+
+def seed(conn):
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, connection_status) "
+            "VALUES (?, 'A', 'B', ?, ?, ?)",
+            [(1, 'u1', 'week1_liking', 'prospect'), (2, 'u2', 'week2_commenting', 'prospect'),
+             (3, 'u3', 'maintenance', 'current_connection')],
+        )
+        conn.executemany(
+            "INSERT INTO posts (post_id, profile_id, urn) VALUES (?, ?, ?)",
+            [(11, 1, 'urn:11'), (12, 1, 'urn:12'), (21, 2, 'urn:21'), (22, 2, None)],
+        )
+        conn.executemany(
+            "INSERT INTO comments (comment_id, post_id, generated_comment) VALUES (?, ?, ?)",
+            [(211, 21, 'Nice'), (212, 21, 'Great'), (221, 22, 'Agreed')],
+        )
+
+
+def test_stats_follow_writes(workers):
+    poster, liker = workers
+    conn = poster.get_db_connection()
+    seed(conn)
+
+    liker.mark_post_as_liked(11, 'like-id', 'like-urn')
+    liker.mark_post_like_failed(12, 'boom')
+    poster.mark_comment_as_posted(211, 'comment-id', 'comment-urn')
+    poster.mark_comment_as_failed(212, 'boom')
+    poster.update_profile_status(1, 'week2_commenting')
+    with conn:
+        conn.execute("DELETE FROM posts WHERE post_id = 22")
+        conn.execute("UPDATE posts SET profile_id = 3 WHERE post_id = 21")
+
+    liking = liker.get_liking_stats()
+    assert liking['status_breakdown'] == {'maintenance': 1, 'week2_commenting': 2}
+    assert (liking['total_posts_with_urn'], liking['liked_posts'], liking['failed_likes']) == (3, 1, 1)
+    assert liking['last_liked'] is not None
+
+    # Posting sets is_comment_posted but leaves status = 'GENERATED'
+    commenting = poster.get_commenting_stats()
+    assert (commenting['total_generated_comments'], commenting['posted_comments'],
+            commenting['failed_comments']) == (2, 1, 1)
+    assert commenting['last_posted'] is not None
+
+    assert read_counters(conn, 'posts_by_profile_status') == {'maintenance': 1, 'week2_commenting': 2}
+    assert read_counter(conn, 'profile_last_action_date', conn.execute("SELECT date('now')").fetchone()[0])[0] == 1
+    assert verify_counters(conn) == []
+
+
+def test_verify_detects_and_repairs_drift(workers):
+    poster, _ = workers
+    conn = poster.get_db_connection()
+    seed(conn)
+
+    with conn:
+        conn.execute("UPDATE pipeline_counters SET value = value + 5 WHERE scope = 'posts' AND key = 'total'")
+        conn.execute("DELETE FROM pipeline_counters WHERE scope = 'comments'")
+
+    drift = verify_counters(conn)
+    assert {(item['scope'], item['key'], item['stored'], item['actual']) for item in drift} == {
+        ('posts', 'total', 9, 4), ('comments', 'generated', 0, 3),
+    }
+    assert verify_counters(conn) == []
+
+
+def test_counters_installed_on_existing_data(load_script, workers, db_path):
+    poster, _ = workers
+    conn = poster.get_db_connection()
+    seed(conn)
+    with conn:
+        conn.execute("DROP TABLE pipeline_counters")
+        for (name,) in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_counters_%'"
+        ).fetchall():
+            conn.execute(f"DROP TRIGGER {name}")
+
+    importer = load_script("csv_profile_importer").CSVProfileImporter(db_path=db_path)
+    assert importer.get_import_stats() == {
+        'total_profiles': 3,
+        'prospect_count': 2,
+        'current_connection_count': 1,
+        'status_breakdown': {'maintenance': 1, 'week1_liking': 1, 'week2_commenting': 1},
+    }
+    # The importer's setup sees every table, so all groups are back
+    assert read_counter(conn, 'comments', 'generated')[0] == 3
+    assert verify_counters(conn) == []
+
+
+def test_failed_rebuild_leaves_no_triggers_and_missing_columns_are_logged(db_path, monkeypatch, caplog):
+    import backend.counters as counters
+    from backend.database import get_connection
+    from backend.schema import migrate
+
+    conn = get_connection(db_path)
+    migrate(conn)
+
+    def failing_rebuild(conn, group):
+        raise RuntimeError("rebuild failed")
+
+    monkeypatch.setattr(counters, "_rebuild_group", failing_rebuild)
+    with pytest.raises(RuntimeError):
+        counters.ensure_counters(conn)
+    assert not counters._trigger_names(conn)
+
+    monkeypatch.undo()
+    with caplog.at_level("INFO", logger="backend.counters"):
+        installed = counters.ensure_counters(conn)
+    assert "graph_posts" not in installed
+    assert "Skipping counters for graph_posts: missing posts.processed" in caplog.text
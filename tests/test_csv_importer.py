@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Tests for the bulk CSV prospect import
+"""
+
+import pandas as pd
+import pytest
+
+TITLES = [
+    "Chief Product Officer", "Senior Product Manager", "PM, Payments", "Product Owner",
+    "CTO", "Sales Director", "Chef", "", None, "Associate Product Manager", "Group PM",
+]
+
+
+@pytest.fixture
+def importer(load_script, db_path):
+    return load_script("csv_profile_importer").CSVProfileImporter(db_path=db_path)
+
+
+def test_series_scoring_matches_scalar(importer):
+    scores = importer.score_job_titles(pd.Series(TITLES))
+    assert scores.tolist() == [importer.calculate_job_title_score(title) for title in TITLES]
+
+
+def test_series_usernames_match_scalar(importer):
+    urls = ["https://www.linkedin.com/in/ada/", "https://linkedin.com/in/bob?x=1#y", "https://example.com", None]
+    assert importer.extract_usernames(pd.Series(urls)).tolist() == [
+        importer.extract_username_from_url(url) for url in urls
+    ]
+
+
+def test_import_skips_existing_and_counts_row_errors(importer, tmp_path):
+    csv_path = tmp_path / "prospects.csv"
+    pd.DataFrame({
+        'first_name': ['Ada', 'Bob', 'Cy', 'Cy'],
+        'last_name': ['L', 'M', 'N', 'N'],
+        'profile_url': [f"https://www.linkedin.com/in/{name}" for name in ('ada', 'bob', 'cy', 'cy')],
+        'job_title': ['Head of Product', None, 'PM', 'PM'],
+    }).to_csv(csv_path, index=False)
+
+    first = importer.import_prospects(str(csv_path))
+    # The repeated row violates UNIQUE(profile_url, username) and is counted as one error
+    assert (first['new_profiles'], first['duplicates_skipped'], first['errors']) == (3, 0, 1)
+
+    second = importer.import_prospects(str(csv_path))
+    assert (second['new_profiles'], second['duplicates_skipped'], second['errors']) == (0, 4, 0)
+
+    conn = importer.get_db_connection()
+    rows = conn.execute("SELECT username, job_title, job_title_score FROM profiles ORDER BY profile_id").fetchall()
+    assert [tuple(r) for r in rows] == [('ada', 'Head of Product', 10), ('bob', None, 1), ('cy', 'PM', 6)]
+
+
+def test_connections_reconcile_with_set_operations(importer, tmp_path):
+    prospects = tmp_path / "prospects.csv"
+    pd.DataFrame({
+        'first_name': ['Ada', 'Bob'],
+        'last_name': ['L', 'M'],
+        'profile_url': ["https://www.linkedin.com/in/ada", "https://www.linkedin.com/in/bob"],
+    }).to_csv(prospects, index=False)
+    importer.import_prospects(str(prospects))
+
+    connections = tmp_path / "connections.csv"
+    pd.DataFrame({
+        'first_name': ['Ada', 'Cy', 'Cy', 'Dee'],
+        'last_name': ['L', 'N', 'N', 'O'],
+        'profile_url': [f"https://www.linkedin.com/in/{name}" for name in ('ada', 'cy', 'cy', 'dee')],
+        'job_title': [None, 'Director of Product', 'Director of Product', 'Recruiter'],
+    }).to_csv(connections, index=False)
+
+    first = importer.import_connections(str(connections))
+    assert (first['reconciled_prospects'], first['new_connections'], first['duplicates_skipped']) == (1, 2, 1)
+
+    second = importer.import_connections(str(connections))
+    assert (second['reconciled_prospects'], second['new_connections'], second['duplicates_skipped']) == (0, 0, 4)
+
+    conn = importer.get_db_connection()
+    rows = conn.execute("""
+        SELECT username, status, connection_status, job_title_score FROM profiles ORDER BY profile_id
+    """).fetchall()
+    assert [tuple(r) for r in rows] == [
+        ('ada', 'maintenance', 'current_connection', 1),
+        ('bob', 'not_started', 'prospect', 1),
+        ('cy', 'maintenance', 'current_connection', 10),
+        ('dee', 'maintenance', 'current_connection', 2),
+    ]
+
+
+def test_connections_count_row_errors_and_reconcile_one_profile_per_url(importer, tmp_path):
+    conn = importer.get_db_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (first_name, last_name, username, profile_url, status, connection_status) "
+            "VALUES ('Ada', 'L', ?, 'https://www.linkedin.com/in/ada', 'not_started', 'prospect')",
+            [('ada',), ('ada-old',)],
+        )
+        conn.execute("""
+            CREATE TEMP TRIGGER reject_bad_rows BEFORE INSERT ON profiles WHEN NEW.first_name = 'Bad'
+            BEGIN SELECT RAISE(ABORT, 'bad row'); END
+        """)
+
+    connections = tmp_path / "connections.csv"
+    pd.DataFrame({
+        'first_name': ['Ada', 'Bad', 'Cy'],
+        'last_name': ['L', 'X', 'N'],
+        'profile_url': [f"https://www.linkedin.com/in/{name}" for name in ('ada', 'bad', 'cy')],
+    }).to_csv(connections, index=False)
+
+    results = importer.import_connections(str(connections))
+
+    assert (results['reconciled_prospects'], results['new_connections'],
+            results['duplicates_skipped'], results['errors']) == (1, 1, 0, 1)
+    rows = conn.execute("SELECT username, connection_status FROM profiles ORDER BY profile_id").fetchall()
+    assert [tuple(r) for r in rows] == [
+        ('ada', 'current_connection'), ('ada-old', 'prospect'), ('cy', 'current_connection'),
+    ]
+
+
+def _prospect_frame(count):
+    return pd.DataFrame({
+        'first_name': [f"First{i}" for i in range(count)],
+        'last_name': [f"Last{i}" for i in range(count)],
+        'profile_url': [f"https://www.linkedin.com/in/user{i}" for i in range(count)],
+        'job_title': ['Product Manager'] * count,
+    })
+
+
+def test_streams_gzip_and_jsonl_inputs(importer, tmp_path):
+    gz_path = tmp_path / "prospects.csv.gz"
+    _prospect_frame(25).to_csv(gz_path, index=False)
+    jsonl_path = tmp_path / "more.jsonl"
+    _prospect_frame(30).to_json(jsonl_path, orient='records', lines=True)
+
+    assert importer.import_prospects(str(gz_path), chunk_size=10)['new_profiles'] == 25
+    results = importer.import_prospects(str(jsonl_path), chunk_size=7)
+    assert (results['new_profiles'], results['duplicates_skipped']) == (5, 25)
+
+
+def test_interrupted_import_resumes_after_last_committed_chunk(importer, tmp_path):
+    csv_path = tmp_path / "prospects.csv"
+    _prospect_frame(35).to_csv(csv_path, index=False)
+    original_chunk = importer._import_prospect_chunk
+    calls = []
+
+    def failing_chunk(conn, df, results):
+        calls.append(len(df))
+        if len(calls) == 3:
+            raise RuntimeError("interrupted")
+        original_chunk(conn, df, results)
+
+    importer._import_prospect_chunk = failing_chunk
+    with pytest.raises(RuntimeError):
+        importer.import_prospects(str(csv_path), chunk_size=10)
+    del importer._import_prospect_chunk
+
+    conn = importer.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 20
+
+    # A different chunk size still resumes at the right row
+    results = importer.import_prospects(str(csv_path), chunk_size=8)
+    assert (results['total_rows'], results['new_profiles'], results['duplicates_skipped']) == (35, 35, 0)
+    assert conn.execute("SELECT COUNT(*) FROM profiles").fetchone()[0] == 35
+
+    # A completed import starts over
+    assert importer.import_prospects(str(csv_path))['duplicates_skipped'] == 35
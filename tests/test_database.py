@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared SQLite connection layer
+"""
+
+import sqlite3
+import threading
+
+from backend.database import (
+    BUSY_TIMEOUT_SECONDS,
+    close_all_connections,
+    close_connection,
+    get_connection,
+)
+
+
+def test_connection_is_shared_and_uses_wal(tmp_path):
+    """Repeated calls reuse one WAL-mode connection per database file"""
+    db_path = str(tmp_path / "test.sqlite3")
+
+    conn = get_connection(db_path)
+    try:
+        assert get_connection(db_path) is conn
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == int(BUSY_TIMEOUT_SECONDS * 1000)
+        assert conn.row_factory is sqlite3.Row
+    finally:
+        close_connection(db_path)
+
+    assert get_connection(db_path) is not conn
+    close_connection(db_path)
+
+
+def test_context_manager_commits_without_closing(tmp_path):
+    """`with conn:` scopes a transaction but leaves the shared connection open"""
+    db_path = str(tmp_path / "test.sqlite3")
+    conn = get_connection(db_path)
+    try:
+        with conn:
+            conn.execute("CREATE TABLE items (value INTEGER)")
+            conn.execute("INSERT INTO items VALUES (1)")
+
+        try:
+            with conn:
+                conn.execute("INSERT INTO items VALUES (2)")
+                raise RuntimeError("boom")
+        except RuntimeError:
+            pass
+
+        values = [row[0] for row in conn.execute("SELECT value FROM items")]
+        assert values == [1]
+    finally:
+        close_all_connections()
+
+
+def test_threads_get_their_own_connection(tmp_path):
+    """sqlite3 connections are thread-bound, so each thread gets its own"""
+    db_path = str(tmp_path / "test.sqlite3")
+    main_conn = get_connection(db_path)
+    seen = []
+
+    def worker():
+        seen.append(get_connection(db_path))
+        close_connection(db_path)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    thread.join()
+
+    assert seen and seen[0] is not main_conn
+    close_connection(db_path)
+
+
+def test_close_all_reaches_connections_of_other_threads(tmp_path):
+    """A thread's cached connection is replaced after close_all_connections"""
+    db_path = str(tmp_path / "test.sqlite3")
+    opened, closed = threading.Event(), threading.Event()
+    seen = {}
+
+    def worker():
+        seen['before'] = get_connection(db_path)
+        opened.set()
+        closed.wait(5)
+        seen['after'] = get_connection(db_path)
+        seen['value'] = seen['after'].execute("SELECT 1").fetchone()[0]
+        try:
+            seen['before'].execute("SELECT 1")
+        except sqlite3.ProgrammingError:
+            seen['before_closed'] = True
+        close_connection(db_path)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    opened.wait(5)
+    main_conn = get_connection(db_path)
+    close_all_connections()
+    closed.set()
+    thread.join()
+
+    assert seen['after'] is not seen['before'] and seen['value'] == 1
+    assert seen.get('before_closed')
+    assert get_connection(db_path) is not main_conn
+    close_connection(db_path)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared HTTP client against a local scripted server
+"""
+
+import socket
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from backend.http_client import HttpClient, retry_after_seconds
+
+
+class ScriptedServer:
+    """Answers each request with the next ``(status, headers)`` of its path's script, then 200."""
+
+    def __init__(self, scripts):
+        self.scripts = {path: list(script) for path, script in scripts.items()}
+        self.lock = threading.Lock()
+        self.requests = []
+        self.client_ports = set()
+
+    def handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def respond(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                self.rfile.read(length)
+                with server.lock:
+                    server.requests.append((self.command, self.path))
+                    server.client_ports.add(self.client_address[1])
+                    script = server.scripts.get(self.path, [])
+                    status, headers = script.pop(0) if script else (200, {})
+                body = b'{"ok": true}'
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = respond
+
+        return Handler
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(scripts=None):
+        scripted = ScriptedServer(scripts or {})
+        server = ThreadingHTTPServer(("127.0.0.1", 0), scripted.handler())
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        scripted.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        return scripted
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def client():
+    sleeps = []
+    with HttpClient(sleep=sleeps.append) as client:
+        client.sleeps = sleeps
+        yield client
+
+
+def test_idempotent_requests_retry_server_errors_and_reuse_connections(serve, client):
+    server = serve({"/flaky": [(503, {}), (502, {})]})
+
+    response = client.get(f"{server.base_url}/flaky", endpoint="flaky")
+    for _ in range(3):
+        assert client.get(f"{server.base_url}/steady").status_code == 200
+
+    assert response.status_code == 200
+    assert len(client.sleeps) == 2
+    assert client.sleeps[1] <= client.backoff_base * 2
+    metrics = client.metrics()
+    assert metrics["flaky"]["requests"] == 3
+    assert metrics["flaky"]["retries"] == 2
+    assert metrics["flaky"]["statuses"] == {200: 1, 502: 1, 503: 1}
+    assert metrics["GET 127.0.0.1/steady"]["requests"] == 3
+    # Six requests over one keep-alive connection
+    assert len(server.client_ports) == 1
+
+
+def test_non_idempotent_posts_only_retry_rate_limits(serve, client):
+    server = serve({
+        "/comment": [(429, {"Retry-After": "2"}), (500, {})],
+        "/like": [(500, {})],
+    })
+
+    comment = client.post(f"{server.base_url}/comment", json={"text": "hi"}, endpoint="comment")
+    like = client.post(f"{server.base_url}/like", json={}, endpoint="like", idempotent=True)
+
+    # The 429 waited for Retry-After; the 500 that followed was final
+    assert comment.status_code == 500
+    assert client.metrics()["comment"]["retries"] == 1
+    assert like.status_code == 200
+    assert client.sleeps[0] == 2.0
+    assert server.requests == [("POST", "/comment")] * 2 + [("POST", "/like")] * 2
+
+
+def test_connection_errors_are_retried_then_raised(client):
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+
+    with pytest.raises(httpx.ConnectError):
+        client.post(f"http://127.0.0.1:{port}/comment", json={}, endpoint="down")
+
+    metrics = client.metrics()["down"]
+    assert (metrics["requests"], metrics["retries"], metrics["errors"]) == (4, 3, 4)
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    def response(value):
+        return httpx.Response(429, headers={"Retry-After": value} if value is not None else {})
+
+    later = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert retry_after_seconds(response("7")) == 7.0
+    assert 25 <= retry_after_seconds(response(later)) <= 30
+    assert retry_after_seconds(response("Wed, 21 Oct 2015 07:28:00 GMT")) == 0.0
+    assert retry_after_seconds(response("soon"), default=4.0) == 4.0
+    assert retry_after_seconds(response(None), default=4.0) == 4.0
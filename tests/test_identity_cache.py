@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk LinkedIn identity cache and its use by the liker and poster
+"""
+
+import httpx
+import pytest
+
+from backend.identity_cache import IdentityCache, parse_token_expiry, token_key
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_with_ttl_or_token_lifetime(tmp_path):
+    clock = Clock()
+    path = tmp_path / "identity.json"
+    cache = IdentityCache(path, ttl_seconds=3600, clock=clock)
+    cache.put("token-a", {'sub': 'abc'})
+
+    assert cache.get("token-a") == {'sub': 'abc'}
+    assert cache.get("token-b") is None
+    assert "token-a" not in path.read_text() and token_key("token-a") in path.read_text()
+    clock.now += 3601
+    assert cache.get("token-a") is None
+
+    # The token itself expires before the TTL
+    short_lived = IdentityCache(path, ttl_seconds=3600, token_expires_at=clock.now + 60, clock=clock)
+    short_lived.put("token-a", {'sub': 'abc'})
+    clock.now += 61
+    assert short_lived.get("token-a") is None
+
+    assert parse_token_expiry("1700000000") == 1_700_000_000.0
+    assert parse_token_expiry("2023-11-14T22:13:20") == 1_700_000_000.0
+    assert parse_token_expiry("soon") is None
+
+
+class FakeHttp:
+    """Stands in for HttpClient: answers userinfo with a member ID and likes with ``like_status``."""
+
+    def __init__(self, like_status=201):
+        self.like_status = like_status
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(url)
+        return httpx.Response(200, json={'sub': 'member-1', 'email': 'a@example.com'})
+
+    def post(self, url, **kwargs):
+        self.calls.append(url)
+        return httpx.Response(self.like_status, json={},
+                              request=httpx.Request("POST", url))
+
+
+@pytest.mark.parametrize("module, cls", [
+    ("linkedin_post_liker", "PostLiker"), ("linkedin_comment_poster", "CommentPoster"),
+])
+def test_warm_start_skips_userinfo_until_a_401(load_script, db_path, module, cls):
+    worker_class = getattr(load_script(module), cls)
+    cold = worker_class(db_path=db_path)
+    cold.http = FakeHttp()
+    assert cold.validate_linkedin_credentials()['user_id'] == 'member-1'
+    assert len(cold.http.calls) == 1
+
+    warm = worker_class(db_path=db_path)
+    warm.http = FakeHttp(like_status=401)
+    result = warm.validate_linkedin_credentials()
+    assert (result['user_id'], result.get('cached')) == ('member-1', True)
+    assert warm.http.calls == []
+    assert 'email' not in result['user_data']
+
+    if module == "linkedin_post_liker":
+        assert warm.like_post_on_linkedin("123", "member-1") is None
+    else:
+        assert warm.post_comment_to_linkedin("Nice post", "123", "member-1") is None
+    assert warm.validate_linkedin_credentials().get('cached') is None
+    assert len(warm.http.calls) == 2
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled job title matcher and bulk rescoring
+"""
+
+import pandas as pd
+
+from backend.database import get_connection
+from backend.job_titles import (
+    INVITABLE_ROLE_CATEGORIES,
+    JOB_TITLE_TIERS,
+    PRODUCT_ROLE_CATEGORIES,
+    classify_role,
+    classify_roles,
+    ensure_role_categories,
+    reclassify_roles,
+    rescore_profiles,
+    score_job_title,
+    score_job_titles,
+)
+
+
+def reference_score(title):
+    """The original any(word in title) chain, tier by tier."""
+    if not title:
+        return 1
+    title_lower = title.lower()
+    for score, keywords in JOB_TITLE_TIERS:
+        if any(word in title_lower for word in keywords):
+            return score
+    return 1
+
+
+TITLES = [
+    "Chief Product Officer", "CPO @ Acme", "Senior Product Manager", "Product Manager II",
+    "Group PM", "APM", "Associate Product Manager", "Product Marketing Lead", "Product Owner",
+    "CTO", "Technical Recruiter", "Sales Director", "VP of Engineering", "Chef",
+    "Operations PM", "Head of Product Marketing", "", None,
+]
+
+
+def test_compiled_matcher_matches_reference_rules():
+    assert [score_job_title(title) for title in TITLES] == [reference_score(title) for title in TITLES]
+
+
+def test_series_scoring_handles_repeats_and_missing():
+    titles = pd.Series(TITLES * 3, index=range(100, 100 + len(TITLES) * 3))
+    scores = score_job_titles(titles)
+    assert scores.index.equals(titles.index)
+    assert scores.tolist() == [reference_score(title) for title in TITLES] * 3
+    assert score_job_titles(pd.Series([None, None])).tolist() == [1, 1]
+
+
+def test_rescore_only_writes_changed_rows(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE profiles (
+                profile_id INTEGER PRIMARY KEY, job_title TEXT,
+                job_title_score INTEGER, priority_score INTEGER, role_category TEXT
+            )
+        """)
+        conn.executemany(
+            "INSERT INTO profiles (job_title, job_title_score, priority_score, role_category) VALUES (?, ?, ?, ?)",
+            [("Head of Product", 10, 10, 'product_management'), ("Group PM", 1, 1, 'other'), ("Chef", 1, 1, None),
+             (None, None, None, None), ("CTO", 2, 5, 'other')],
+        )
+
+    changes = []
+    conn.set_trace_callback(lambda sql: changes.append(sql) if sql.startswith("UPDATE") else None)
+    try:
+        assert rescore_profiles(conn, chunk_size=2) == {'profiles_scanned': 5, 'profiles_updated': 4}
+    finally:
+        conn.set_trace_callback(None)
+
+    assert len(changes) == 4
+    rows = conn.execute(
+        "SELECT job_title_score, priority_score, role_category FROM profiles ORDER BY profile_id"
+    ).fetchall()
+    assert [tuple(row) for row in rows] == [
+        (10, 10, 'product_management'), (6, 6, 'other'), (1, 1, 'other'), (1, 1, None), (2, 2, 'other'),
+    ]
+    assert rescore_profiles(conn)['profiles_updated'] == 0
+
+
+# The exclusion list the Week3_to_invite playbook used before role_category
+WEEK3_EXCLUDED = [
+    'product manag', 'product officer', 'product owner', 'head of product',
+    'founder', 'entrepreneur', 'cofounder',
+    'ceo', 'chief executive officer', 'chief operating officer', 'chief financial officer',
+    'chief marketing officer', 'chief revenue officer', 'managing director', 'general manager',
+    'general partner', 'managing partner', 'business develop', 'vp of sales', 'director of sales',
+    'head of sales', 'sales director', 'sales manager', 'vp of marketing', 'director of marketing',
+    'head of marketing', 'marketing director', 'marketing manager', 'account executive',
+    'client partner', 'strategic account', 'recruit', 'talent acquisition', 'headhunter', 'sourcer',
+]
+
+ROLE_TITLES = [
+    "Senior Software Engineer", "Staff Data Scientist", "Co-Founder & CTO", "CEO", "Sales Manager",
+    "Director of Marketing", "Technical Recruiter", "Product Manager", "Group Product Manager",
+    "Teacher", "Managing Director", "Solutions Architect", "Production Engineer", "Productivity Coach",
+    "Senior Product Analyst", "VP Product", "Director, Product Marketing", "Product Designer",
+    "Head of Product Marketing", "Chief Product Officer", "Founder, Digital Products", "", None,
+]
+
+
+def test_role_classification():
+    assert [classify_role(title) for title in ROLE_TITLES] == [
+        'technical', 'technical', 'founder', 'exec', 'sales', 'marketing', 'recruiting',
+        'product_management', 'product_management', 'other', 'exec', 'technical', 'technical', 'other',
+        'product', 'product', 'product', 'product', 'product_management', 'product_management', 'founder',
+        'other', None,
+    ]
+    assert classify_roles(pd.Series(ROLE_TITLES)).tolist() == [classify_role(title) for title in ROLE_TITLES]
+
+
+def test_invitable_roles_match_week3_exclusions():
+    """Titles the old NOT LIKE chain kept are exactly those in an invitable category"""
+    for title in ROLE_TITLES:
+        if title is None:
+            continue
+        kept = not any(word in title.lower() for word in WEEK3_EXCLUDED)
+        assert kept == (classify_role(title) in INVITABLE_ROLE_CATEGORIES), title
+
+
+def test_product_cohort_matches_product_as_a_word():
+    cohort = [title for title in ROLE_TITLES if classify_role(title) in PRODUCT_ROLE_CATEGORIES]
+    assert cohort == [
+        "Product Manager", "Group Product Manager", "Senior Product Analyst", "VP Product",
+        "Director, Product Marketing", "Product Designer", "Head of Product Marketing", "Chief Product Officer",
+    ]
+
+
+def test_reclassify_roles_updates_stale_categories(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("CREATE TABLE profiles (profile_id INTEGER PRIMARY KEY, job_title TEXT, role_category TEXT)")
+        conn.executemany("INSERT INTO profiles (job_title, role_category) VALUES (?, ?)",
+                         [("Production Engineer", 'product'), ("Product Owner", 'product'),
+                          ("Production Engineer", 'product'), ("Teacher", 'other'), (None, None)])
+
+    assert reclassify_roles(conn) == 3
+    assert [row[0] for row in conn.execute("SELECT role_category FROM profiles ORDER BY profile_id")] == [
+        'technical', 'product_management', 'technical', 'other', None,
+    ]
+
+
+def test_ensure_role_categories_adds_and_backfills(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("CREATE TABLE profiles (profile_id INTEGER PRIMARY KEY, job_title TEXT)")
+        conn.executemany("INSERT INTO profiles (job_title) VALUES (?)", [(t,) for t in ROLE_TITLES])
+
+    assert ensure_role_categories(conn, chunk_size=4) == len(ROLE_TITLES) - 1
+    assert ensure_role_categories(conn) == 0
+    categories = [row[0] for row in conn.execute("SELECT role_category FROM profiles ORDER BY profile_id")]
+    assert categories == [classify_role(title) for title in ROLE_TITLES]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for leased work-queue claims (backend/leases.py) and their use by the pipeline workers
+"""
+
+import time
+
+import pytest
+
+from backend.database import get_connection
+from backend.leases import WorkLease
+from backend.schema import migrate
+from backend.settings import load_settings
+
+SCORES = [9, 8, 7, 6, 5]
+
+
+class Clock:
+    def __init__(self, now=1_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = get_connection(db_path)
+    migrate(conn)
+    with conn:
+        conn.executemany("INSERT INTO profiles (profile_id, first_name, last_name, profile_url) "
+                         "VALUES (?, 'First', 'Last', ?)",
+                         [(profile_id, f"https://www.linkedin.com/in/u{profile_id}") for profile_id in range(1, 6)])
+    return conn
+
+
+def lease_of(conn, profile_id):
+    return tuple(conn.execute("SELECT lease_owner, lease_expires_at FROM profiles WHERE profile_id = ?",
+                              (profile_id,)).fetchone())
+
+
+def test_claims_are_exclusive_until_expiry(conn):
+    clock = Clock()
+    a = WorkLease(conn, "profiles", owner="a", lease_seconds=60, clock=clock)
+    b = WorkLease(conn, "profiles", owner="b", lease_seconds=60, clock=clock)
+
+    assert a.claim([1, 2, 3]) == {1, 2, 3}
+    assert b.claim([2, 3, 4]) == {4}
+    assert a.claim([1, 4]) == {1}  # re-claiming its own rows renews them
+    assert lease_of(conn, 1) == ("a", 1_060.0)
+
+    clock.now += 60
+    assert b.claim([1, 2]) == {1, 2}  # a stopped renewing: its leases expired
+    assert lease_of(conn, 1) == ("b", 1_120.0)
+
+
+def test_heartbeat_is_throttled_and_release_clears_only_own_leases(conn):
+    clock = Clock()
+    a = WorkLease(conn, "profiles", owner="a", lease_seconds=60, clock=clock)
+    b = WorkLease(conn, "profiles", owner="b", lease_seconds=60, clock=clock)
+    a.claim([1, 2])
+    b.claim([3])
+
+    clock.now += 10
+    assert a.heartbeat() == 0
+    clock.now += 10
+    assert a.heartbeat() == 2
+    assert lease_of(conn, 1) == ("a", 1_080.0)
+    assert lease_of(conn, 3) == ("b", 1_060.0)
+
+    assert a.release() == 2
+    assert lease_of(conn, 1) == (None, None)
+    assert lease_of(conn, 3) == ("b", 1_060.0)
+
+
+def test_unknown_table_is_rejected(conn):
+    with pytest.raises(ValueError, match="no lease columns"):
+        WorkLease(conn, "comment_queue")
+
+
+@pytest.fixture
+def scrapers(load_script, db_path):
+    module = load_script("retrieve_posts_prospects")
+    settings = load_settings()
+    first, second = (module.PostScraper(db_path=db_path, settings=settings._replace(worker_id=owner))
+                     for owner in ("worker-1", "worker-2"))
+    conn = first.get_db_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, connection_status, "
+            "job_title_score) VALUES (?, 'First', 'Last', ?, 'not_started', 'prospect', ?)",
+            [(profile_id, f"https://www.linkedin.com/in/u{profile_id}", score)
+             for profile_id, score in enumerate(SCORES, start=1)],
+        )
+    return first, second
+
+
+def test_parallel_scrapers_split_the_queue(scrapers):
+    first, second = scrapers
+    streamed = first.iter_profiles_for_scraping(page_size=2)
+
+    assert next(streamed)['profile_id'] == 1  # claims the whole first page
+    assert [p['profile_id'] for p in second.iter_profiles_for_scraping(page_size=2)] == [3, 4, 5]
+    assert [p['profile_id'] for p in first.get_profiles_for_scraping()] == [1, 2]
+
+    first.lease.release()
+    second.lease.release()
+    assert [p['profile_id'] for p in second.get_profiles_for_scraping()] == [1, 2, 3, 4, 5]
+
+
+def test_scrape_batch_releases_leases_when_it_fails(scrapers, monkeypatch):
+    first, second = scrapers
+
+    def failing_scrape(profile):
+        raise RuntimeError("worker crashed")
+
+    monkeypatch.setattr(first, 'scrape_profile', failing_scrape)
+    with pytest.raises(RuntimeError):
+        first.scrape_batch(max_profiles=3, delay_seconds=0)
+
+    conn = first.get_db_connection()
+    assert conn.execute("SELECT COUNT(*) FROM profiles WHERE lease_owner IS NOT NULL").fetchone()[0] == 0
+    assert len(second.get_profiles_for_scraping()) == len(SCORES)
+
+
+def test_parallel_likers_get_disjoint_posts(load_script, db_path):
+    module = load_script("linkedin_post_liker")
+    settings = load_settings()
+    first, second = (module.PostLiker(db_path=db_path, settings=settings._replace(worker_id=owner))
+                     for owner in ("worker-1", "worker-2"))
+    now_ms = int(time.time() * 1000)
+    conn = first.get_db_connection()
+    with conn:
+        conn.executemany("INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, "
+                         "job_title_score) VALUES (?, 'First', 'Last', ?, 'week1_liking', ?)",
+                         [(1, "https://www.linkedin.com/in/u1", 9), (2, "https://www.linkedin.com/in/u2", 5)])
+        conn.executemany("INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp) VALUES (?, ?, ?, ?)",
+                         [(post_id, post_id // 100, f"urn:li:activity:{post_id}", now_ms - post_id)
+                          for post_id in (101, 102, 201, 202)])
+
+    taken = first.lease.claim_rows(first.get_posts_to_like(max_likes=2))
+    rest = second.lease.claim_rows(second.get_posts_to_like(max_likes=2))
+
+    assert [p['post_id'] for p in taken] == [101, 102]
+    assert [p['post_id'] for p in rest] == [201, 202]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-process pipeline orchestrator
+"""
+
+import random
+from functools import cached_property
+
+import pytest
+
+
+@pytest.fixture
+def pipeline(load_script):
+    return load_script("linkedin_pipeline")
+
+
+def fake_stage(pipeline, name, calls, result=None, error=None, delay=(10, 10)):
+    def run(context):
+        calls.append(name)
+        if error:
+            raise error
+        return result if result is not None else {'success': True, 'results': [1, 2], 'processed': 2}
+    return pipeline.Stage(name, run, delay=delay)
+
+
+def test_stages_run_in_order_and_failures_do_not_stop_the_run(pipeline):
+    calls, sleeps = [], []
+    stages = [
+        fake_stage(pipeline, "scrape", calls),
+        fake_stage(pipeline, "like", calls, error=RuntimeError("token expired")),
+        fake_stage(pipeline, "generate", calls, result={'success': False, 'error': 'No posts found'}),
+        fake_stage(pipeline, "post", calls),
+    ]
+
+    summary = pipeline.run_pipeline(stages, sleep=sleeps.append, rng=random.Random(0))
+
+    assert calls == ["scrape", "like", "generate", "post"]
+    assert sleeps == [10, 10, 10, 10]
+    assert [(s['stage'], s['status'], s['exit_status']) for s in summary['stages']] == [
+        ("scrape", "ok", 0), ("like", "failed", 1), ("generate", "failed", 1), ("post", "ok", 0),
+    ]
+    assert summary['stages'][0]['result'] == {'success': True, 'processed': 2}
+    assert summary['stages'][1]['error'] == "token expired"
+    assert summary['stages'][2]['error'] == "No posts found"
+    assert summary['exit_status'] == 1
+
+
+def test_only_and_skip_select_stages_and_their_delays(pipeline):
+    assert [s.name for s in pipeline.select_stages(pipeline.STAGES, only=["post", "like"])] == ["like", "post"]
+    assert [s.name for s in pipeline.select_stages(pipeline.STAGES, skip=["generate"])] == [
+        "scrape_prospects", "scrape_connections", "like", "post",
+    ]
+    with pytest.raises(ValueError, match="Unknown stages: comment"):
+        pipeline.select_stages(pipeline.STAGES, only=["comment"])
+
+    calls, sleeps = [], []
+    stages = [fake_stage(pipeline, "scrape", calls, delay=(1, 1)), fake_stage(pipeline, "post", calls, delay=(7, 7))]
+    summary = pipeline.run_pipeline(pipeline.select_stages(stages, skip=["scrape"]), sleep=sleeps.append)
+    assert (calls, sleeps, summary['exit_status']) == (["post"], [7], 0)
+
+    pipeline.run_pipeline(stages, delays=False, sleep=sleeps.append)
+    assert sleeps == [7]
+
+
+def test_liker_and_poster_share_one_linkedin_client(pipeline):
+    created = []
+
+    class Worker:
+        @cached_property
+        def http(self):
+            created.append(self)
+            return object()
+
+    context = pipeline.PipelineContext()
+    liker, poster = Worker(), Worker()
+    context.share_linkedin_client(liker)
+    context.share_linkedin_client(poster)
+
+    assert poster.http is liker.http is context.linkedin_http
+    assert created == [liker]
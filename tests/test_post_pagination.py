@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for paginated post fetching with the recency horizon and page cap
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+DAY_MS = 24 * 3600 * 1000
+
+
+@pytest.fixture
+def posts_api():
+    """Serve ``feed`` (posts newest first) in pages of the scraper's page size."""
+    state = {'feed': [], 'page_size': 50, 'starts': []}
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            start = int(parse_qs(urlparse(self.path).query)["start"][0])
+            state['starts'].append(start)
+            page = state['feed'][start:start + state['page_size']]
+            body = json.dumps({'success': True, 'data': page}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    state['url'] = f"http://127.0.0.1:{server.server_address[1]}/get-profile-posts"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(params=["retrieve_posts_prospects", "retrieve_post_1stconnections"])
+def module(request, load_script):
+    return load_script(request.param)
+
+
+def feed(ages_in_days):
+    now_ms = int(time.time() * 1000)
+    return [{'urn': f"urn:li:activity:{n}", 'postedDateTimestamp': now_ms - int(age * DAY_MS)}
+            for n, age in enumerate(ages_in_days)]
+
+
+def make_scraper(module, db_path, posts_api, **kwargs):
+    scraper = module.PostScraper(db_path=db_path, use_cache=False, **kwargs)
+    scraper.api_url = posts_api['url']
+    posts_api['page_size'] = module.POSTS_PAGE_SIZE
+    return scraper
+
+
+def test_paging_stops_at_the_horizon(module, db_path, posts_api):
+    scraper = make_scraper(module, db_path, posts_api, horizon_days=10)
+    size = module.POSTS_PAGE_SIZE
+    # A pinned old post first, a full recent page, then a page that crosses the horizon
+    posts_api['feed'] = feed([400] + [1] * (size - 1) + [5] * (size - 5) + [20] * 5 + [30] * size)
+
+    pages = list(scraper.iter_linkedin_posts("https://www.linkedin.com/in/ada"))
+
+    assert [len(page) for page in pages] == [size, size]
+    assert posts_api['starts'] == [0, size]
+
+
+def test_short_page_and_page_cap_stop_paging(module, db_path, posts_api):
+    size = module.POSTS_PAGE_SIZE
+    posts_api['feed'] = feed([1] * (size + 3))
+    scraper = make_scraper(module, db_path, posts_api)
+    assert len(scraper.fetch_linkedin_posts("https://www.linkedin.com/in/ada")) == size + 3
+    assert posts_api['starts'] == [0, size]
+
+    posts_api['starts'].clear()
+    posts_api['feed'] = feed([1] * (size * 5))
+    capped = make_scraper(module, db_path, posts_api, max_pages=2)
+    assert len(capped.fetch_linkedin_posts("https://www.linkedin.com/in/ada")) == size * 2
+    assert posts_api['starts'] == [0, size]
+
+
+def test_prospects_and_connections_use_their_own_horizons(load_script):
+    assert load_script("retrieve_posts_prospects").POST_HORIZON_DAYS == 21
+    assert load_script("retrieve_post_1stconnections").POST_HORIZON_DAYS == 30
+
+
+def test_rescrape_stops_at_the_watermark(module, db_path, posts_api):
+    size = module.POSTS_PAGE_SIZE
+    scraper = make_scraper(module, db_path, posts_api)
+    conn = scraper.get_db_connection()
+    with conn:
+        conn.execute("INSERT INTO profiles (profile_id, first_name, last_name, profile_url) "
+                     "VALUES (1, 'Ada', 'L', 'https://www.linkedin.com/in/ada')")
+    profile = dict(conn.execute("SELECT * FROM profiles").fetchone())
+
+    posts_api['feed'] = feed([1 + n / 10 for n in range(size * 2)])
+    scraper.scrape_profile(profile)
+    newest = posts_api['feed'][0]
+    row = conn.execute("SELECT posts_watermark_ts, posts_watermark_urn FROM profiles").fetchone()
+    assert tuple(row) == (newest['postedDateTimestamp'], newest['urn'])
+
+    # Three new posts on top: the first page already reaches stored content
+    posts_api['starts'].clear()
+    posts_api['feed'] = feed([0.1, 0.2, 0.3]) + posts_api['feed']
+    for post, n in zip(posts_api['feed'][:3], range(3)):
+        post['urn'] = f"urn:li:activity:new{n}"
+    profile = dict(conn.execute("SELECT * FROM profiles").fetchone())
+
+    assert scraper.scrape_profile(profile)['posts_saved'] == 3
+    assert posts_api['starts'] == [0]
+    assert conn.execute("SELECT posts_watermark_urn FROM profiles").fetchone()[0] == "urn:li:activity:new0"
+
+
+def test_batch_checks_known_urns_in_memory(module, db_path, posts_api):
+    size = module.POSTS_PAGE_SIZE
+    scraper = make_scraper(module, db_path, posts_api)
+    conn = scraper.get_db_connection()
+    posts_api['feed'] = feed([1 + n / 10 for n in range(size * 2)])
+    with conn:
+        conn.execute("INSERT INTO profiles (profile_id, first_name, last_name, profile_url) "
+                     "VALUES (1, 'Ada', 'L', 'https://www.linkedin.com/in/ada')")
+        # Stored posts but no watermark, as before the watermark columns existed
+        conn.executemany("INSERT INTO posts (profile_id, urn) VALUES (1, ?)",
+                         [(post['urn'],) for post in posts_api['feed']])
+
+    scraper.known_urns = set()
+    profiles = list(scraper._with_known_urns([{'profile_id': 1}], chunk_size=10))
+    assert profiles == [{'profile_id': 1}]
+    assert len(scraper.known_urns) == size * 2
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        posts = scraper.fetch_linkedin_posts("https://www.linkedin.com/in/ada")
+        assert scraper.save_posts(posts, profile_id=1) == 0
+    finally:
+        conn.set_trace_callback(None)
+
+    assert posts_api['starts'] == [0]
+    assert not [sql for sql in statements if "WHERE urn IN" in sql]
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for URN deduplication and post/media upserts
+"""
+
+import sqlite3
+
+import pytest
+
+from backend.database import get_connection
+from backend.posts import POST_COLUMNS, post_row, save_post_page
+from backend.schema import migrate_unique_post_urns
+
+
+def _post(urn, likes=1, comments=0, text="hello"):
+    return {
+        'urn': urn,
+        'text': text,
+        'likeCount': likes,
+        'totalReactionCount': likes,
+        'commentsCount': comments,
+        'postedDateTimestamp': 1753364712000,
+        'image': [{'url': f'https://img/{urn}.png'}],
+    }
+
+
+def test_migration_dedupes_and_repoints_children(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("""
+            CREATE TABLE posts (
+                post_id INTEGER PRIMARY KEY, urn TEXT, is_post_liked BOOLEAN,
+                liked_to_linkedin_at TIMESTAMP, linkedin_like_id TEXT, linkedin_like_urn TEXT
+            )
+        """)
+        conn.execute("CREATE TABLE media (media_id INTEGER PRIMARY KEY, post_id INTEGER, media_url TEXT)")
+        conn.execute("CREATE TABLE comments (comment_id INTEGER PRIMARY KEY, post_id INTEGER)")
+        conn.executemany(
+            "INSERT INTO posts (post_id, urn, is_post_liked, liked_to_linkedin_at) VALUES (?, ?, ?, ?)",
+            [(1, 'a', None, None), (2, 'a', True, '2025-07-01'), (3, 'b', None, None),
+             (4, '', None, None), (5, '', None, None)],
+        )
+        conn.executemany("INSERT INTO media (post_id, media_url) VALUES (?, ?)",
+                         [(1, 'x'), (2, 'x'), (2, 'y')])
+        conn.execute("INSERT INTO comments (post_id) VALUES (2)")
+
+    assert migrate_unique_post_urns(conn) == 1
+
+    assert [tuple(r) for r in conn.execute("SELECT post_id, urn, is_post_liked FROM posts ORDER BY post_id")] == [
+        (1, 'a', 1), (3, 'b', None), (4, None, None), (5, None, None),
+    ]
+    assert [tuple(r) for r in conn.execute("SELECT post_id, media_url FROM media ORDER BY media_url")] == [
+        (1, 'x'), (1, 'y'),
+    ]
+    assert conn.execute("SELECT post_id FROM comments").fetchone()[0] == 1
+
+    with pytest.raises(sqlite3.IntegrityError):
+        conn.execute("INSERT INTO posts (urn) VALUES ('a')")
+    assert migrate_unique_post_urns(conn) == 0
+
+
+def test_rescrape_refreshes_counters_without_duplicating(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    conn = scraper.get_db_connection()
+
+    assert scraper.save_posts([_post('urn:1'), _post('urn:2'), _post(None)], profile_id=7) == 3
+    assert scraper.save_posts([_post('urn:1', likes=9, comments=4, text="edited"), _post('urn:3')],
+                              profile_id=7) == 1
+
+    assert conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0] == 4
+    row = conn.execute("SELECT like_count, comments_count, text FROM posts WHERE urn = 'urn:1'").fetchone()
+    assert tuple(row) == (9, 4, "hello")
+    assert conn.execute("SELECT COUNT(*) FROM media").fetchone()[0] == 4
+
+
+def test_page_mapping_resolves_media_post_ids(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    conn = scraper.get_db_connection()
+    page = [_post('urn:1'), _post('urn:2'), _post('urn:1', likes=5), _post('')]
+
+    assert len(post_row(page[0], 7, "2025-07-24 00:00:00")) == len(POST_COLUMNS)
+    assert save_post_page(conn, page, profile_id=7) == 3
+
+    rows = conn.execute("""
+        SELECT p.urn, p.like_count, m.media_url FROM media m JOIN posts p ON p.post_id = m.post_id
+        ORDER BY p.post_id
+    """).fetchall()
+    assert [tuple(r) for r in rows] == [
+        ('urn:1', 5, 'https://img/urn:1.png'),
+        ('urn:2', 1, 'https://img/urn:2.png'),
+        (None, 1, 'https://img/.png'),
+    ]
+
+
+def test_media_without_url_is_not_stored(db_path, load_script):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    conn = scraper.get_db_connection()
+    post = {**_post('urn:1'), 'video': [{'duration': 12}], 'images': [[{'url': None}, {'url': 'https://img/b.png'}]]}
+
+    for _ in range(3):
+        scraper.save_posts([post], profile_id=7)
+
+    assert [row[0] for row in conn.execute("SELECT media_url FROM media ORDER BY media_url")] == [
+        'https://img/b.png', 'https://img/urn:1.png',
+    ]
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Tests for epoch-millisecond post recency
+"""
+
+from backend.database import get_connection
+from backend.posts import (
+    MS_PER_DAY,
+    UNPARSEABLE_POSTED_TIMESTAMP,
+    backfill_posted_timestamps,
+    parse_posted_date_ms,
+    posted_timestamp_ms,
+    recency_cutoff_ms,
+)
+
+JULY_24_MS = 1753364712000  # 2025-07-24 13:45:12 UTC
+
+
+def test_parse_posted_date_formats():
+    assert parse_posted_date_ms("2025-07-24 13:45:12.000 +0000 UTC") == JULY_24_MS
+    assert parse_posted_date_ms("2025-07-24T13:45:12Z") == JULY_24_MS
+    assert parse_posted_date_ms("2025-07-24") == JULY_24_MS - (13 * 3600 + 45 * 60 + 12) * 1000
+    assert parse_posted_date_ms("") is None
+    assert parse_posted_date_ms("last week") is None
+
+
+def test_payload_timestamp_prefers_api_epoch():
+    assert posted_timestamp_ms({'postedDateTimestamp': 123, 'postedDate': '2025-07-24'}) == 123
+    assert posted_timestamp_ms({'postedDateTimestamp': 0, 'postedDate': '2025-07-24 13:45:12'}) == JULY_24_MS
+    assert posted_timestamp_ms({}) is None
+
+
+def test_recency_cutoff():
+    assert recency_cutoff_ms(21, now_ms=30 * MS_PER_DAY) == 9 * MS_PER_DAY
+
+
+def test_backfill_fills_legacy_rows_in_chunks(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        conn.execute("CREATE TABLE posts (post_id INTEGER PRIMARY KEY, posted_date TEXT, posted_date_timestamp INTEGER)")
+        conn.executemany(
+            "INSERT INTO posts (posted_date, posted_date_timestamp) VALUES (?, ?)",
+            [
+                ("2025-07-24 13:45:12.000 +0000 UTC", 0),
+                ("2025-07-24 13:45:12.000 +0000 UTC", None),
+                ("not a date", None),
+                ("2025-07-24", 42),
+            ] * 3,
+        )
+
+    assert backfill_posted_timestamps(conn, chunk_size=2) == 6
+
+    values = [row[0] for row in conn.execute("SELECT posted_date_timestamp FROM posts ORDER BY post_id")]
+    assert values == [JULY_24_MS, JULY_24_MS, UNPARSEABLE_POSTED_TIMESTAMP, 42] * 3
+    # Unparseable rows are marked, so the next start has nothing left to scan
+    assert conn.execute("SELECT COUNT(*) FROM posts WHERE posted_date_timestamp IS NULL").fetchone()[0] == 0
+    assert backfill_posted_timestamps(conn) == 0
+
+
+def test_check_recent_posts_uses_epoch_column(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    conn = scraper.get_db_connection()
+    with conn:
+        conn.execute("INSERT INTO profiles (first_name, last_name, profile_url) VALUES ('Ada', 'L', 'https://www.linkedin.com/in/ada')")
+        conn.execute("INSERT INTO posts (urn, profile_id, posted_date, posted_date_timestamp) VALUES ('1', 1, 'garbage', ?)",
+                     (recency_cutoff_ms(30),))
+
+    assert scraper.check_recent_posts(1, days_threshold=21) is False
+    assert scraper.check_recent_posts(1, days_threshold=45) is True
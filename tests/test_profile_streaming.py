@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for LIMIT pushdown and keyset streaming of profiles in the scrapers
+"""
+
+import pytest
+
+SCORES = [10, 6, 6, 6, 8, 1, 6]
+
+
+@pytest.fixture(params=["retrieve_posts_prospects", "retrieve_post_1stconnections"])
+def scraper(request, load_script, db_path):
+    scraper = load_script(request.param).PostScraper(db_path=db_path)
+    prospects = request.param == "retrieve_posts_prospects"
+    conn = scraper.get_db_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, connection_status, "
+            "job_title_score, role_category) VALUES (?, 'First', ?, ?, ?, ?, ?, 'product')",
+            [
+                (profile_id, f"Last{profile_id}", f"https://www.linkedin.com/in/u{profile_id}",
+                 'not_started' if prospects else 'maintenance',
+                 'prospect' if prospects else 'current_connection', score)
+                for profile_id, score in enumerate(SCORES, start=1)
+            ],
+        )
+    return scraper
+
+
+def expected_order():
+    return [profile_id for profile_id, _ in sorted(enumerate(SCORES, start=1), key=lambda p: (-p[1], p[0]))]
+
+
+def test_limit_is_pushed_down(scraper):
+    assert [p['profile_id'] for p in scraper.get_profiles_for_scraping(limit=3)] == expected_order()[:3]
+    assert [p['profile_id'] for p in scraper.get_profiles_for_scraping()] == expected_order()
+
+
+def test_keyset_pages_match_full_order(scraper):
+    for page_size in (1, 2, 3, len(SCORES), 100):
+        streamed = [p['profile_id'] for p in scraper.iter_profiles_for_scraping(page_size=page_size)]
+        assert streamed == expected_order()
+
+
+def test_scrape_batch_streams_results_to_sink(scraper, monkeypatch):
+    def fake_scrape(profile):
+        # Scraping moves the profile out of the queue, like the real method
+        scraper.update_profile_status(profile['profile_id'], 'week1_liking', "test")
+        return {'profile_id': profile['profile_id'], 'name': 'x', 'posts_saved': 2,
+                'new_status': 'week1_liking', 'success': True}
+
+    monkeypatch.setattr(scraper, 'scrape_profile', fake_scrape)
+    seen = []
+
+    results = scraper.scrape_batch(max_profiles=5, delay_seconds=0, sink=seen.append)
+
+    assert [r['profile_id'] for r in seen] == expected_order()[:5]
+    assert results == {
+        'profiles_processed': 5, 'profiles_scraped': 5, 'total_posts_saved': 10,
+        'profiles_to_week1': 5, 'profiles_to_week3': 0,
+    }
+    assert [p['profile_id'] for p in scraper.get_profiles_for_scraping()] == expected_order()[5:]
+
+
+def test_keyset_pages_past_unscored_profiles(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    conn = scraper.get_db_connection()
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, job_title_score) "
+            "VALUES (?, 'First', 'Last', ?, ?)",
+            [(profile_id, f"https://www.linkedin.com/in/u{profile_id}", score)
+             for profile_id, score in [(1, None), (2, 5), (3, None), (4, 0), (5, None)]],
+        )
+
+    # Unscored profiles sort last, as ORDER BY job_title_score DESC did
+    expected = [2, 4, 1, 3, 5]
+    assert [p['profile_id'] for p in scraper.get_profiles_for_scraping()] == expected
+    for page_size in (1, 2, 3):
+        assert [p['profile_id'] for p in scraper.iter_profiles_for_scraping(page_size=page_size)] == expected
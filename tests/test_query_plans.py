@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+EXPLAIN QUERY PLAN checks for the work-queue queries
+
+Each test runs the real method against a fresh database, captures the SELECT
+statements it issues and fails if SQLite plans a full scan of a pipeline table.
+"""
+
+import re
+
+import pytest
+
+PIPELINE_TABLES = ("profiles", "posts", "comments", "comment_queue")
+FULL_SCAN = re.compile(r"^SCAN (\w+)")
+
+
+@pytest.fixture
+def schema(load_script, db_path):
+    """Create the full schema the way the scripts do in production."""
+    scripts = {
+        name: load_script(name)
+        for name in (
+            "retrieve_posts_prospects",
+            "retrieve_post_1stconnections",
+            "linkedin_post_liker",
+            "linkedin_comment_poster",
+        )
+    }
+    return {
+        "prospects": scripts["retrieve_posts_prospects"].PostScraper(db_path=db_path),
+        "connections": scripts["retrieve_post_1stconnections"].PostScraper(db_path=db_path),
+        "liker": scripts["linkedin_post_liker"].PostLiker(db_path=db_path),
+        "poster": scripts["linkedin_comment_poster"].CommentPoster(db_path=db_path),
+    }
+
+
+def capture_selects(conn, func):
+    """Run ``func`` and return the (expanded) SELECT statements it executed."""
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        func()
+    finally:
+        conn.set_trace_callback(None)
+    return [sql for sql in statements if sql.lstrip().upper().startswith(("SELECT", "WITH"))]
+
+
+def full_scans(conn, sql):
+    """Return the pipeline tables a statement would scan end to end."""
+    plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    scanned = []
+    for row in plan:
+        match = FULL_SCAN.match(row["detail"])
+        if match and match.group(1) in PIPELINE_TABLES:
+            scanned.append(row["detail"])
+    return scanned
+
+
+def assert_indexed(worker, method_name):
+    conn = worker.get_db_connection()
+    statements = capture_selects(conn, getattr(worker, method_name))
+    assert statements, f"{method_name} issued no SELECT"
+    for sql in statements:
+        assert full_scans(conn, sql) == [], f"{method_name} full-scans: {sql}"
+
+
+def test_profiles_for_scraping_uses_index(schema):
+    assert_indexed(schema["prospects"], "get_profiles_for_scraping")
+
+
+def test_connection_cohort_uses_index(schema):
+    assert_indexed(schema["connections"], "get_profiles_for_scraping")
+
+
+@pytest.mark.parametrize("name", ["prospects", "connections"])
+def test_profile_keyset_pages_use_index(schema, name):
+    scraper = schema[name]
+    conn = scraper.get_db_connection()
+    sql = scraper.PROFILES_FOR_SCRAPING_SQL.format(after=scraper.KEYSET_AFTER)
+    assert full_scans(conn, sql.replace("?", "1")) == []
+
+
+def test_posts_to_like_uses_index(schema):
+    assert_indexed(schema["liker"], "get_posts_to_like")
+
+
+def test_comments_to_post_uses_index(schema):
+    assert_indexed(schema["poster"], "get_comments_to_post")
+
+
+def test_expected_indexes_exist(schema):
+    conn = schema["poster"].get_db_connection()
+    names = {row["name"] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {
+        "idx_profiles_scrape_queue",
+        "idx_profiles_last_action_date",
+        "idx_profiles_role_category",
+        "idx_posts_profile_posted",
+        "idx_posts_unliked",
+        "idx_comments_generated",
+    } <= names
+
+
+def test_invitation_query_uses_role_index(schema):
+    conn = schema["connections"].get_db_connection()
+    assert full_scans(conn, "SELECT * FROM profiles WHERE role_category IN ('product', 'technical', 'other')") == []
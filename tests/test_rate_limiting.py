@@ -3,6 +3,10 @@
 Test script to validate the rate limiting logic
 """
 
+import time
+
+MS_PER_DAY = 86_400_000
+
 def test_rate_limiting_logic():
     """Test the rate limiting logic with sample data"""
     
@@ -71,6 +75,48 @@ def test_rate_limiting_logic():
     
     print("✅ Comment rate limiting test passed!")
 
+def test_posts_to_like_caps_in_sql(load_script, db_path):
+    """get_posts_to_like applies the 3-per-profile cap and max_likes in the query"""
+    liker = load_script("linkedin_post_liker").PostLiker(db_path=db_path)
+    conn = liker.get_db_connection()
+    now_ms = int(time.time() * 1000)
+
+    with conn:
+        conn.executemany(
+            "INSERT INTO profiles (profile_id, first_name, last_name, profile_url, status, job_title_score) "
+            "VALUES (?, ?, 'Doe', ?, ?, ?)",
+            [(1, 'John', 'u1', 'week1_liking', 6), (2, 'Jane', 'u2', 'week1_liking', 10),
+             (3, 'Bob', 'u3', 'week1_liking', 6), (4, 'Old', 'u4', 'week2_commenting', 10)],
+        )
+        posts = [
+            (101, 1, 1), (102, 1, 2), (103, 1, 3), (104, 1, 4), (105, 1, 5),
+            (201, 2, 1), (202, 2, 2),
+            (301, 3, 1),
+            (401, 4, 1),
+        ]
+        conn.executemany(
+            "INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp) VALUES (?, ?, ?, ?)",
+            [(post_id, profile_id, f"urn:li:activity:{post_id}", now_ms - days_ago * MS_PER_DAY)
+             for post_id, profile_id, days_ago in posts],
+        )
+        # Too old, already liked and URN-less posts never qualify
+        conn.execute("INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp) VALUES (106, 1, 'x', ?)",
+                     (now_ms - 40 * MS_PER_DAY,))
+        conn.execute("INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp, is_post_liked) "
+                     "VALUES (107, 1, 'y', ?, TRUE)", (now_ms,))
+        conn.execute("INSERT INTO posts (post_id, profile_id, urn, posted_date_timestamp) VALUES (108, 3, '', ?)",
+                     (now_ms,))
+
+    selected = [post['post_id'] for post in liker.get_posts_to_like()]
+    assert selected == [201, 202, 301, 101, 102, 103]
+
+    assert [post['post_id'] for post in liker.get_posts_to_like(max_likes=4)] == [201, 202, 301, 101]
+    assert [post['post_id'] for post in liker.get_posts_to_like(per_profile=1)] == [201, 301, 101]
+    assert set(liker.get_posts_to_like()[0]) == {
+        'profile_id', 'first_name', 'last_name', 'connection_status', 'post_id', 'urn', 'posted_date',
+    }
+
+
 if __name__ == "__main__":
     test_rate_limiting_logic()
     print("🎉 All tests passed! Rate limiting logic is working correctly.")
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent API response cache and its use by the scrapers
+"""
+
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.database import get_connection
+from backend.response_cache import ResponseCache
+from backend.schema import migrate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def conn(db_path):
+    conn = get_connection(db_path)
+    migrate(conn)
+    return conn
+
+
+def test_entries_expire_after_ttl(conn):
+    clock = Clock()
+    cache = ResponseCache(conn, ttl_seconds=60, clock=clock)
+    cache.put("posts", b'{"success": true}', "ada", "0")
+
+    assert cache.get("posts", "ada", "0") == b'{"success": true}'
+    assert cache.get("posts", "ada", "1") is None
+    clock.now += 61
+    assert cache.get("posts", "ada", "0") is None
+    assert cache.purge_expired() == 1
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'stores': 1, 'evictions': 0, 'hit_rate': 1 / 3}
+
+
+def test_least_recently_used_entries_are_evicted(conn):
+    clock = Clock()
+    body = os.urandom(1000)  # incompressible
+    cache = ResponseCache(conn, max_bytes=3 * 1100, clock=clock)
+    for name in ("a", "b", "c"):
+        clock.now += 1
+        cache.put("posts", body, name)
+
+    clock.now += 1
+    assert cache.get("posts", "a") == body  # "b" is now the oldest
+    clock.now += 1
+    cache.put("posts", body, "d")
+
+    assert cache.evictions == 1
+    assert [cache.get("posts", name) is not None for name in "abcd"] == [True, False, True, True]
+
+
+def test_refresh_skips_reads_and_no_cache_skips_everything(conn):
+    ResponseCache(conn).put("posts", b"old", "ada")
+
+    refreshing = ResponseCache(conn, refresh=True)
+    assert refreshing.get("posts", "ada") is None
+    refreshing.put("posts", b"new", "ada")
+
+    disabled = ResponseCache(conn, enabled=False)
+    assert disabled.get("posts", "ada") is None
+    disabled.put("posts", b"ignored", "ada")
+    assert ResponseCache(conn).get("posts", "ada") == b"new"
+    assert disabled.summary() == "Response cache: disabled"
+
+
+@pytest.fixture
+def posts_api():
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            requests.append(self.path)
+            body = json.dumps({'success': True, 'data': [{'urn': 'urn:li:activity:1', 'text': 'hi'}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/get-profile-posts", requests
+    server.shutdown()
+    server.server_close()
+
+
+def test_scrapers_share_cached_responses(load_script, db_path, posts_api):
+    url, requests = posts_api
+    prospects = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    connections = load_script("retrieve_post_1stconnections").PostScraper(db_path=db_path)
+    refreshing = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path, refresh_cache=True)
+    for scraper in (prospects, connections, refreshing):
+        scraper.api_url = url
+
+    profile_url = "https://www.linkedin.com/in/ada"
+    posts = prospects.fetch_linkedin_posts(profile_url)
+    assert connections.fetch_linkedin_posts(profile_url) == posts == [{'urn': 'urn:li:activity:1', 'text': 'hi'}]
+    assert len(requests) == 1
+    assert connections.cache.stats()['hits'] == 1
+
+    assert refreshing.fetch_linkedin_posts(profile_url) == posts
+    assert len(requests) == 2
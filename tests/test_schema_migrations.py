@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned schema migrations in backend.schema
+"""
+
+import pytest
+
+from backend.database import get_connection
+from backend.schema import (
+    MIGRATIONS, SCHEMA_VERSION, TABLES, Migration, _table_columns, migrate, schema_version,
+)
+
+
+def test_fresh_database_gets_every_table_once(db_path):
+    conn = get_connection(db_path)
+    assert migrate(conn) == SCHEMA_VERSION
+
+    for table, definitions in TABLES.items():
+        expected = {d.split()[0] for d in definitions if not d.startswith(("UNIQUE", "FOREIGN KEY"))}
+        assert expected <= _table_columns(conn, table)
+
+    assert migrate(conn) == SCHEMA_VERSION
+    versions = [row[0] for row in conn.execute("SELECT version FROM schema_version ORDER BY version")]
+    assert versions == [migration.version for migration in MIGRATIONS]
+
+
+def test_legacy_database_is_upgraded_in_place(db_path):
+    conn = get_connection(db_path)
+    with conn:
+        # Tables as an older scraper created them: no like columns, no role_category
+        conn.execute("""
+            CREATE TABLE profiles (
+                profile_id INTEGER PRIMARY KEY AUTOINCREMENT, first_name TEXT NOT NULL,
+                last_name TEXT NOT NULL, username TEXT, profile_url TEXT NOT NULL,
+                status TEXT DEFAULT 'not_started', UNIQUE(profile_url, username)
+            )
+        """)
+        conn.execute("CREATE TABLE posts (post_id INTEGER PRIMARY KEY AUTOINCREMENT, urn TEXT, profile_id INTEGER NOT NULL)")
+        conn.execute("INSERT INTO profiles (first_name, last_name, profile_url) VALUES ('Ada', 'L', 'u1')")
+        conn.executemany("INSERT INTO posts (urn, profile_id) VALUES (?, 1)", [('urn:1',), ('urn:1',), ('',)])
+
+    assert schema_version(conn) == 0
+    migrate(conn)
+
+    assert {'is_post_liked', 'like_failed', 'liked_to_linkedin_at'} <= _table_columns(conn, 'posts')
+    assert 'role_category' in _table_columns(conn, 'profiles')
+    assert [tuple(row) for row in conn.execute("SELECT post_id, urn, is_post_liked FROM posts ORDER BY post_id")] == [
+        (1, 'urn:1', 0), (3, None, 0),
+    ]
+    assert schema_version(conn) == SCHEMA_VERSION
+
+
+def test_liker_hot_path_skips_schema_introspection(load_script, db_path):
+    liker = load_script("linkedin_post_liker").PostLiker(db_path=db_path)
+    conn = liker.get_db_connection()
+    with conn:
+        conn.execute("INSERT INTO profiles (profile_id, first_name, last_name, profile_url) VALUES (1, 'A', 'B', 'u')")
+        conn.execute("INSERT INTO posts (post_id, profile_id, urn) VALUES (1, 1, 'urn:1')")
+
+    statements = []
+    conn.set_trace_callback(statements.append)
+    try:
+        liker.get_posts_to_like()
+        assert liker.mark_post_as_liked(1, 'like-id', 'like-urn')
+        assert liker.mark_post_like_failed(1, 'boom')
+    finally:
+        conn.set_trace_callback(None)
+
+    assert not [sql for sql in statements if 'PRAGMA' in sql.upper()]
+    row = conn.execute("SELECT is_post_liked, like_failed, linkedin_like_id FROM posts").fetchone()
+    assert tuple(row) == (1, 1, 'like-id')
+
+
+def test_each_migration_adds_only_its_own_columns(db_path):
+    conn = get_connection(db_path)
+    applied = []
+    for migration in MIGRATIONS:
+        migration.apply(conn)
+        applied.append(migration.version)
+        if applied == [1]:
+            assert not {'role_category', 'posts_watermark_ts', 'lease_owner'} & _table_columns(conn, 'profiles')
+            assert not {'is_post_liked', 'lease_owner'} & _table_columns(conn, 'posts')
+        if applied == [1, 2]:
+            assert 'role_category' in _table_columns(conn, 'profiles')
+            assert 'posts_watermark_ts' not in _table_columns(conn, 'profiles')
+    assert 'lease_owner' in _table_columns(conn, 'comments')
+
+
+def test_failed_migration_leaves_no_partial_ddl(db_path, monkeypatch):
+    def half_applied(conn):
+        conn.execute("CREATE TABLE half_done (id INTEGER)")
+        conn.execute("ALTER TABLE profiles ADD COLUMN half_column TEXT")
+        raise RuntimeError("migration failed")
+
+    conn = get_connection(db_path)
+    monkeypatch.setattr("backend.schema.MIGRATIONS", MIGRATIONS[:1] + [Migration(2, "Broken", half_applied)])
+    with pytest.raises(RuntimeError):
+        migrate(conn)
+
+    assert schema_version(conn) == 1
+    assert not _table_columns(conn, 'half_done')
+    assert 'half_column' not in _table_columns(conn, 'profiles')
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Startup regression checks for the entry points, based on ``python -X importtime``
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from backend.settings import Settings
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ENTRY_POINTS = [
+    "retrieve_posts_prospects",
+    "retrieve_post_1stconnections",
+    "linkedin_post_liker",
+    "linkedin_comment_poster",
+    "linkedin_commenter",
+    "csv_profile_importer",
+    "linkedin_pipeline",
+]
+STATS_ONLY_ENTRY_POINTS = ENTRY_POINTS[:4]
+
+# Only imported once a command does real work
+HEAVY_MODULES = {"asyncio", "httpx", "pandas", "numpy", "dotenv", "backend.linkedin.graph"}
+# Cumulative import time allowed for an entry point module itself
+IMPORT_BUDGET_US = 100_000
+
+
+def run_python(args, cwd, **env):
+    """Run the interpreter with ``-X importtime`` and no credentials; return (result, {module: cumulative us})."""
+    environ = {key: value for key, value in os.environ.items()
+               if not key.endswith(("_KEY", "_TOKEN", "_SECRET", "_ID"))}
+    environ.update(PYTHONPATH=str(ROOT), **env)
+    result = subprocess.run([sys.executable, "-X", "importtime", *args], cwd=cwd, env=environ,
+                            capture_output=True, text=True, timeout=60)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return result, times
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_import_has_no_side_effects_and_stays_light(module, tmp_path):
+    result, times = run_python(["-c", f"import {module}"], cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert not HEAVY_MODULES & set(times)
+    assert times[module] < IMPORT_BUDGET_US
+    assert list(tmp_path.iterdir()) == []  # no log file, no database
+
+
+@pytest.mark.parametrize("module", ENTRY_POINTS)
+def test_help_needs_no_credentials(module, tmp_path):
+    result, times = run_python([str(ROOT / f"{module}.py"), "--help"], cwd=tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert "usage:" in result.stdout
+    assert not HEAVY_MODULES & set(times)
+
+
+@pytest.mark.parametrize("module", STATS_ONLY_ENTRY_POINTS)
+def test_stats_only_skips_the_http_stack(module, tmp_path):
+    db_path = tmp_path / "stats.sqlite3"
+    args = [str(ROOT / f"{module}.py"), "--stats-only"]
+    result, times = run_python(args, cwd=tmp_path, DB_PATH=str(db_path))
+
+    assert result.returncode == 0, result.stderr
+    assert not {"asyncio", "httpx", "pandas"} & set(times)
+
+    # Legacy posts without a usable date are backfilled once, not on every start
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute("INSERT INTO profiles (profile_id, first_name, last_name, profile_url) "
+                     "VALUES (1, 'Ada', 'L', 'https://www.linkedin.com/in/ada')")
+        conn.executemany("INSERT INTO posts (urn, profile_id, posted_date) VALUES (?, 1, ?)",
+                         [("urn:undated", None), ("urn:garbled", "last week")])
+    conn.close()
+    run_python(args, cwd=tmp_path, DB_PATH=str(db_path))
+    result, times = run_python(args, cwd=tmp_path, DB_PATH=str(db_path))
+
+    assert result.returncode == 0, result.stderr
+    assert not {"asyncio", "httpx", "pandas"} & set(times)
+
+
+def test_settings_from_env_and_require():
+    settings = Settings.from_env({
+        "DB_PATH": "other.sqlite3",
+        "POSTS_CACHE_MAX_MB": "8",
+        "LINKEDIN_TOKEN_EXPIRES_AT": "2030-01-01T00:00:00+00:00",
+        "LINKEDIN_ACCESS_TOKEN": "token",
+    })
+
+    assert (settings.db_path, settings.posts_cache_max_mb, settings.posts_cache_ttl_hours) == ("other.sqlite3", 8, 6.0)
+    assert settings.token_expires_at == 1893456000.0
+    settings.require("linkedin_access_token")
+    with pytest.raises(ValueError, match="RAPIDAPI_KEY, LINKEDIN_PROFILE_ID"):
+        settings.require("rapidapi_key", "linkedin_profile_id")
+
+
+def test_commenter_checks_the_configured_database(tmp_path):
+    keys = {"OPENAI_API_KEY": "test", "GEMINI_API_KEY": "test", "TAVILY_API_KEY": "test"}
+    script = str(ROOT / "linkedin_commenter.py")
+
+    result, _ = run_python([script, "--db-path", str(tmp_path / "flag.sqlite3")], cwd=tmp_path, **keys)
+    assert result.returncode == 1
+    assert f"Database file {tmp_path / 'flag.sqlite3'} not found" in result.stderr
+
+    # Run on its own, the commenter lets .env override the environment
+    (tmp_path / ".env").write_text("DB_PATH=dotenv.sqlite3\n")
+    result, _ = run_python([script], cwd=tmp_path, DB_PATH="environ.sqlite3", **keys)
+    assert result.returncode == 1
+    assert "Database file dotenv.sqlite3 not found" in result.stderr
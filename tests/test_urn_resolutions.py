@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the persistent activity-to-thread URN resolutions
+"""
+
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from backend.urns import payload_thread_urns, resolve_thread_urn
+
+THREAD_URN = "urn:li:ugcPost:777"
+
+
+@pytest.fixture
+def linkedin_api():
+    """Reject anything but THREAD_URN with LinkedIn's URN mismatch error."""
+    targets = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            target = urllib.parse.unquote(self.path.split("/")[-2])
+            targets.append(target)
+            if target == THREAD_URN:
+                status, body = 201, b"{}"
+            else:
+                status = 400
+                body = json.dumps({'message': f"Object urn {target} is not the same as the actual "
+                                              f"threadUrn: {THREAD_URN}"}).encode()
+            self.send_response(status)
+            self.send_header("x-restli-id", "created-id")
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield base_url, targets
+    server.shutdown()
+    server.server_close()
+
+
+def endpoint(base_url, kind):
+    return lambda urn: f"{base_url}/v2/socialActions/{urllib.parse.quote(urn, safe='')}/{kind}"
+
+
+def test_mismatch_is_resolved_once_for_likes_and_comments(load_script, db_path, linkedin_api, monkeypatch):
+    base_url, targets = linkedin_api
+    liker = load_script("linkedin_post_liker").PostLiker(db_path=db_path)
+    poster = load_script("linkedin_comment_poster").CommentPoster(db_path=db_path)
+    monkeypatch.setattr(liker, 'get_like_endpoint_url', endpoint(base_url, "likes"))
+    monkeypatch.setattr(poster, 'get_comment_endpoint_url', endpoint(base_url, "comments"))
+
+    assert liker.like_post_on_linkedin("123", "me")['success']
+    assert targets == ["urn:li:activity:123", THREAD_URN]
+    assert resolve_thread_urn(liker.get_db_connection(), "123") == THREAD_URN
+
+    # The stored resolution is used up front by both workers
+    assert liker.like_post_on_linkedin("123", "me")['success']
+    assert poster.post_comment_to_linkedin("Nice post", "123", "me")['urn_used'] == THREAD_URN
+    assert targets[2:] == [THREAD_URN, THREAD_URN]
+
+
+def test_scraper_prefills_resolutions_from_payload(load_script, db_path):
+    scraper = load_script("retrieve_posts_prospects").PostScraper(db_path=db_path)
+    posts = [
+        {'urn': '1', 'shareUrl': 'https://www.linkedin.com/feed/update/urn%3Ali%3AugcPost%3A901/'},
+        {'urn': '2', 'postUrl': 'https://www.linkedin.com/posts/ada_hello-activity-2-abcd'},
+        {'urn': 'urn:li:share:3', 'shareUrl': 'https://www.linkedin.com/feed/update/urn:li:share:3'},
+    ]
+    assert payload_thread_urns(posts) == [('1', 'urn:li:ugcPost:901')]
+
+    scraper.save_posts(posts, profile_id=7)
+
+    conn = scraper.get_db_connection()
+    assert resolve_thread_urn(conn, '1') == 'urn:li:ugcPost:901'
+    assert resolve_thread_urn(conn, '2') is None